@@ -35,6 +35,22 @@ import re
 import tempfile
 import shutil
 import os
+import random
+import collections
+import bisect
+import itertools
+import concurrent.futures
+import threading
+import hashlib
+import time
+import atexit
+import queue
+import contextlib
+import platform
+import io
+import cProfile
+import pstats
+import tracemalloc
 
 
 # ============================================================================
@@ -76,7 +92,7 @@ class GitConfig:
 class SafetyConfig:
     """Safety and reliability configuration"""
     enable_doctor_auto_fixes: bool  # Allow doctor to auto-fix safe issues
-    max_consecutive_failures: int  # Stop pass after this many consecutive failures
+    max_consecutive_failures: int  # Stop pass after this many consecutive failures (when performance.retry_policy is disabled)
     stop_on_invariant_violation: bool  # Stop immediately on invariant violation
     doctor_scan_log_lines: int  # Number of log lines to scan in doctor
     allow_config_autofix: bool  # Allow doctor to write back normalized config
@@ -107,10 +123,10 @@ class Config:
     master_md_path: str  # Path to main PRD markdown file
     state_path: str  # Path to runtime state file (git-ignored)
     log_path: str  # Path to log file (git-ignored)
-    chunk_strategy: str  # Strategy for chunking PRD (e.g., "fixed_lines")
+    chunk_strategy: str  # Strategy for chunking PRD ("fixed_lines" or "sections")
     chunk_size_lines: int  # Number of lines per chunk (for fixed_lines strategy)
     wait_seconds: int  # Seconds to wait between AI calls
-    max_parallel_chats: int  # Max parallel AI chat sessions (future)
+    max_parallel_chats: int  # Max chunks sent to the model concurrently per pass (Cursor driver always uses 1)
     min_length_ratio_ok: float  # Minimum length ratio to consider enhancement safe (0.9 = 90% of original)
     cursor_driver_path: str  # Path to AppleScript driver for Cursor
     use_cursor_driver: bool  # Whether to use Cursor driver (requires macOS)
@@ -380,7 +396,7 @@ def load_config(config_path: pathlib.Path = None) -> Config:
     
     # Create Config object
     # Filter out sections that are not part of Config dataclass
-    excluded_keys = ["growth", "git", "safety", "implementation", "profiles", "domain_packs", "deployment", "security", "performance", "analytics", "extensions", "ai", "sandbox"]
+    excluded_keys = ["growth", "git", "safety", "implementation", "profiles", "domain_packs", "deployment", "security", "performance", "analytics", "extensions", "ai", "sandbox", "logging"]
     config_dict = {k: v for k, v in data.items() if k not in excluded_keys}
     config_dict["growth"] = growth_config
     config_dict["git"] = git_config
@@ -401,6 +417,529 @@ def load_config(config_path: pathlib.Path = None) -> Config:
 # Global config for logging (set by main)
 _global_config: typing.Optional[Config] = None
 
+# Log levels for logging.level; log() infers a record's level (see _log_level)
+LOG_LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+_LOG_LEVEL_NAMES = {value: name for name, value in LOG_LEVELS.items()}
+
+# Per-chunk / per-call progress steps logged at debug level
+LOG_DEBUG_STEPS = frozenset({
+    "send_to_model_mode", "prepare_prompt", "send_prompt", "receive_response",
+    "parse_response", "safety_check", "extract", "cache_hit", "run_git_command",
+})
+
+# Context keys rendered as [key=value] fields (always present, "-" if unset)
+LOG_STANDARD_FIELDS = ("command", "chunk", "phase_id", "step")
+
+
+def get_logging_settings(config: typing.Optional[Config]) -> dict:
+    """Return the top-level logging settings (empty dict if not configured)."""
+    if config is None or not config._raw_data:
+        return {}
+    return config._raw_data.get("logging", {}) or {}
+
+
+def _log_level(message: str, context: typing.Optional[dict]) -> int:
+    """
+    Level of a log record: context["level"] if given, else ERROR/WARNING
+    message prefixes and error/warning steps, else debug for LOG_DEBUG_STEPS,
+    else info.
+    """
+    if context:
+        level = context.get("level")
+        if level is not None:
+            return LOG_LEVELS.get(level, LOG_LEVELS["info"])
+        step = context.get("step")
+        if step == "error":
+            return LOG_LEVELS["error"]
+        if step == "warning":
+            return LOG_LEVELS["warning"]
+    if message.startswith("ERROR"):
+        return LOG_LEVELS["error"]
+    if message.startswith("WARNING") or message.startswith("INVARIANT VIOLATION"):
+        return LOG_LEVELS["warning"]
+    if context and context.get("step") in LOG_DEBUG_STEPS:
+        return LOG_LEVELS["debug"]
+    return LOG_LEVELS["info"]
+
+
+# Backpressure policies for logging.queue_policy (async writer, queue full)
+LOG_QUEUE_POLICIES = ("block", "drop_debug", "sample")
+
+
+class LogSink:
+    """
+    Buffered writer for one log file: keeps the file open and writes the
+    buffered lines once buffer_bytes accumulate, flush_interval_seconds have
+    passed since the last flush, an error-level record arrives, or the
+    process exits (atexit).
+
+    With logging.async_writer, write() only enqueues the line on a bounded
+    queue (logging.queue_size) and a single writer thread batches lines to the
+    file. When the queue is full, logging.queue_policy decides: "block" waits,
+    "drop_debug" drops debug records (others wait), "sample" keeps one in
+    logging.sample_every records below warning (others wait). Dropped records
+    are counted and reported in the log when the sink closes.
+
+    With a stats_path, every written line also updates the LogStats sidecar
+    (saved after each flush) used by check_logs.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        settings: dict,
+        stats_path: typing.Optional[pathlib.Path] = None,
+        stats_keep_blocks: int = 11,
+    ):
+        # Resolved once, so a later chdir does not redirect the open handle or sidecar
+        self.path = os.path.abspath(path)
+        self.threshold = LOG_LEVELS.get(str(settings.get("level", "debug")).lower(), LOG_LEVELS["debug"])
+        self.format = settings.get("format", "text")
+        self.console = bool(settings.get("console", True))
+        self.buffer_bytes = int(settings.get("buffer_bytes", 65536))
+        self.flush_interval = float(settings.get("flush_interval_seconds", 1.0))
+        self.queue_policy = settings.get("queue_policy", "block")
+        self.sample_every = max(1, int(settings.get("sample_every", 10)))
+        self.dropped = 0
+        self._buffer: list[str] = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        self._handle = None
+        self._lock = threading.Lock()
+        self._queue: typing.Optional[queue.Queue] = None
+        self._writer: typing.Optional[threading.Thread] = None
+        self._overflow_seen = 0
+        self._drop_lock = threading.Lock()  # counters only, never held during I/O
+        self.stats_path = stats_path.absolute() if stats_path is not None else None
+        self._stats: typing.Optional[LogStats] = None
+        self._stats_dirty = False
+        self._stats_saved_at = 0.0
+        if stats_path is not None:
+            self._stats = (
+                LogStats.load(self.stats_path, self.path, stats_keep_blocks)
+                or LogStats(self.path, stats_keep_blocks)
+            )
+        if settings.get("async_writer", False):
+            self._queue = queue.Queue(maxsize=max(1, int(settings.get("queue_size", 10000))))
+            self._writer = threading.Thread(target=self._run_writer, name="log-writer", daemon=True)
+            self._writer.start()
+
+    def write(self, line: str, level: int) -> None:
+        if self._queue is not None:
+            self._enqueue(line, level)
+            return
+        with self._lock:
+            self._buffer.append(line)
+            self._buffered += len(line)
+            if (
+                self._buffered >= self.buffer_bytes
+                or level >= LOG_LEVELS["error"]
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._flush_locked()
+
+    def _enqueue(self, line: str, level: int) -> None:
+        try:
+            self._queue.put_nowait(line)
+            return
+        except queue.Full:
+            pass
+        if self.queue_policy == "drop_debug" and level <= LOG_LEVELS["debug"]:
+            with self._drop_lock:
+                self.dropped += 1
+            return
+        if self.queue_policy == "sample" and level < LOG_LEVELS["warning"]:
+            with self._drop_lock:
+                self._overflow_seen += 1
+                keep = self._overflow_seen % self.sample_every == 1 or self.sample_every == 1
+                if not keep:
+                    self.dropped += 1
+            if not keep:
+                return
+        self._queue.put(line)
+
+    def _run_writer(self) -> None:
+        """Writer thread: batch queued lines into one write; None is the stop sentinel."""
+        while True:
+            try:
+                line = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [line]
+            while len(batch) < 1000:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            with self._lock:
+                self._buffer.extend(item for item in batch if item is not None)
+                self._flush_locked()
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        data = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        try:
+            if self._handle is None:
+                self._handle = open(self.path, 'a', encoding='utf-8')
+            size_before = os.fstat(self._handle.fileno()).st_size if self._stats is not None else 0
+            self._handle.write(data)
+            self._handle.flush()
+        except Exception as e:
+            # Don't fail if logging fails
+            print(f"Warning: Could not write to log file: {e}", file=sys.stderr)
+            return
+        if self._stats is not None:
+            self._update_stats(data, size_before)
+
+    def _update_stats(self, data: str, size_before: int) -> None:
+        try:
+            if self._stats.log_size != size_before:
+                # Someone else wrote to (or rotated) the log: recount the tail
+                self._stats.rebuild()
+            else:
+                offset = size_before
+                for line in data.split("\n"):
+                    self._stats.add_line(line, offset)
+                    offset += len(line.encode("utf-8")) + 1
+                self._stats.log_size = os.fstat(self._handle.fileno()).st_size
+            self._stats_dirty = True
+            if time.monotonic() - self._stats_saved_at >= self.flush_interval:
+                self._save_stats_locked()
+        except Exception as e:
+            print(f"Warning: Could not update log stats: {e}", file=sys.stderr)
+
+    def _save_stats_locked(self) -> None:
+        """Write the stats sidecar if it changed (throttled to flush_interval by _update_stats)."""
+        if self._stats is None or not self._stats_dirty:
+            return
+        self._stats_saved_at = time.monotonic()
+        self._stats_dirty = False
+        try:
+            self._stats.save(self.stats_path)
+        except Exception as e:
+            print(f"Warning: Could not save log stats: {e}", file=sys.stderr)
+
+    def flush(self) -> None:
+        """Write everything logged so far (waits for the writer thread to drain the queue)."""
+        if self._queue is not None and self._writer.is_alive():
+            self._queue.join()
+        with self._lock:
+            self._flush_locked()
+            self._save_stats_locked()
+
+    def close(self) -> None:
+        if self._queue is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=10)
+        with self._lock, self._drop_lock:
+            if self.dropped:
+                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self._buffer.append(format_log_line(
+                    timestamp,
+                    f"WARNING: {self.dropped} log record(s) dropped by queue_policy={self.queue_policy}",
+                    {"step": "log_queue_overflow"}
+                ) + "\n")
+                self.dropped = 0
+            self._flush_locked()
+            self._save_stats_locked()
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+
+# Error kinds counted by check_logs (doctor) and the log stats sidecar
+LOG_ERROR_KINDS = ("send_to_model", "cursor", "osascript", "git", "invariant_violation", "parse_error")
+
+_LOG_TIMESTAMP_RE = re.compile(r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]')
+_LOG_CHUNK_RE = re.compile(r'\[chunk=(\d+)\]')
+
+
+def classify_log_line(line: str) -> typing.Optional[tuple]:
+    """
+    Classify one text log line for doctor's log analysis.
+
+    Returns:
+        None for lines that mention no error/failure/invariant, else
+        (error_kinds, chunk_id, timestamp): the LOG_ERROR_KINDS the line counts
+        towards, the failing chunk ID (or None) and the line's timestamp when
+        it is an error line (or None)
+    """
+    lower = line.lower()
+    is_error = "error" in lower
+    failed = is_error or "failed" in lower
+    invariant = "invariant" in lower
+    if not failed and not invariant:
+        return None
+    kinds = []
+    if failed:
+        for kind, needle in (("send_to_model", "send_to_model"), ("cursor", "cursor"), ("osascript", "osascript"), ("git", "git"), ("parse_error", "parse")):
+            if needle in lower:
+                kinds.append(kind)
+    if invariant:
+        kinds.append("invariant_violation")
+    chunk_id = None
+    if failed:
+        chunk_match = _LOG_CHUNK_RE.search(line)
+        if chunk_match:
+            chunk_id = int(chunk_match.group(1))
+    timestamp = None
+    if is_error:
+        timestamp_match = _LOG_TIMESTAMP_RE.search(line)
+        if timestamp_match:
+            timestamp = timestamp_match.group(1)
+    return tuple(kinds), chunk_id, timestamp
+
+
+class LogStats:
+    """
+    Pre-aggregated check_logs counters for one log file, kept in a JSON
+    sidecar (logging.stats_path) and updated by the LogSink as it writes.
+
+    Counts are kept per block of BLOCK_LINES non-empty lines (only the newest
+    keep_blocks), so doctor sums a few blocks instead of re-reading the log.
+    Each block records the byte offset of its first line; when the window
+    starts inside a block, only that block is read back from the log to count
+    its newest lines, so the result matches a plain scan of the same lines.
+    log_size records the file size the counts cover: a sidecar whose log_size
+    does not match the file (another process wrote to it, or it was rotated)
+    is rebuilt from the log tail.
+    """
+
+    BLOCK_LINES = 500
+    VERSION = 2
+
+    def __init__(self, log_path: str, keep_blocks: int):
+        self.log_path = log_path
+        self.keep_blocks = max(1, keep_blocks)
+        self.log_size = 0
+        self.blocks: list[dict] = []
+
+    @staticmethod
+    def _new_block(offset: int) -> dict:
+        return {"lines": 0, "offset": offset, "errors": {}, "hot": {}, "last_error_time": None}
+
+    def add_line(self, line: str, offset: int) -> None:
+        """Count one log line starting at byte `offset` (empty lines are ignored)."""
+        if not line:
+            return
+        if line.startswith("{"):
+            line = log_record_to_text(line)
+        if not self.blocks or self.blocks[-1]["lines"] >= self.BLOCK_LINES:
+            self.blocks.append(self._new_block(offset))
+            del self.blocks[:-self.keep_blocks]
+        block = self.blocks[-1]
+        block["lines"] += 1
+        self._count(block, line)
+
+    @staticmethod
+    def _count(block: dict, line: str) -> None:
+        """Add one text log line's error kinds, chunk and timestamp to a block."""
+        classified = classify_log_line(line)
+        if classified is None:
+            return
+        kinds, chunk_id, timestamp = classified
+        for kind in kinds:
+            block["errors"][kind] = block["errors"].get(kind, 0) + 1
+        if chunk_id is not None:
+            block["hot"][str(chunk_id)] = block["hot"].get(str(chunk_id), 0) + 1
+        if timestamp is not None:
+            block["last_error_time"] = timestamp
+
+    def _block_tail(self, block: dict, count: int) -> dict:
+        """Counters for the newest `count` lines of a block, read back from the log."""
+        tail = self._new_block(block["offset"])
+        skip = block["lines"] - count
+        seen = 0
+        with open(self.log_path, "rb") as f:
+            f.seek(block["offset"])
+            for raw in f:
+                raw = raw.rstrip(b"\n")
+                if not raw:
+                    continue
+                seen += 1
+                if seen > block["lines"]:
+                    break
+                if seen <= skip:
+                    continue
+                line = raw.decode("utf-8", errors="replace")
+                if line.startswith("{"):
+                    line = log_record_to_text(line)
+                tail["lines"] += 1
+                self._count(tail, line)
+        return tail
+
+    def covers(self, max_lines: int) -> bool:
+        """True if the kept blocks hold the last max_lines lines (or the whole log)."""
+        if not self.blocks or self.blocks[0]["offset"] == 0:
+            return True
+        return sum(block["lines"] for block in self.blocks) >= max_lines
+
+    def window(self, max_lines: int) -> dict:
+        """check_logs() result for the last max_lines lines."""
+        error_counts = {kind: 0 for kind in LOG_ERROR_KINDS}
+        hot_spots: dict[int, int] = {}
+        last_error_time = None
+        lines = 0
+        for block in reversed(self.blocks):
+            if lines >= max_lines:
+                break
+            if lines + block["lines"] > max_lines:
+                block = self._block_tail(block, max_lines - lines)
+            lines += block["lines"]
+            for kind, count in block["errors"].items():
+                error_counts[kind] = error_counts.get(kind, 0) + count
+            for chunk_id, count in block["hot"].items():
+                hot_spots[int(chunk_id)] = hot_spots.get(int(chunk_id), 0) + count
+            if last_error_time is None:
+                last_error_time = block["last_error_time"]
+        return {
+            "error_counts": error_counts,
+            "hot_spots": {chunk_id: count for chunk_id, count in hot_spots.items() if count >= 3},
+            "last_error_time": last_error_time,
+            "lines_scanned": lines,
+        }
+
+    def rebuild(self) -> None:
+        """Recount from the log tail (newest keep_blocks * BLOCK_LINES lines)."""
+        path = pathlib.Path(self.log_path)
+        self.blocks = []
+        self.log_size = path.stat().st_size if path.exists() else 0
+        tail = list(itertools.islice(_read_raw_lines_reverse(path), self.keep_blocks * self.BLOCK_LINES))
+        for offset, raw in reversed(tail):
+            self.add_line(raw.decode("utf-8", errors="replace"), offset)
+
+    def save(self, stats_path: pathlib.Path) -> None:
+        stats_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_file(stats_path, json.dumps({
+            "version": self.VERSION,
+            "log_path": self.log_path,
+            "log_size": self.log_size,
+            "block_lines": self.BLOCK_LINES,
+            "blocks": self.blocks,
+        }))
+
+    @classmethod
+    def load(cls, stats_path: pathlib.Path, log_path: str, keep_blocks: int) -> typing.Optional["LogStats"]:
+        """Load a sidecar for log_path (None if missing, unreadable or for another log)."""
+        try:
+            data = json.loads(stats_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != cls.VERSION or data.get("log_path") != log_path or data.get("block_lines") != cls.BLOCK_LINES:
+            return None
+        stats = cls(log_path, keep_blocks)
+        stats.log_size = data.get("log_size", 0)
+        stats.blocks = data.get("blocks", [])[-stats.keep_blocks:]
+        return stats
+
+
+def get_log_stats_path(config: Config) -> typing.Optional[pathlib.Path]:
+    """Path of the log stats sidecar (None when logging.stats_sidecar is off)."""
+    settings = get_logging_settings(config)
+    if not settings.get("stats_sidecar", True):
+        return None
+    return pathlib.Path(settings.get("stats_path", ".auto_cache/log_stats.json"))
+
+
+def _log_stats_keep_blocks(config: Config) -> int:
+    return -(-config.safety.doctor_scan_log_lines // LogStats.BLOCK_LINES) + 1
+
+
+# Open log sinks by log path
+_log_sinks: dict[str, LogSink] = {}
+_log_sinks_lock = threading.Lock()
+
+
+def get_log_sink(config: Config) -> LogSink:
+    """Return the sink for config.log_path, created from config's logging settings on first use."""
+    sink = _log_sinks.get(config.log_path)
+    if sink is None:
+        with _log_sinks_lock:
+            sink = _log_sinks.get(config.log_path)
+            if sink is None:
+                sink = LogSink(
+                    config.log_path, get_logging_settings(config),
+                    get_log_stats_path(config), _log_stats_keep_blocks(config)
+                )
+                _log_sinks[config.log_path] = sink
+    return sink
+
+
+def flush_log_sinks() -> None:
+    """Write all buffered or queued log lines (before reading the log file)."""
+    for sink in list(_log_sinks.values()):
+        sink.flush()
+
+
+def close_log_sinks() -> None:
+    """Drain and close every sink (at exit and after fatal errors); later log() calls reopen them."""
+    with _log_sinks_lock:
+        sinks = list(_log_sinks.values())
+        _log_sinks.clear()
+    for sink in sinks:
+        sink.close()
+
+
+def close_log_sink(log_path: str) -> None:
+    """Flush and close the sink for log_path (before the file is moved or removed)."""
+    with _log_sinks_lock:
+        sink = _log_sinks.pop(log_path, None)
+    if sink is not None:
+        sink.close()
+
+
+atexit.register(close_log_sinks)
+
+
+def format_log_line(timestamp: str, message: str, context: typing.Optional[dict]) -> str:
+    """
+    Format a text log line:
+    [YYYY-MM-DD HH:MM:SS] [command=<cmd>] [chunk=<id>] [phase_id=<phase>] [step=<step>] key=value ... message
+    """
+    context = context or {}
+    parts = [f"[{timestamp}]"]
+    for field in LOG_STANDARD_FIELDS:
+        parts.append(f"[{field}={context.get(field, '-')}]")
+    for key, value in context.items():
+        if key not in LOG_STANDARD_FIELDS and key != "level":
+            parts.append(f"{key}={value}")
+    parts.append(message)
+    return " ".join(parts)
+
+
+def format_log_json(timestamp: str, level: int, message: str, context: typing.Optional[dict]) -> str:
+    """Format a JSON-lines log record: ts, level, the standard fields, extra context keys and msg."""
+    context = context or {}
+    record = {"ts": timestamp, "level": _LOG_LEVEL_NAMES[level]}
+    for field in LOG_STANDARD_FIELDS:
+        record[field] = context.get(field, "-")
+    for key, value in context.items():
+        if key not in LOG_STANDARD_FIELDS and key != "level":
+            record[key] = value
+    record["msg"] = message
+    return json.dumps(record, default=str, ensure_ascii=False)
+
+
+def log_record_to_text(line: str) -> str:
+    """Render a JSON-lines log record as its text log line (unparseable lines are returned as-is)."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return line
+    if not isinstance(record, dict):
+        return line
+    context = {key: value for key, value in record.items() if key not in ("ts", "msg")}
+    return format_log_line(record.get("ts", "-"), str(record.get("msg", "")), context)
+
 
 def log(
     message: str,
@@ -411,50 +950,891 @@ def log(
     Log a message with timestamp and optional context.
     
     Format: [YYYY-MM-DD HH:MM:SS][command=<cmd>][chunk=<id>][phase_id=<phase>][step=<step>] message
+    (or one JSON object per line in the log file with logging.format "jsonl").
+    Records below logging.level are dropped before any formatting; the log
+    file is written through a buffered LogSink.
     
     Args:
         message: Log message
-        context: Optional dict with additional context (command, chunk, phase_id, step, etc.)
+        context: Optional dict with additional context (command, chunk, phase_id, step, etc.;
+                 "level" overrides the inferred level)
         config: Optional Config object (if None, uses global config)
     """
     if config is None:
         config = _global_config
     
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Build log line with standard fields
-    parts = [f"[{timestamp}]"]
-    
-    # Standard context fields
-    command = context.get("command", "-") if context else "-"
-    chunk = context.get("chunk", "-") if context else "-"
-    phase_id = context.get("phase_id", "-") if context else "-"
-    step = context.get("step", "-") if context else "-"
-    
-    parts.append(f"[command={command}]")
-    parts.append(f"[chunk={chunk}]")
-    parts.append(f"[phase_id={phase_id}]")
-    parts.append(f"[step={step}]")
-    
-    # Add any additional context fields
-    if context:
-        for key, value in context.items():
-            if key not in ["command", "chunk", "phase_id", "step"]:
-                parts.append(f"{key}={value}")
-    
-    parts.append(message)
+    sink = get_log_sink(config) if config and config.log_path else None
+    level = _log_level(message, context)
+    if sink is not None and level < sink.threshold:
+        return
     
-    log_line = " ".join(parts)
-    print(log_line)
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    log_line = format_log_line(timestamp, message, context)
+    if sink is None or sink.console:
+        print(log_line)
     
-    # Write to log file
-    if config and config.log_path:
+    if sink is not None:
+        if sink.format == "jsonl":
+            sink.write(format_log_json(timestamp, level, message, context) + "\n", level)
+        else:
+            sink.write(log_line + "\n", level)
+
+
+# ============================================================================
+# PERF COUNTERS
+# ============================================================================
+
+# Process-wide time/byte counters for persistence and document I/O, keyed
+# "<name>_seconds", "<name>_bytes", "<name>_calls" (read by benchmark_growth)
+_perf_counters: collections.Counter = collections.Counter()
+_perf_counters_lock = threading.Lock()
+
+
+def perf_count(name: str, seconds: float = 0.0, nbytes: int = 0) -> None:
+    """Add one operation's elapsed time and bytes written to the perf counters."""
+    with _perf_counters_lock:
+        _perf_counters[f"{name}_seconds"] += seconds
+        _perf_counters[f"{name}_bytes"] += nbytes
+        _perf_counters[f"{name}_calls"] += 1
+
+
+def reset_perf_counters() -> None:
+    with _perf_counters_lock:
+        _perf_counters.clear()
+
+
+def snapshot_perf_counters() -> dict:
+    with _perf_counters_lock:
+        return dict(_perf_counters)
+
+
+@contextlib.contextmanager
+def stage_span(name: str, **args) -> typing.Iterator[None]:
+    """
+    Time one pipeline stage (named after its log() step, e.g. "send_prompt")
+    into the perf counters as "stage_<name>"; safe from worker threads.
+    With --trace-out the stage is also recorded as a span (args attached).
+    """
+    started = time.perf_counter()
+    start_ns = trace_span_start()
+    try:
+        yield
+    finally:
+        perf_count(f"stage_{name}", time.perf_counter() - started)
+        record_span(name, "stage", start_ns, args)
+
+
+# ============================================================================
+# PROFILING (--profile / --trace)
+# ============================================================================
+
+def get_profiling_settings(config: Config) -> dict:
+    """Return performance.profiling settings (empty dict if not configured)."""
+    performance = config._raw_data.get("performance", {}) if config._raw_data else {}
+    return performance.get("profiling", {}) or {}
+
+
+class ProfileSession:
+    """
+    Wraps one command run in cProfile (--profile) and/or tracemalloc (--trace).
+
+    finish() writes to performance.profiling.output_dir (default
+    .auto_cache/profiles):
+    - <command>_<timestamp>.prof: raw cProfile stats (pstats, snakeviz, ...)
+    - <command>_<timestamp>.txt: stage timings from stage_span(), perf
+      counters, top functions by cumulative time and top allocation sites
+
+    cProfile only sees the main thread; stage timings include worker threads.
+    """
+
+    def __init__(self, config: Config, command: str, cpu: bool, memory: bool):
+        settings = get_profiling_settings(config)
+        self.command = command
+        self.cpu = cpu
+        self.memory = memory
+        self.output_dir = pathlib.Path(settings.get("output_dir", ".auto_cache/profiles"))
+        self.top_functions = int(settings.get("top_functions", 40))
+        self.top_allocations = int(settings.get("top_allocations", 20))
+        self.trace_frames = int(settings.get("trace_frames", 1))
+        self.profiler: typing.Optional[cProfile.Profile] = None
+        self.started = 0.0
+
+    def start(self) -> None:
+        reset_perf_counters()
+        if self.memory:
+            tracemalloc.start(self.trace_frames)
+        if self.cpu:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.started = time.perf_counter()
+
+    def finish(self) -> pathlib.Path:
+        """Stop profiling and write the report files. Returns the text report path."""
+        elapsed = time.perf_counter() - self.started
+        if self.profiler is not None:
+            self.profiler.disable()
+        snapshot = None
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        base = self.output_dir / f"{self.command}_{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        out = io.StringIO()
+        out.write(f"auto_master.py {self.command}: {elapsed:.3f}s wall\n\n")
+
+        counters = snapshot_perf_counters()
+        stages = sorted(
+            ((key[len("stage_"):-len("_seconds")], value) for key, value in counters.items()
+             if key.startswith("stage_") and key.endswith("_seconds")),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        out.write("Pipeline stages (all threads)\n")
+        out.write(f"{'Stage':<20} {'Calls':>7} {'Total s':>10} {'Mean ms':>9}\n")
+        for name, seconds in stages:
+            calls = counters.get(f"stage_{name}_calls", 0)
+            out.write(f"{name:<20} {calls:>7} {seconds:>10.4f} {seconds / max(calls, 1) * 1000:>9.2f}\n")
+        if not stages:
+            out.write("(no stage spans recorded)\n")
+
+        io_names = sorted(
+            key[:-len("_seconds")] for key in counters
+            if key.endswith("_seconds") and not key.startswith("stage_")
+        )
+        if io_names:
+            out.write("\nI/O counters\n")
+            out.write(f"{'Counter':<20} {'Calls':>7} {'Total s':>10} {'Bytes':>12}\n")
+            for name in io_names:
+                out.write(
+                    f"{name:<20} {counters.get(f'{name}_calls', 0):>7} "
+                    f"{counters[f'{name}_seconds']:>10.4f} {counters.get(f'{name}_bytes', 0):>12}\n"
+                )
+
+        if self.profiler is not None:
+            self.profiler.dump_stats(str(base.with_suffix(".prof")))
+            out.write(f"\nCPU profile (main thread, top {self.top_functions} by cumulative time)\n")
+            pstats.Stats(self.profiler, stream=out).sort_stats("cumulative").print_stats(self.top_functions)
+
+        if snapshot is not None:
+            out.write(f"\nMemory (tracemalloc): current={current / 1048576:.1f} MB peak={peak / 1048576:.1f} MB\n")
+            out.write(f"Top {self.top_allocations} allocation sites\n")
+            for stat in snapshot.statistics("lineno")[:self.top_allocations]:
+                out.write(f"  {stat}\n")
+
+        report_path = base.with_suffix(".txt")
+        atomic_write_file(report_path, out.getvalue())
+        return report_path
+
+
+# ============================================================================
+# TRACING (--trace-out)
+# ============================================================================
+
+# Active tracer (set by main for --trace-out); None keeps spans free
+_tracer: typing.Optional["Tracer"] = None
+
+
+class Tracer:
+    """
+    In-memory span recorder with monotonic nanosecond timing.
+
+    Spans are (name, category, start_ns, end_ns, thread, args, async_id).
+    Spans with an async_id (chunks, which overlap while in flight) are
+    exported as Chrome async events; the rest as complete ("X") events on
+    the thread that ran them. Recording stops after max_spans (counted in
+    `dropped`).
+    """
+
+    def __init__(self, max_spans: int = 200000):
+        self.max_spans = max_spans
+        self.origin_ns = time.monotonic_ns()
+        self.spans: list[tuple] = []
+        self.dropped = 0
+        self.thread_names: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        name: str,
+        category: str,
+        start_ns: int,
+        end_ns: typing.Optional[int] = None,
+        args: typing.Optional[dict] = None,
+        async_id: typing.Optional[typing.Any] = None,
+    ) -> None:
+        """Record a finished span (end_ns defaults to now) for the calling thread."""
+        if end_ns is None:
+            end_ns = time.monotonic_ns()
+        thread = threading.current_thread()
+        with self._lock:
+            if len(self.spans) >= self.max_spans:
+                self.dropped += 1
+                return
+            self.thread_names.setdefault(thread.ident, thread.name)
+            self.spans.append((name, category, start_ns, end_ns, thread.ident, args or {}, async_id))
+
+    def chrome_events(self, process_name: str) -> list[dict]:
+        """Spans as Chrome trace events (ts/dur in microseconds from the tracer origin)."""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": process_name}}]
+        for tid, name in self.thread_names.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        for name, category, start_ns, end_ns, tid, args, async_id in self.spans:
+            ts = (start_ns - self.origin_ns) / 1000
+            if async_id is None:
+                events.append({
+                    "name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                    "ts": ts, "dur": (end_ns - start_ns) / 1000, "args": args,
+                })
+            else:
+                common = {"name": name, "cat": category, "pid": pid, "tid": tid, "id": str(async_id)}
+                events.append({**common, "ph": "b", "ts": ts, "args": args})
+                events.append({**common, "ph": "e", "ts": (end_ns - self.origin_ns) / 1000})
+        return events
+
+    def write(self, path: pathlib.Path, process_name: str) -> tuple[pathlib.Path, pathlib.Path]:
+        """
+        Write the Chrome trace (JSON, for chrome://tracing or Perfetto) and a
+        JSONL copy with one span per line.
+
+        Returns:
+            (chrome_path, jsonl_path)
+        """
+        chrome_path = path.with_suffix(".json") if path.suffix == ".jsonl" else path
+        jsonl_path = path.with_suffix(".jsonl")
+        chrome_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_file(chrome_path, json.dumps({
+            "traceEvents": self.chrome_events(process_name),
+            "displayTimeUnit": "ms",
+            "otherData": {"spans": len(self.spans), "dropped": self.dropped},
+        }))
+        atomic_write_file(jsonl_path, (
+            json.dumps({
+                "name": name,
+                "cat": category,
+                "start_ns": start_ns - self.origin_ns,
+                "dur_ns": end_ns - start_ns,
+                "thread": self.thread_names.get(tid, str(tid)),
+                "async_id": async_id,
+                "args": args,
+            }, separators=(",", ":")) + "\n"
+            for name, category, start_ns, end_ns, tid, args, async_id in self.spans
+        ))
+        return chrome_path, jsonl_path
+
+
+def start_tracing(config: Config) -> Tracer:
+    """Install the process-wide tracer (performance.tracing.max_spans caps memory)."""
+    global _tracer
+    performance = config._raw_data.get("performance", {}) if config._raw_data else {}
+    settings = performance.get("tracing", {}) or {}
+    _tracer = Tracer(max_spans=int(settings.get("max_spans", 200000)))
+    return _tracer
+
+
+def trace_span_start() -> int:
+    """Start timestamp for a span recorded later with record_span() (0 when tracing is off)."""
+    return time.monotonic_ns() if _tracer is not None else 0
+
+
+def record_span(
+    name: str,
+    category: str,
+    start_ns: int,
+    args: typing.Optional[dict] = None,
+    async_id: typing.Optional[typing.Any] = None,
+) -> None:
+    """Record a span that started at start_ns and ends now; no-op when tracing is off."""
+    if _tracer is not None and start_ns:
+        _tracer.add(name, category, start_ns, None, args, async_id)
+
+
+# ============================================================================
+# CHUNK PLANNING
+# ============================================================================
+
+CHUNK_STRATEGIES = ("fixed_lines", "sections")
+
+_FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+_HEADING_RE = re.compile(r'^ {0,3}(#{1,6})(?:[ \t]|$)')
+
+# In-memory section index cache: content digest -> index
+_section_index_cache: dict = {}
+
+
+def get_chunking_tuning(config: Config) -> dict:
+    """Return performance.chunking_tuning settings (empty dict if not configured)."""
+    performance = config._raw_data.get("performance", {}) if config._raw_data else {}
+    return performance.get("chunking_tuning", {}) or {}
+
+
+def scan_markdown_blocks(lines: list[str]) -> dict:
+    """
+    Single-pass scan of markdown structure.
+
+    Finds ATX headings and the line spans that must never be split across
+    chunks: fenced code blocks, HTML comments and tables. Headings inside those
+    spans are ignored. An unterminated fence runs to the end of the document.
+
+    Args:
+        lines: Document lines
+
+    Returns:
+        {"headings": [[line, level], ...], "atomic": [[start, end], ...]}
+        with 1-indexed inclusive line numbers
+    """
+    headings = []
+    atomic = []
+    fence_char = None
+    fence_len = 0
+    block_start = 0
+    in_comment = False
+    table_start = 0
+
+    for number, line in enumerate(lines, 1):
+        if fence_char is not None:
+            match = _FENCE_RE.match(line)
+            if match and match.group(1)[0] == fence_char and len(match.group(1)) >= fence_len \
+                    and not line.strip().lstrip(fence_char):
+                atomic.append([block_start, number])
+                fence_char = None
+            continue
+
+        if in_comment:
+            if "-->" in line:
+                atomic.append([block_start, number])
+                in_comment = False
+            continue
+
+        is_table_row = line.lstrip().startswith("|")
+        if table_start and not is_table_row:
+            if number - 1 > table_start:
+                atomic.append([table_start, number - 1])
+            table_start = 0
+
+        match = _FENCE_RE.match(line)
+        if match:
+            fence_char = match.group(1)[0]
+            fence_len = len(match.group(1))
+            block_start = number
+            continue
+
+        stripped = line.lstrip()
+        if stripped.startswith("<!--") and "-->" not in stripped[4:]:
+            in_comment = True
+            block_start = number
+            continue
+
+        if is_table_row:
+            if not table_start:
+                table_start = number
+            continue
+
+        match = _HEADING_RE.match(line)
+        if match:
+            headings.append([number, len(match.group(1))])
+
+    total = len(lines)
+    if fence_char is not None or in_comment:
+        atomic.append([block_start, total])
+    elif table_start and total > table_start:
+        atomic.append([table_start, total])
+
+    return {"headings": headings, "atomic": atomic}
+
+
+def get_section_index(config: Config, lines: list[str], content_digest: str) -> dict:
+    """
+    Return the markdown block index for a document, using cached copies.
+
+    The index is cached in memory and in a sidecar file next to the state file
+    (`<state_path>.sections`), both keyed by the document's content digest, so
+    re-chunking an unchanged PRD (e.g. rebuild_state_each_pass) skips the scan.
+    """
+    cached = _section_index_cache.get(content_digest)
+    if cached is not None:
+        return cached
+
+    sidecar_path = pathlib.Path(config.state_path + ".sections")
+    index = None
+    if sidecar_path.exists():
         try:
-            with open(config.log_path, 'a') as f:
-                f.write(log_line + "\n")
-        except Exception as e:
-            # Don't fail if logging fails
-            print(f"Warning: Could not write to log file: {e}", file=sys.stderr)
+            with open(sidecar_path, 'r') as f:
+                data = json.load(f)
+            if data.get("digest") == content_digest:
+                index = {"headings": data["headings"], "atomic": data["atomic"]}
+        except (OSError, ValueError, KeyError):
+            index = None
+
+    if index is None:
+        index = scan_markdown_blocks(lines)
+        try:
+            with open(sidecar_path, 'w') as f:
+                json.dump({"digest": content_digest, **index}, f, separators=(",", ":"))
+        except OSError as e:
+            log(f"WARNING: Could not write section index: {e}", {"step": "section_index"}, config)
+
+    _section_index_cache.clear()
+    _section_index_cache[content_digest] = index
+    return index
+
+
+def plan_fixed_line_ranges(first_line: int, last_line: int, chunk_size: int) -> list[tuple[int, int]]:
+    """
+    Split lines first_line..last_line (1-indexed, inclusive) into fixed-size ranges.
+    """
+    return [
+        (start, min(start + chunk_size - 1, last_line))
+        for start in range(first_line, last_line + 1, chunk_size)
+    ]
+
+
+def merge_short_ranges(
+    ranges: list[tuple[int, int]],
+    min_lines: int,
+    max_lines: typing.Optional[int] = None,
+) -> list[tuple[int, int]]:
+    """
+    Merge each range shorter than min_lines into the range before it.
+
+    A short first range is merged into the one after it instead. With
+    max_lines set, ranges are only merged when the result fits in max_lines.
+    Ranges must be contiguous and in file order.
+    """
+    merged: list[tuple[int, int]] = []
+    for start, end in ranges:
+        if merged and end - start + 1 < min_lines \
+                and (max_lines is None or end - merged[-1][0] + 1 <= max_lines):
+            merged[-1] = (merged[-1][0], end)
+        elif len(merged) == 1 and merged[0][1] - merged[0][0] + 1 < min_lines \
+                and (max_lines is None or end - merged[0][0] + 1 <= max_lines):
+            merged[0] = (merged[0][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def plan_section_ranges(
+    lines: list[str],
+    index: dict,
+    first_line: int,
+    last_line: int,
+    min_lines: int,
+    max_lines: int,
+) -> list[tuple[int, int]]:
+    """
+    Split lines first_line..last_line into ranges that follow heading boundaries.
+
+    Sections (heading to next heading) are packed greedily into chunks of at most
+    max_lines. A chunk is closed before a `#`/`##` heading, or before a section
+    that would overflow max_lines, once it holds at least min_lines. Sections
+    longer than max_lines are cut at blank lines, or failing that at any line,
+    but never inside a fenced block, HTML comment or table; such a block longer
+    than max_lines is kept whole. A run shorter than min_lines is carried into
+    the next section rather than emitted on its own. A short trailing chunk is
+    merged into the previous one when the result fits in max_lines, otherwise
+    their boundary is moved back so the trailing chunk holds min_lines.
+
+    Returns:
+        List of (start_line, end_line) tuples (1-indexed, inclusive)
+    """
+    if last_line < first_line:
+        return []
+
+    # Lines at which a chunk may not start (inside an atomic span)
+    blocked = set()
+    for start, end in index["atomic"]:
+        if end < first_line or start > last_line:
+            continue
+        blocked.update(range(max(start + 1, first_line), min(end, last_line) + 1))
+
+    # Section starts within the region
+    starts = [(first_line, 0)]
+    for line, level in index["headings"]:
+        if first_line < line <= last_line and line not in blocked:
+            starts.append((line, level))
+
+    ranges: list[tuple[int, int]] = []
+    chunk_start = first_line
+    for i, (section_start, level) in enumerate(starts):
+        section_end = starts[i + 1][0] - 1 if i + 1 < len(starts) else last_line
+        current = section_start - chunk_start
+        section_len = section_end - section_start + 1
+
+        if current >= min_lines and (current + section_len > max_lines or level in (1, 2)):
+            ranges.append((chunk_start, section_start - 1))
+            chunk_start = section_start
+            current = 0
+
+        if current + section_len <= max_lines:
+            continue
+
+        # Oversized: emit what we have (a short run is carried into the
+        # section instead), then cut the section itself. A remainder shorter
+        # than min_lines stays open and is packed with the next section.
+        if current >= min_lines:
+            ranges.append((chunk_start, section_start - 1))
+            chunk_start = section_start
+        while section_end - chunk_start + 1 > max_lines:
+            cut = _find_section_cut(lines, blocked, chunk_start, section_end, min_lines, max_lines)
+            if cut is None:
+                break
+            ranges.append((chunk_start, cut - 1))
+            chunk_start = cut
+
+    if chunk_start <= last_line:
+        tail = last_line - chunk_start + 1
+        if ranges and tail < min_lines:
+            prev_start = ranges[-1][0]
+            boundary = last_line - min_lines + 1
+            if last_line - prev_start + 1 <= max_lines:
+                ranges[-1] = (prev_start, last_line)
+                return ranges
+            if boundary - prev_start >= min_lines and boundary not in blocked:
+                # Too long to merge: move the boundary back so the tail holds min_lines
+                ranges[-1] = (prev_start, boundary - 1)
+                chunk_start = boundary
+        ranges.append((chunk_start, last_line))
+
+    return ranges
+
+
+def _find_section_cut(
+    lines: list[str],
+    blocked: set,
+    chunk_start: int,
+    section_end: int,
+    min_lines: int,
+    max_lines: int,
+) -> typing.Optional[int]:
+    """
+    Pick the line a new chunk should start at inside an oversized section.
+
+    Prefers the line after the last blank line within max_lines, then the last
+    unblocked line; if every candidate is blocked, the first unblocked line
+    after the limit (so an oversized fence stays whole). None if the section
+    cannot be cut at all.
+    """
+    limit = chunk_start + max_lines
+    earliest = chunk_start + max(min_lines, 1)
+    fallback = None
+    for candidate in range(limit, earliest - 1, -1):
+        if candidate in blocked:
+            continue
+        if not lines[candidate - 2].strip():
+            return candidate
+        if fallback is None:
+            fallback = candidate
+    if fallback is not None:
+        return fallback
+    for candidate in range(limit + 1, section_end + 1):
+        if candidate not in blocked:
+            return candidate
+    return None
+
+
+def plan_chunk_ranges(
+    config: Config,
+    lines: list[str],
+    content_digest: typing.Optional[str] = None,
+    first_line: int = 1,
+    last_line: typing.Optional[int] = None,
+    size_hints: typing.Optional[list[tuple[int, int, int]]] = None,
+) -> list[tuple[int, int]]:
+    """
+    Plan chunk line ranges for a region of the document using config.chunk_strategy.
+
+    Args:
+        config: Config object
+        lines: Document lines
+        content_digest: sha256 of the document text (enables section index caching)
+        first_line: First line of the region (1-indexed)
+        last_line: Last line of the region (inclusive, default: end of document)
+        size_hints: Optional (start_line, end_line, chunk_lines) regions from
+                    compute_chunk_size_hints(); each region is planned with its
+                    own chunk size (fixed_lines) or max chunk size (sections)
+
+    When only part of the document is planned (an incremental re-plan),
+    fixed_lines ranges shorter than performance.chunking_tuning.min_chunk_lines
+    (capped at chunk_size_lines) are merged into a neighbour, so a region that
+    grew slightly past the chunk size does not leave a few-line tail chunk.
+    A full-document plan keeps plain chunk_size_lines ranges.
+
+    Returns:
+        List of (start_line, end_line) tuples (1-indexed, inclusive)
+    """
+    if last_line is None:
+        last_line = len(lines)
+    partial = first_line > 1 or last_line < len(lines)
+
+    index = None
+    tuning = get_chunking_tuning(config)
+    min_lines = int(tuning.get("min_chunk_lines", 50))
+    max_lines = 0
+    if config.chunk_strategy == "sections":
+        max_lines = max(int(tuning.get("max_chunk_lines", 400)), min_lines, 1)
+        if content_digest is None:
+            index = scan_markdown_blocks(lines)
+        else:
+            index = get_section_index(config, lines, content_digest)
+    else:
+        min_lines = min(min_lines, config.chunk_size_lines)
+
+    if not size_hints:
+        if index is not None:
+            return plan_section_ranges(lines, index, first_line, last_line, min_lines, max_lines)
+        ranges = plan_fixed_line_ranges(first_line, last_line, config.chunk_size_lines)
+        return merge_short_ranges(ranges, min_lines) if partial else ranges
+
+    ranges: list[tuple[int, int]] = []
+    for region_start, region_end, size in size_hints:
+        region_start = max(region_start, first_line)
+        region_end = min(region_end, last_line)
+        if region_start > region_end:
+            continue
+        if index is not None:
+            ranges.extend(plan_section_ranges(
+                lines, index, region_start, region_end, min(min_lines, size), max(size, 1)
+            ))
+        else:
+            ranges.extend(plan_fixed_line_ranges(region_start, region_end, max(size, 1)))
+    # Regions are planned separately; merge short ranges left at their edges
+    if index is not None:
+        return merge_short_ranges(ranges, min_lines, max_lines)
+    return merge_short_ranges(ranges, min_lines) if partial else ranges
+
+
+def compute_chunk_size_hints(
+    config: Config,
+    previous_chunks: typing.Optional[list[dict]],
+    total_lines: int,
+) -> typing.Optional[list[tuple[int, int, int]]]:
+    """
+    Derive per-region chunk sizes from the metrics of the previous chunk table.
+
+    Used when performance.chunking_tuning.adaptive_chunking is enabled. Each
+    previous chunk's current line range becomes a region. Model time is taken
+    as proportional to output lines, so for a measured chunk
+
+        seconds_per_output_line = latency / lines_out
+        growth = lines_out / lines_in
+        chunk_lines = target_latency / (seconds_per_output_line * growth)
+
+    limited to half/double the measured size per rebuild. A timed-out chunk's
+    region is halved. Unmeasured regions keep the size they were planned with
+    (chunk["target_lines"]), or the strategy default. All sizes are clamped to
+    min_chunk_lines..max_chunk_lines. Neighbouring regions are merged when
+    their sizes are equal, or when the earlier region is shorter than its
+    chunk size and the sizes are within 2x (taking the smaller), so chunks in
+    fast regions can grow past the old chunk boundaries.
+
+    Returns:
+        List of (start_line, end_line, chunk_lines) covering 1..total_lines,
+        or None when adaptive chunking is off or there is nothing to learn from
+    """
+    tuning = get_chunking_tuning(config)
+    if not tuning.get("adaptive_chunking", False) or not previous_chunks or total_lines <= 0:
+        return None
+
+    target_latency = float(tuning.get("target_latency_seconds_per_chunk", 30))
+    min_lines = int(tuning.get("min_chunk_lines", 50))
+    max_lines = max(int(tuning.get("max_chunk_lines", 400)), min_lines)
+    if config.chunk_strategy == "sections":
+        default_size = max_lines
+    else:
+        default_size = config.chunk_size_lines
+
+    hints: list[tuple[int, int, int]] = []
+    covered = 0
+    for chunk in previous_chunks:
+        start_line = max(chunk["start_line"], covered + 1)
+        end_line = min(chunk["end_line"], total_lines)
+        if start_line > end_line:
+            continue
+
+        size = chunk.get("target_lines", default_size)
+        metrics = chunk.get("metrics") or {}
+        lines_in = metrics.get("lines_in") or 0
+        latency = metrics.get("latency_seconds")
+        if lines_in and not metrics.get("cached"):
+            if metrics.get("outcome") == "timeout":
+                size = lines_in // 2
+            elif metrics.get("outcome") == "done" and latency and latency > 0:
+                lines_out = max(metrics.get("lines_out") or lines_in, 1)
+                seconds_per_output_line = latency / lines_out
+                growth = lines_out / lines_in
+                size = target_latency / (seconds_per_output_line * growth)
+                size = min(max(size, lines_in / 2), lines_in * 2)
+
+        _append_size_hint(hints, start_line, end_line, int(min(max(size, min_lines), max_lines)))
+        covered = end_line
+
+    if covered < total_lines:
+        _append_size_hint(hints, covered + 1, total_lines, int(min(max(default_size, min_lines), max_lines)))
+    return hints
+
+
+def _append_size_hint(hints: list[tuple[int, int, int]], start_line: int, end_line: int, size: int) -> None:
+    """Append a size region, merging it into the previous one where allowed."""
+    if hints and hints[-1][1] == start_line - 1:
+        prev_start, prev_end, prev_size = hints[-1]
+        prev_length = prev_end - prev_start + 1
+        if prev_size == size or (prev_length < prev_size and max(prev_size, size) <= 2 * min(prev_size, size)):
+            hints[-1] = (prev_start, end_line, min(prev_size, size))
+            return
+    hints.append((start_line, end_line, size))
+
+
+# ============================================================================
+# CHUNK SCHEDULING
+# ============================================================================
+
+# Supported values of performance.growth_tuning.scheduler
+CHUNK_SCHEDULERS = ("file_order", "growth_yield")
+
+_PLACEHOLDER_RE = re.compile(
+    r"\b(?:TBD|TBA|TODO|FIXME|XXX)\b|\[(?:placeholder|insert|to be (?:defined|determined)|tbd)[^\]]*\]|^\s*[-*]\s*$|\.\.\.\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_OPEN_QUESTION_RE = re.compile(r"\[OPEN_QUESTION\]")
+
+
+class GrowthYieldModel:
+    """
+    Online linear model of expected line growth per model call.
+
+    Features are computed from the chunk text and its history (see
+    features()); the prediction is a dot product with learned weights. After
+    each call the realized growth (lines_out - lines_in, 0 on failure)
+    refines the weights with a normalized least-mean-squares step. The weights
+    are persisted in state["meta"]["growth"]["scheduler_model"].
+    """
+
+    FEATURES = (
+        "bias",
+        "lines_in",
+        "placeholder_density",
+        "open_question_density",
+        "past_growth",
+        "heading_depth",
+        "attempts",
+    )
+
+    # Prior weights: bigger, sparser chunks with placeholders and open
+    # questions grow most; chunks that barely grew or keep failing least.
+    DEFAULT_WEIGHTS = {
+        "bias": 2.0,
+        "lines_in": 4.0,
+        "placeholder_density": 40.0,
+        "open_question_density": 20.0,
+        "past_growth": 10.0,
+        "heading_depth": -2.0,
+        "attempts": -3.0,
+    }
+
+    def __init__(self, weights: typing.Optional[dict] = None, samples: int = 0, learning_rate: float = 0.1):
+        self.weights = dict(self.DEFAULT_WEIGHTS)
+        if weights:
+            self.weights.update({name: float(value) for name, value in weights.items() if name in self.weights})
+        self.samples = samples
+        self.learning_rate = learning_rate
+
+    @classmethod
+    def from_state(cls, config: Config, state: dict) -> "GrowthYieldModel":
+        """Load the model from growth metadata (or start from the priors)."""
+        saved = state["meta"].get("growth", {}).get("scheduler_model") or {}
+        learning_rate = float(get_growth_tuning(config).get("scheduler_learning_rate", 0.1))
+        return cls(saved.get("weights"), int(saved.get("samples", 0)), learning_rate)
+
+    def save(self, state: dict) -> None:
+        """Store the model in growth metadata."""
+        state["meta"].setdefault("growth", {})["scheduler_model"] = {
+            "weights": {name: round(value, 4) for name, value in self.weights.items()},
+            "samples": self.samples,
+        }
+
+    @staticmethod
+    def features(chunk: dict, chunk_text: str) -> dict:
+        """
+        Feature vector for one chunk.
+
+        Line counts are scaled to hundreds of lines and heading depth to 0..1,
+        so all features stay within a few units of each other.
+        """
+        lines = chunk_text.splitlines()
+        line_count = max(len(lines), 1)
+        heading_levels = [match.group(1) for match in map(_HEADING_RE.match, lines) if match]
+        metrics = chunk.get("metrics") or {}
+        past_growth = 0.0
+        if metrics.get("outcome") == "done" and metrics.get("lines_in"):
+            past_growth = (metrics.get("lines_out") or 0) / metrics["lines_in"] - 1.0
+        return {
+            "bias": 1.0,
+            "lines_in": line_count / 100.0,
+            "placeholder_density": len(_PLACEHOLDER_RE.findall(chunk_text)) / line_count,
+            "open_question_density": len(_OPEN_QUESTION_RE.findall(chunk_text)) / line_count,
+            "past_growth": past_growth,
+            "heading_depth": (min(len(level) for level in heading_levels) / 6.0) if heading_levels else 1.0,
+            "attempts": float(chunk.get("attempts", 0)),
+        }
+
+    def predict(self, features: dict) -> float:
+        """Expected lines gained by one call on a chunk with these features."""
+        return sum(self.weights[name] * features.get(name, 0.0) for name in self.FEATURES)
+
+    def update(self, features: dict, realized: float) -> float:
+        """
+        Refine the weights with one observation; returns the prediction error.
+        """
+        error = realized - self.predict(features)
+        norm = 1.0 + sum(features.get(name, 0.0) ** 2 for name in self.FEATURES)
+        step = self.learning_rate * error / norm
+        for name in self.FEATURES:
+            self.weights[name] += step * features.get(name, 0.0)
+        self.samples += 1
+        return error
+
+
+def get_scheduler_name(config: Config) -> str:
+    """Return performance.growth_tuning.scheduler (default: file_order)."""
+    return get_growth_tuning(config).get("scheduler", "file_order") or "file_order"
+
+
+def schedule_chunks(
+    config: Config,
+    state: dict,
+    candidates: list[dict],
+    document: "PrdDocument",
+    line_index: "ChunkLineIndex",
+) -> tuple[list[dict], typing.Optional[GrowthYieldModel], dict]:
+    """
+    Order candidate chunks for a pass.
+
+    file_order keeps document order. growth_yield scores every candidate with
+    the GrowthYieldModel and puts the highest expected lines-per-call first
+    (ties keep document order).
+
+    Returns:
+        Tuple of (ordered_candidates, model or None, features_by_chunk_id)
+    """
+    if get_scheduler_name(config) != "growth_yield" or len(candidates) < 2:
+        return list(candidates), None, {}
+
+    model = GrowthYieldModel.from_state(config, state)
+    features_by_id = {}
+    scored = []
+    for order, chunk in enumerate(candidates):
+        start_line, end_line = line_index.resolve(line_index.position_of(chunk["id"]))
+        if 1 <= start_line <= end_line <= len(document):
+            features = model.features(chunk, document.get_text(start_line, end_line))
+        else:
+            features = model.features(chunk, "")
+        features_by_id[chunk["id"]] = features
+        scored.append((-model.predict(features), order, chunk))
+    scored.sort(key=lambda item: (item[0], item[1]))
+    return [chunk for _, _, chunk in scored], model, features_by_id
 
 
 # ============================================================================
@@ -465,6 +1845,8 @@ def load_state(config: Config) -> typing.Optional[dict]:
     """
     Load state from .auto_state.json.
     
+    The snapshot is loaded first, then any chunk transitions recorded in the
+    state journal since that snapshot are replayed on top of it.
     Ensures backward compatibility by initializing growth metadata if missing.
     
     Returns:
@@ -478,6 +1860,8 @@ def load_state(config: Config) -> typing.Optional[dict]:
         with open(state_path, 'r') as f:
             state = json.load(f)
         
+        replay_state_journal(config, state)
+        
         # Ensure backward compatibility: initialize growth metadata if missing
         if "meta" in state and "growth" not in state["meta"]:
             state["meta"]["growth"] = {
@@ -504,47 +1888,85 @@ def load_state(config: Config) -> typing.Optional[dict]:
 
 def save_state(config: Config, state: dict) -> None:
     """
-    Save state to .auto_state.json.
+    Save a full state snapshot to .auto_state.json.
+    
+    The snapshot is written atomically and compacts the state journal: the
+    journal generation is bumped (so records written against the previous
+    snapshot are ignored even if the journal outlives this call) and the
+    journal file is removed.
     """
     state_path = pathlib.Path(config.state_path)
     
     # Update metadata
     if "meta" in state:
         state["meta"]["updated_at"] = datetime.datetime.now().isoformat()
+        state["meta"]["journal_generation"] = state["meta"].get("journal_generation", 0) + 1
     
+    temp_path = state_path.with_suffix(state_path.suffix + '.tmp')
+    started = time.perf_counter()
     try:
-        with open(state_path, 'w') as f:
-            json.dump(state, f, indent=2)
+        with stage_span("save_state"):
+            with open(temp_path, 'w') as f:
+                json.dump(state, f, indent=2)
+                f.flush()
+                written = os.fstat(f.fileno()).st_size
+            temp_path.replace(state_path)
+        perf_count("state_snapshot", time.perf_counter() - started, written)
     except Exception as e:
+        if temp_path.exists():
+            temp_path.unlink()
         log(f"ERROR: Failed to save state: {e}", {"step": "save_state"}, config)
         raise
+    
+    journal_path = get_state_journal_path(config)
+    if journal_path.exists():
+        try:
+            journal_path.unlink()
+        except OSError as e:
+            # Stale records carry the old generation and are skipped on replay
+            log(f"WARNING: Could not remove state journal: {e}", {"step": "save_state"}, config)
 
 
-def build_state_from_file(config: Config, growth_pass: int = 0, preserve_growth_meta: dict = None) -> dict:
+def build_state_from_file(
+    config: Config,
+    growth_pass: int = 0,
+    preserve_growth_meta: dict = None,
+    previous_chunks: typing.Optional[list[dict]] = None,
+    lines: typing.Optional[list[str]] = None,
+) -> dict:
     """
     Build state structure from prd.md by chunking it.
     
-    Uses fixed-line chunking strategy.
+    Chunk ranges come from plan_chunk_ranges() (config.chunk_strategy:
+    "fixed_lines" or "sections").
     
     Args:
         config: Config object
         growth_pass: Current growth pass number (for phase ID generation)
         preserve_growth_meta: Optional existing growth metadata to preserve
+        previous_chunks: Optional chunk table being replaced (with line ranges
+                         matching the current file); its latency metrics drive
+                         adaptive chunk sizing when enabled
+        lines: Optional current PRD lines (skips reading prd.md)
     
     Returns:
         State dict with meta and chunks array
     """
     prd_path = pathlib.Path(config.master_md_path)
     
-    if not prd_path.exists():
-        raise FileNotFoundError(f"PRD file not found: {prd_path}")
-    
-    # Read PRD file
-    with open(prd_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+    if lines is None:
+        if not prd_path.exists():
+            raise FileNotFoundError(f"PRD file not found: {prd_path}")
+        
+        # Read PRD file
+        with open(prd_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
     
     total_lines = len(lines)
     chunk_size = config.chunk_size_lines
+    content_digest = lines_sha256(lines)
+    size_hints = compute_chunk_size_hints(config, previous_chunks, total_lines)
+    hint_starts = [hint[0] for hint in size_hints] if size_hints else []
     
     # Build chunks
     chunks = []
@@ -555,9 +1977,7 @@ def build_state_from_file(config: Config, growth_pass: int = 0, preserve_growth_
     # If growth_pass is 0, use P1 (backward compatibility)
     pass_prefix = max(growth_pass, 1)
     
-    for i in range(0, total_lines, chunk_size):
-        start_line = i + 1  # 1-indexed
-        end_line = min(i + chunk_size, total_lines)
+    for start_line, end_line in plan_chunk_ranges(config, lines, content_digest, size_hints=size_hints):
         phase_id = f"P{pass_prefix}.{str(chunk_id).zfill(4)}"
         
         chunk = {
@@ -568,8 +1988,11 @@ def build_state_from_file(config: Config, growth_pass: int = 0, preserve_growth_
             "status": "pending",
             "attempts": 0,
             "last_error": None,
-            "last_updated_at": None
+            "last_updated_at": None,
+            "content_hash": hash_chunk_text("".join(lines[start_line - 1:end_line]))
         }
+        if size_hints:
+            chunk["target_lines"] = size_hints[bisect.bisect_right(hint_starts, start_line) - 1][2]
         
         chunks.append(chunk)
         chunk_id += 1
@@ -599,6 +2022,7 @@ def build_state_from_file(config: Config, growth_pass: int = 0, preserve_growth_
             "master_md_path": config.master_md_path,
             "total_lines": total_lines,
             "chunk_size_lines": chunk_size,
+            "chunk_strategy": config.chunk_strategy,
             "created_at": now,
             "updated_at": now,
             "version": 2,  # Bumped for growth metadata support
@@ -610,6 +2034,615 @@ def build_state_from_file(config: Config, growth_pass: int = 0, preserve_growth_
     return state
 
 
+def hash_chunk_text(text: str) -> str:
+    """Return the content hash stored on chunks (first 16 hex chars of sha256)."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def lines_sha256(lines: typing.Iterable[str]) -> str:
+    """Return the sha256 of the concatenated lines, hashed line by line (no joined copy)."""
+    digest = hashlib.sha256()
+    for line in lines:
+        digest.update(line.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def get_growth_tuning(config: Config) -> dict:
+    """Return performance.growth_tuning settings (empty dict if not configured)."""
+    performance = config._raw_data.get("performance", {}) if config._raw_data else {}
+    return performance.get("growth_tuning", {}) or {}
+
+
+def rechunk_state(
+    config: Config,
+    state: dict,
+    growth_pass: int,
+    lines: typing.Optional[list[str]] = None,
+) -> dict:
+    """
+    Re-chunk prd.md for a new growth pass, keeping chunks whose text is unchanged.
+
+    Every chunk carries a content_hash of its text (set when planned and when
+    its enhancement is applied). The current chunk table is checked against
+    prd.md: if the ranges tile the file and every hash matches, the table is
+    updated incrementally:
+    - pending/failed/running chunks keep their id, phase ID, status, attempts
+      and metrics (running becomes pending);
+    - done chunks whose last growth ratio (lines_out / lines_in) is below
+      performance.growth_tuning.saturation_growth_ratio stay done, so later
+      passes skip saturated regions;
+    - other done chunks (their text just grew) are re-planned as new pending
+      chunks with phase IDs for this pass, together with any adjacent pending
+      chunks that were never attempted.
+    Otherwise (legacy state without hashes, or prd.md edited outside the
+    automation) the state is rebuilt with build_state_from_file().
+
+    Args:
+        config: Config object
+        state: Current state dict (line ranges matching prd.md)
+        growth_pass: Growth pass number (for phase ID generation)
+        lines: Optional current PRD lines (skips reading prd.md)
+
+    Returns:
+        New state dict
+    """
+    preserve_growth = state["meta"].get("growth", {})
+    if lines is None:
+        prd_path = pathlib.Path(config.master_md_path)
+        with open(prd_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+
+    old_chunks = state.get("chunks", [])
+    fallback_reason = _check_chunk_hashes(old_chunks, lines)
+    if fallback_reason:
+        log(
+            f"Full re-chunk for pass {growth_pass}: {fallback_reason}",
+            {"step": "rechunk", "pass_index": growth_pass, "mode": "full"},
+            config
+        )
+        return build_state_from_file(
+            config, growth_pass=growth_pass, preserve_growth_meta=preserve_growth,
+            previous_chunks=old_chunks, lines=lines
+        )
+
+    saturation_ratio = float(get_growth_tuning(config).get("saturation_growth_ratio", 1.02))
+    content_digest = lines_sha256(lines)
+    pass_prefix = max(growth_pass, 1)
+    new_chunks: list[dict] = []
+    replan: list[dict] = []
+    kept = 0
+    saturated = 0
+    replanned = 0
+
+    def is_saturated(chunk: dict) -> bool:
+        metrics = chunk.get("metrics") or {}
+        return bool(
+            chunk["status"] == "done"
+            and metrics.get("outcome") == "done"
+            and metrics.get("lines_in")
+            and metrics.get("lines_out", 0) / metrics["lines_in"] < saturation_ratio
+        )
+
+    # Phase IDs of carried chunks stay valid; new chunks must not reuse them
+    carried_phase_ids = {
+        chunk["phase_id"] for chunk in old_chunks
+        if chunk["status"] != "done" or is_saturated(chunk)
+    }
+    phase_counter = itertools.count(1)
+
+    def next_phase_id() -> str:
+        while True:
+            phase_id = f"P{pass_prefix}.{str(next(phase_counter)).zfill(4)}"
+            if phase_id not in carried_phase_ids:
+                return phase_id
+
+    def flush_replan() -> None:
+        nonlocal replanned
+        if not replan:
+            return
+        first_line = replan[0]["start_line"]
+        last_line = replan[-1]["end_line"]
+        size_hints = compute_chunk_size_hints(config, replan, len(lines))
+        hint_starts = [hint[0] for hint in size_hints] if size_hints else []
+        for start_line, end_line in plan_chunk_ranges(
+            config, lines, content_digest, first_line=first_line, last_line=last_line, size_hints=size_hints
+        ):
+            chunk = {
+                "id": len(new_chunks) + 1,
+                "phase_id": next_phase_id(),
+                "start_line": start_line,
+                "end_line": end_line,
+                "status": "pending",
+                "attempts": 0,
+                "last_error": None,
+                "last_updated_at": None,
+                "content_hash": hash_chunk_text("".join(lines[start_line - 1:end_line]))
+            }
+            if size_hints:
+                chunk["target_lines"] = size_hints[bisect.bisect_right(hint_starts, start_line) - 1][2]
+            new_chunks.append(chunk)
+            replanned += 1
+        replan.clear()
+
+    def carry(chunk: dict) -> None:
+        nonlocal kept, saturated
+        carried = dict(chunk)
+        carried["id"] = len(new_chunks) + 1
+        if carried["status"] == "running":
+            carried["status"] = "pending"
+        new_chunks.append(carried)
+        if is_saturated(chunk):
+            saturated += 1
+        else:
+            kept += 1
+
+    # Pending chunks never attempted carry no history, so they are re-planned
+    # together with adjacent grown chunks; planning the run as a whole keeps
+    # chunk sizes near the target instead of leaving short fragments behind.
+    fresh: list[dict] = []
+    for chunk in old_chunks:
+        if chunk["status"] == "done" and not is_saturated(chunk):
+            replan.extend(fresh)
+            fresh.clear()
+            replan.append(chunk)
+            continue
+        if chunk["status"] == "pending" and not chunk.get("attempts"):
+            (replan if replan else fresh).append(chunk)
+            continue
+        flush_replan()
+        for fresh_chunk in fresh:
+            carry(fresh_chunk)
+        fresh.clear()
+        carry(chunk)
+    flush_replan()
+    for fresh_chunk in fresh:
+        carry(fresh_chunk)
+
+    now = datetime.datetime.now().isoformat()
+    meta = dict(state["meta"])
+    meta.update({
+        "master_md_path": config.master_md_path,
+        "total_lines": len(lines),
+        "chunk_size_lines": config.chunk_size_lines,
+        "chunk_strategy": config.chunk_strategy,
+        "updated_at": now,
+        "growth": preserve_growth,
+    })
+
+    log(
+        f"Incremental re-chunk for pass {growth_pass}: kept={kept} saturated={saturated} replanned={replanned}",
+        {"step": "rechunk", "pass_index": growth_pass, "mode": "incremental", "kept": kept, "saturated": saturated, "replanned": replanned},
+        config
+    )
+    return {"meta": meta, "chunks": new_chunks}
+
+
+def _check_chunk_hashes(chunks: list[dict], lines: list[str]) -> typing.Optional[str]:
+    """
+    Check that chunks tile the file and match their content hashes.
+
+    Returns:
+        None if the chunk table can be reused, else the reason it cannot
+    """
+    if not chunks:
+        return "no chunks"
+    expected_start = 1
+    for chunk in chunks:
+        if "content_hash" not in chunk:
+            return "state has no content hashes"
+        if chunk["start_line"] != expected_start or chunk["end_line"] < chunk["start_line"]:
+            return f"chunk {chunk['id']} range does not follow the previous chunk"
+        text = "".join(lines[chunk["start_line"] - 1:chunk["end_line"]])
+        if chunk["end_line"] > len(lines) or hash_chunk_text(text) != chunk["content_hash"]:
+            return f"chunk {chunk['id']} content changed outside the automation"
+        expected_start = chunk["end_line"] + 1
+    if expected_start != len(lines) + 1:
+        return "chunks do not cover the whole file"
+    return None
+
+
+class ChunkLineIndex:
+    """
+    Cumulative line-offset index over the chunk table.
+
+    When a chunk is replaced, every later chunk shifts by the replacement's
+    line delta. Instead of rewriting start_line/end_line on all later chunks,
+    the per-chunk deltas are kept in a Fenwick (binary indexed) tree keyed by
+    chunk position in state["chunks"] (file order). Applying an edit and
+    resolving a chunk's current range are both O(log n); real line numbers are
+    written back into the chunk dicts only by materialize().
+    """
+
+    def __init__(self, chunks: list[dict]):
+        self._chunks = chunks
+        self._size = len(chunks)
+        self._tree = [0] * (self._size + 1)
+        self._own_delta = [0] * self._size
+        self._base_start = [chunk["start_line"] for chunk in chunks]
+        self._base_end = [chunk["end_line"] for chunk in chunks]
+        self._position = {chunk["id"]: i for i, chunk in enumerate(chunks)}
+
+    def position_of(self, chunk_id: int) -> int:
+        """Return the position of a chunk id in the chunk table."""
+        return self._position[chunk_id]
+
+    def _prefix(self, position: int) -> int:
+        """Sum of deltas of all chunks before `position`."""
+        total = 0
+        i = position
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def resolve(self, position: int) -> tuple[int, int]:
+        """
+        Return the current (start_line, end_line) of the chunk at `position`.
+        """
+        shift = self._prefix(position)
+        start_line = self._base_start[position] + shift
+        end_line = self._base_end[position] + shift + self._own_delta[position]
+        return start_line, end_line
+
+    def apply_delta(self, position: int, line_diff: int) -> None:
+        """
+        Record that the chunk at `position` grew (or shrank) by line_diff lines.
+
+        The chunk's own end moves by line_diff and every later chunk shifts by
+        line_diff.
+        """
+        if line_diff == 0:
+            return
+        self._own_delta[position] += line_diff
+        i = position + 1
+        while i <= self._size:
+            self._tree[i] += line_diff
+            i += i & -i
+
+    def materialize(self) -> None:
+        """
+        Write current line numbers back into the chunk dicts (O(n)).
+        """
+        shift = 0
+        for position, chunk in enumerate(self._chunks):
+            chunk["start_line"] = self._base_start[position] + shift
+            shift += self._own_delta[position]
+            chunk["end_line"] = self._base_end[position] + shift
+
+
+def get_state_journal_path(config: Config) -> pathlib.Path:
+    """Return the path of the state journal that sits next to the state file."""
+    return pathlib.Path(config.state_path + ".journal")
+
+
+class StateJournal:
+    """
+    Append-only journal of chunk status transitions.
+
+    During a pass, each transition is appended as one JSON line instead of
+    rewriting the whole state file:
+
+        {"gen": 3, "chunk": 12, "status": "done", "attempts": 1,
+         "last_error": null, "last_updated_at": "...", "line_diff": 4,
+         "total_lines": 812}
+
+    "gen" is the journal generation of the snapshot the record applies to;
+    "line_diff" (only for applied edits) shifts the chunk's end and all later
+    chunks. save_state() compacts the journal into a new snapshot.
+    """
+
+    def __init__(self, config: Config, state: dict):
+        self.config = config
+        self.path = get_state_journal_path(config)
+        self.generation = state["meta"].get("journal_generation", 0)
+        self.records_written = 0
+        self._handle = None
+
+    def append(self, chunk: dict, line_diff: int = 0, total_lines: typing.Optional[int] = None) -> None:
+        """
+        Record the current status fields of a chunk.
+
+        Args:
+            chunk: Chunk dict after the transition
+            line_diff: Line count change applied to the chunk (edits only)
+            total_lines: Document line count after the transition
+        """
+        record = {
+            "gen": self.generation,
+            "chunk": chunk["id"],
+            "status": chunk["status"],
+            "attempts": chunk["attempts"],
+            "last_error": chunk["last_error"],
+            "last_updated_at": chunk["last_updated_at"],
+        }
+        if chunk.get("metrics"):
+            record["metrics"] = chunk["metrics"]
+        if chunk.get("content_hash"):
+            record["content_hash"] = chunk["content_hash"]
+        if line_diff:
+            record["line_diff"] = line_diff
+        if total_lines is not None:
+            record["total_lines"] = total_lines
+
+        started = time.perf_counter()
+        if self._handle is None:
+            self._handle = open(self.path, 'a', encoding='utf-8')
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        self._handle.write(line)
+        self._handle.flush()
+        self.records_written += 1
+        perf_count("state_journal", time.perf_counter() - started, len(line))
+
+    def close(self) -> None:
+        """Close the journal file handle (records stay on disk)."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def get_apply_log_path(config: Config) -> pathlib.Path:
+    """Return the path of the per-chunk apply log that sits next to the state file."""
+    return pathlib.Path(config.state_path + ".applylog")
+
+
+class ApplyLog:
+    """
+    Durable per-chunk checkpoint of edits applied to the in-memory PRD.
+
+    prd.md is only written at the end of a pass, so each chunk replacement is
+    first appended here and fsynced, before the state journal marks the chunk
+    done:
+
+        {"type": "base", "prd_digest": "...", "total_lines": 812}
+        {"type": "apply", "chunk": 3, "phase_id": "P1.0003", "start_line": 241,
+         "end_line": 360, "lines": [...], "line_diff": 4}
+        {"type": "commit", "prd_digest": "..."}
+
+    The base record holds the sha256 of prd.md as the pass started; the commit
+    record, written just before prd.md is replaced, holds the digest of the new
+    content. commit_prd_document() removes the log once prd.md is written, and
+    recover_interrupted_pass() uses a leftover log to replay or roll back.
+
+    Records are fsynced unless performance.growth_tuning.apply_log_fsync is
+    false; then they are only flushed, which still covers a killed process but
+    not a power loss.
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.path = get_apply_log_path(config)
+        self.records_written = 0
+        self.fsync = bool(get_growth_tuning(config).get("apply_log_fsync", True))
+        self._handle = None
+
+    def _write(self, record: dict) -> None:
+        started = time.perf_counter()
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        self._handle.write(line)
+        self._handle.flush()
+        if self.fsync:
+            os.fsync(self._handle.fileno())
+        perf_count("apply_log", time.perf_counter() - started, len(line))
+
+    def record_apply(self, document: "PrdDocument", chunk: dict, start_line: int, end_line: int,
+                     new_lines: list[str]) -> None:
+        """
+        Durably record a chunk replacement before it is applied to the document.
+
+        The first call of a pass also records the base digest of the document
+        (cached on the document, so it is usually the digest of the last commit).
+        """
+        if self._handle is None:
+            self._handle = open(self.path, 'w', encoding='utf-8')
+            self._write({
+                "type": "base",
+                "prd_digest": document.digest(),
+                "total_lines": len(document),
+            })
+        self._write({
+            "type": "apply",
+            "chunk": chunk["id"],
+            "phase_id": chunk["phase_id"],
+            "start_line": start_line,
+            "end_line": end_line,
+            "lines": new_lines,
+            "line_diff": len(new_lines) - (end_line - start_line + 1),
+        })
+        self.records_written += 1
+
+    def close(self) -> None:
+        """Close the file handle (the log stays until prd.md is committed)."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def commit_prd_document(config: Config, prd_path: pathlib.Path, document: "PrdDocument") -> str:
+    """
+    Write the document to prd.md and retire the apply log.
+
+    A commit record with the new content digest is fsynced to the apply log
+    first, so a crash between the two steps is recognised on recovery.
+
+    Returns:
+        sha256 of the written content
+    """
+    digest = document.digest()
+    apply_log_path = get_apply_log_path(config)
+    if apply_log_path.exists():
+        with open(apply_log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"type": "commit", "prd_digest": digest}, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    started = time.perf_counter()
+    with stage_span("write_prd", lines=len(document)):
+        atomic_write_file(prd_path, document.iter_lines())
+    perf_count("prd_write", time.perf_counter() - started, prd_path.stat().st_size)
+    if apply_log_path.exists():
+        apply_log_path.unlink()
+    return digest
+
+
+def recover_interrupted_pass(config: Config, command_name: str) -> typing.Optional[str]:
+    """
+    Bring prd.md and state back to a consistent point after a crash mid-pass.
+
+    Uses the apply log left behind by an interrupted pass:
+    - "committed": prd.md already holds the new content (crash after the write);
+    - "replayed": prd.md still matches the base digest; the recorded chunk
+      replacements are replayed onto it and written;
+    - "abandoned": prd.md matches neither (edited outside the automation);
+      recorded edits are dropped.
+    For committed/replayed logs, recorded chunks that the state journal had not
+    yet marked done are marked done (with their line shifts). For abandoned
+    logs, recorded chunks the journal already marked done go back to pending
+    and their line shifts are undone. In all cases
+    chunks left "running" are rolled back to "pending" and state is saved.
+
+    Returns:
+        Recovery outcome, or None if there was nothing to recover
+    """
+    apply_log_path = get_apply_log_path(config)
+    if not apply_log_path.exists():
+        return None
+
+    records = []
+    with open(apply_log_path, 'r', encoding='utf-8') as f:
+        for raw in f:
+            try:
+                records.append(json.loads(raw))
+            except json.JSONDecodeError:
+                break  # Truncated trailing record (crash mid-append)
+
+    base = records[0] if records and records[0].get("type") == "base" else None
+    applies = [record for record in records if record.get("type") == "apply"]
+    commits = [record for record in records if record.get("type") == "commit"]
+
+    prd_path = pathlib.Path(config.master_md_path)
+    state = load_state(config)
+    if base is None or state is None or not prd_path.exists():
+        apply_log_path.unlink()
+        return None
+
+    with open(prd_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    disk_digest = lines_sha256(lines)
+
+    if commits and disk_digest == commits[-1]["prd_digest"]:
+        outcome = "committed"
+    elif disk_digest == base["prd_digest"]:
+        outcome = "replayed"
+        document = PrdDocument(lines)
+        for record in applies:
+            document.replace_lines(record["start_line"], record["end_line"], record["lines"])
+        atomic_write_file(prd_path, document.iter_lines())
+        state["meta"]["total_lines"] = len(document)
+    else:
+        outcome = "abandoned"
+
+    reconciled = 0
+    if outcome != "abandoned":
+        chunks_by_id = {chunk["id"]: chunk for chunk in state["chunks"]}
+        line_index = ChunkLineIndex(state["chunks"])
+        now = datetime.datetime.now().isoformat()
+        for record in applies:
+            chunk = chunks_by_id.get(record["chunk"])
+            if chunk is None or chunk["phase_id"] != record["phase_id"] or chunk["status"] == "done":
+                continue
+            line_index.apply_delta(line_index.position_of(chunk["id"]), record["line_diff"])
+            chunk["status"] = "done"
+            chunk["last_error"] = None
+            chunk["last_updated_at"] = now
+            chunk["content_hash"] = hash_chunk_text("".join(record["lines"]))
+            reconciled += 1
+        line_index.materialize()
+    else:
+        # The journal may already have marked some recorded chunks done; their
+        # content never reached prd.md, so undo their line shifts and retry them.
+        chunks_by_id = {chunk["id"]: chunk for chunk in state["chunks"]}
+        line_index = ChunkLineIndex(state["chunks"])
+        for record in applies:
+            chunk = chunks_by_id.get(record["chunk"])
+            if chunk is None or chunk["phase_id"] != record["phase_id"] or chunk["status"] != "done":
+                continue
+            line_index.apply_delta(line_index.position_of(chunk["id"]), -record["line_diff"])
+            chunk["status"] = "pending"
+            chunk.pop("content_hash", None)
+            reconciled += 1
+        line_index.materialize()
+
+    rolled_back = 0
+    for chunk in state["chunks"]:
+        if chunk["status"] == "running":
+            chunk["status"] = "pending"
+            rolled_back += 1
+
+    save_state(config, state)
+    apply_log_path.unlink()
+
+    log(
+        f"Recovered interrupted pass ({outcome}): applied_chunks={len(applies)} reconciled={reconciled} rolled_back={rolled_back}",
+        {"command": command_name, "step": "recover_pass", "outcome": outcome, "applied_chunks": len(applies), "reconciled": reconciled, "rolled_back": rolled_back},
+        config
+    )
+    if outcome == "abandoned":
+        log(
+            "WARNING: prd.md changed outside the automation since the interrupted pass; its unwritten chunk results were dropped",
+            {"command": command_name, "step": "recover_pass"},
+            config
+        )
+    return outcome
+
+
+def replay_state_journal(config: Config, state: dict) -> int:
+    """
+    Apply journal records for the current snapshot generation to state.
+
+    A truncated trailing record (crash mid-append) is ignored.
+
+    Returns:
+        Number of records replayed
+    """
+    journal_path = get_state_journal_path(config)
+    if not journal_path.exists() or "meta" not in state:
+        return 0
+
+    generation = state["meta"].get("journal_generation", 0)
+    chunks_by_id = {chunk["id"]: chunk for chunk in state.get("chunks", [])}
+    line_index = ChunkLineIndex(state.get("chunks", []))
+    replayed = 0
+
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for raw in f:
+            try:
+                record = json.loads(raw)
+            except json.JSONDecodeError:
+                break
+            if record.get("gen") != generation:
+                continue
+            chunk = chunks_by_id.get(record.get("chunk"))
+            if chunk is None:
+                continue
+            for field in ("status", "attempts", "last_error", "last_updated_at", "metrics", "content_hash"):
+                if field in record:
+                    chunk[field] = record[field]
+            if record.get("line_diff"):
+                line_index.apply_delta(line_index.position_of(chunk["id"]), record["line_diff"])
+            if "total_lines" in record:
+                state["meta"]["total_lines"] = record["total_lines"]
+            state["meta"]["updated_at"] = record.get("last_updated_at") or state["meta"].get("updated_at")
+            replayed += 1
+
+    line_index.materialize()
+    if replayed:
+        log(
+            f"Replayed {replayed} state journal record(s)",
+            {"step": "load_state", "journal_records": replayed},
+            config
+        )
+    return replayed
+
+
 # ============================================================================
 # PRD SKELETON CREATION
 # ============================================================================
@@ -1463,30 +3496,175 @@ Each micro-task should be described using the following template:
   - [RISK] Persona may be too generic; ensure specificity through examples
 ```
 
----
+---
+
+## 8.4 Automation Integration Notes
+
+The automation system (auto_master.py) uses these templates and frameworks to:
+
+1. **Generate Enhancement Prompts**: When processing a chunk, the system can select an appropriate role and prompt template based on the section being enhanced.
+
+2. **Track Phase Progress**: Phase IDs are used to track which sections have been enhanced and to what depth.
+
+3. **Plan Future Enhancements**: The task framework helps identify what needs to be done next and in what order.
+
+4. **Ensure Consistency**: Using canonical templates ensures all enhancements follow consistent patterns and quality standards.
+
+5. **Support Multi-Role Collaboration**: Different roles can enhance the same section from different perspectives, building comprehensive coverage.
+
+---
+
+<!-- PROMPT_TEMPLATES_END -->"""
+
+
+# ============================================================================
+# PROMPT BUILDING
+# ============================================================================
+
+# Version of the static enhancement prompt prefix - bump whenever
+# ENHANCE_PROMPT_PREFIX changes so providers drop stale prefix caches
+ENHANCE_PROMPT_PREFIX_VERSION = 2
+
+ENHANCE_PROMPT_PREFIX = f"""You are an AI assistant helping to enhance a Product Requirements Document (PRD).
+[enhance-prompt-prefix v{ENHANCE_PROMPT_PREFIX_VERSION}]
+
+CONTEXT:
+- This is part of the Omni-Corp Automation System described in Section 2 (Omni-Corp Master Role Library) and Section 8 (Prompt Library & Agent Playbook) of prd.md.
+- The chunk at the end of this prompt is a direct copy/paste of a line range of prd.md; its Phase ID and line numbers are given with it.
+
+ROLE AWARENESS:
+- You may implicitly use any roles from the Omni-Corp Master Role Library (Section 2) to reason about this chunk.
+- Consider which roles would be most relevant (e.g., CPO for product strategy, CTO for technical architecture, UI/UX Lead for design sections).
+- Apply the expertise and perspective of relevant roles, but output only improved markdown for this chunk.
+- Reference the prompt templates in Section 8 for guidance on how to approach enhancement.
+
+CRITICAL RULES:
+1. DO NOT skip or ignore any lines from the original chunk.
+2. DO NOT delete information; only enhance, refactor, and expand.
+3. Preserve all existing content while adding clarity and detail.
+4. Label new assumptions with [ASSUMPTION], open questions with [OPEN_QUESTION], and risks with [RISK].
+5. Maintain markdown formatting and structure.
+6. Use general, universal language (avoid project-specific file names or tools unless essential).
+
+YOUR TASK:
+Read the chunk below carefully and enhance it by:
+- Expanding on brief descriptions with relevant detail
+- Adding more detail where placeholders exist
+- Clarifying ambiguous statements
+- Adding relevant context, examples, or analysis from appropriate role perspectives
+- Identifying edge cases, risks, or open questions where relevant
+- Preserving all original information
+
+Please return your enhanced version wrapped in these markers:
+
+<<<IMPROVED_CHUNK_START>>>
+[Your enhanced markdown here]
+<<<IMPROVED_CHUNK_END>>>
+
+The enhanced chunk should be longer or equal in length to the original, with more detail and clarity.
 
-## 8.4 Automation Integration Notes
+"""
 
-The automation system (auto_master.py) uses these templates and frameworks to:
+ENHANCE_PROMPT_PREFIX_HASH = hashlib.sha256(ENHANCE_PROMPT_PREFIX.encode('utf-8')).hexdigest()[:16]
 
-1. **Generate Enhancement Prompts**: When processing a chunk, the system can select an appropriate role and prompt template based on the section being enhanced.
 
-2. **Track Phase Progress**: Phase IDs are used to track which sections have been enhanced and to what depth.
+def estimate_tokens(text: str) -> int:
+    """
+    Rough local token count (~4 characters per token), for reporting only.
+    """
+    return (len(text) + 3) // 4
 
-3. **Plan Future Enhancements**: The task framework helps identify what needs to be done next and in what order.
 
-4. **Ensure Consistency**: Using canonical templates ensures all enhancements follow consistent patterns and quality standards.
+def build_enhance_prompt_parts(
+    config: Config,
+    chunk_text: str,
+    phase_id: str,
+    start_line: int,
+    end_line: int,
+) -> dict:
+    """
+    Build an enhancement prompt as a static prefix plus a per-chunk suffix.
 
-5. **Support Multi-Role Collaboration**: Different roles can enhance the same section from different perspectives, building comprehensive coverage.
+    The prefix is identical for every chunk (versioned by
+    ENHANCE_PROMPT_PREFIX_VERSION), so backends with prompt/KV prefix caching
+    can reuse it across calls; its hash identifies it to providers. Everything
+    that varies per chunk (Phase ID, line numbers, chunk text) is in the suffix.
+
+    Args:
+        config: Config object
+        chunk_text: The text content of the chunk
+        phase_id: Phase identifier (e.g., "P1.0001")
+        start_line: Starting line number (1-indexed)
+        end_line: Ending line number (1-indexed)
+
+    Returns:
+        {"prefix": str, "suffix": str, "prefix_hash": str, "prefix_version": int}
+    """
+    suffix = f"""CHUNK TO ENHANCE:
+- Phase ID: {phase_id}
+- Lines: {start_line}-{end_line} of prd.md
 
+ORIGINAL CHUNK (lines {start_line}-{end_line}):
+---
+{chunk_text}
 ---
 
-<!-- PROMPT_TEMPLATES_END -->"""
+Return only the enhanced chunk, wrapped in the markers above.
+"""
+    return {
+        "prefix": ENHANCE_PROMPT_PREFIX,
+        "suffix": suffix,
+        "prefix_hash": ENHANCE_PROMPT_PREFIX_HASH,
+        "prefix_version": ENHANCE_PROMPT_PREFIX_VERSION,
+    }
 
 
-# ============================================================================
-# PROMPT BUILDING
-# ============================================================================
+def build_enhance_batch_prompt_parts(config: Config, items: list[dict]) -> dict:
+    """
+    Build one prompt that asks for several adjacent chunks at once.
+
+    Uses the same static prefix as build_enhance_prompt_parts(); the suffix
+    lists every chunk and asks for each one to be returned between its own
+    numbered markers (see batch_chunk_markers()), so the response can be split
+    back into per-chunk results.
+
+    Args:
+        config: Config object
+        items: Chunks in document order, each {"chunk_text", "phase_id", "start_line", "end_line"}
+
+    Returns:
+        {"prefix": str, "suffix": str, "prefix_hash": str, "prefix_version": int}
+    """
+    first_start, last_end = batch_chunk_markers(len(items))
+    sections = [
+        f"""BATCH OF {len(items)} CHUNKS TO ENHANCE:
+- Enhance each chunk independently, following all rules above.
+- Instead of the single markers above, wrap the enhanced version of chunk N
+  in <<<IMPROVED_CHUNK_N_START>>> and <<<IMPROVED_CHUNK_N_END>>>
+  (e.g. {first_start} ... {last_end} for the last chunk).
+- Return every chunk, in order, even if you change little in it.
+"""
+    ]
+    for index, item in enumerate(items, start=1):
+        start_line = item["start_line"]
+        end_line = item["end_line"]
+        sections.append(f"""CHUNK {index}:
+- Phase ID: {item["phase_id"]}
+- Lines: {start_line}-{end_line} of prd.md
+
+ORIGINAL CHUNK {index} (lines {start_line}-{end_line}):
+---
+{item["chunk_text"]}
+---
+""")
+    sections.append("Return only the enhanced chunks, each wrapped in its numbered markers.\n")
+    return {
+        "prefix": ENHANCE_PROMPT_PREFIX,
+        "suffix": "\n".join(sections),
+        "prefix_hash": ENHANCE_PROMPT_PREFIX_HASH,
+        "prefix_version": ENHANCE_PROMPT_PREFIX_VERSION,
+    }
+
 
 def build_enhance_prompt(
     config: Config,
@@ -1499,7 +3677,8 @@ def build_enhance_prompt(
     Build an enhancement prompt for a chunk.
     
     This prompt references the Omni-Corp Master Role Library and Prompt Templates
-    defined in Section 2 and Section 8 of prd.md.
+    defined in Section 2 and Section 8 of prd.md. It is the static prefix followed
+    by the per-chunk suffix from build_enhance_prompt_parts().
     
     Args:
         config: Config object
@@ -1511,55 +3690,86 @@ def build_enhance_prompt(
     Returns:
         Complete prompt string
     """
-    prompt = f"""You are an AI assistant helping to enhance a Product Requirements Document (PRD).
+    parts = build_enhance_prompt_parts(config, chunk_text, phase_id, start_line, end_line)
+    return parts["prefix"] + parts["suffix"]
 
-CONTEXT:
-- This is part of the Omni-Corp Automation System described in Section 2 (Omni-Corp Master Role Library) and Section 8 (Prompt Library & Agent Playbook) of prd.md.
-- The text below is a direct copy/paste from lines {start_line}-{end_line} of prd.md.
-- Phase ID: {phase_id}
 
-ROLE AWARENESS:
-- You may implicitly use any roles from the Omni-Corp Master Role Library (Section 2) to reason about this chunk.
-- Consider which roles would be most relevant (e.g., CPO for product strategy, CTO for technical architecture, UI/UX Lead for design sections).
-- Apply the expertise and perspective of relevant roles, but output only improved markdown for this chunk.
-- Reference the prompt templates in Section 8 for guidance on how to approach enhancement.
+# ============================================================================
+# AI INTERACTION (STEP 3: Cursor Integration + Fallback)
+# ============================================================================
 
-CRITICAL RULES:
-1. DO NOT skip or ignore any lines from the original chunk.
-2. DO NOT delete information; only enhance, refactor, and expand.
-3. Preserve all existing content while adding clarity and detail.
-4. Label new assumptions with [ASSUMPTION], open questions with [OPEN_QUESTION], and risks with [RISK].
-5. Maintain markdown formatting and structure.
-6. Use general, universal language (avoid project-specific file names or tools unless essential).
+def _fake_model_response(
+    chunk_text: str,
+    phase_id: str,
+    start_line: int,
+    end_line: int,
+    marker_index: typing.Optional[int] = None,
+) -> str:
+    """
+    Build the fake-mode response: the original chunk echoed between markers
+    (numbered markers when marker_index is given, for batched prompts).
+    """
+    # Create a fake "enhanced" version
+    enhanced_lines = [
+        f"> [LOCAL-STUB] Phase {phase_id} (lines {start_line}-{end_line}) – No Cursor driver. Echoing original chunk for testing.",
+        "",
+        chunk_text.rstrip(),
+        "",
+        f"<!-- Enhanced by automation system (fake mode) at {datetime.datetime.now().isoformat()} -->"
+    ]
+    
+    enhanced_text = "\n".join(enhanced_lines)
+    
+    # Wrap with markers
+    if marker_index is None:
+        start_marker, end_marker = "<<<IMPROVED_CHUNK_START>>>", "<<<IMPROVED_CHUNK_END>>>"
+    else:
+        start_marker, end_marker = batch_chunk_markers(marker_index)
+    response = f"""{start_marker}
+{enhanced_text}
+{end_marker}
+"""
+    return response
 
-YOUR TASK:
-Read the chunk below carefully and enhance it by:
-- Expanding on brief descriptions with relevant detail
-- Adding more detail where placeholders exist
-- Clarifying ambiguous statements
-- Adding relevant context, examples, or analysis from appropriate role perspectives
-- Identifying edge cases, risks, or open questions where relevant
-- Preserving all original information
 
-ORIGINAL CHUNK (lines {start_line}-{end_line}):
----
-{chunk_text}
----
+def get_benchmark_settings(config: Config) -> dict:
+    """Return performance.benchmark settings (empty dict if not configured)."""
+    performance = config._raw_data.get("performance", {}) if config._raw_data else {}
+    return performance.get("benchmark", {}) or {}
 
-Please return your enhanced version wrapped in these markers:
 
-<<<IMPROVED_CHUNK_START>>>
-[Your enhanced markdown here]
-<<<IMPROVED_CHUNK_END>>>
+def simulate_fake_latency(config: Config) -> None:
+    """
+    Sleep for performance.benchmark.fake_latency_seconds (fake mode only), so
+    benchmarks can model provider round-trips with the deterministic stub.
+    """
+    latency = float(get_benchmark_settings(config).get("fake_latency_seconds", 0) or 0)
+    if latency > 0:
+        time.sleep(latency)
 
-The enhanced chunk should be longer or equal in length to the original, with more detail and clarity.
-"""
-    return prompt
 
+def _fake_code_response(prompt: str, phase_id: str, file_count: int, generated_dir: str) -> str:
+    """
+    Build a canned multi-file implementation response (fake mode, enabled by
+    performance.benchmark.fake_code_files_per_task): file_count CODE_FILE
+    blocks under generated_dir, named after the task ID in the prompt.
+    """
+    task_match = re.search(r"Task ID:\s*(\S+)", prompt)
+    task_slug = (task_match.group(1) if task_match else "task").lower().replace("-", "_")
+    phase_slug = "phase_" + phase_id.replace(".", "_")
+    blocks = []
+    for index in range(1, file_count + 1):
+        name = f"{task_slug}_{index}"
+        blocks.append(
+            f'<<<CODE_FILE_START path="{generated_dir}/{phase_slug}/{name}.ts">>>\n'
+            f"// Stub module {index} for {task_slug} (phase {phase_id})\n"
+            f"export interface {name.title().replace('_', '')}Input {{\n  id: string;\n  payload: Record<string, unknown>;\n}}\n\n"
+            f"export function handle{name.title().replace('_', '')}(input: {name.title().replace('_', '')}Input): string {{\n"
+            f"  return `${{input.id}}:{phase_id}`;\n}}\n"
+            "<<<CODE_FILE_END>>>\n"
+        )
+    return "\n".join(blocks)
 
-# ============================================================================
-# AI INTERACTION (STEP 3: Cursor Integration + Fallback)
-# ============================================================================
 
 def send_to_model(
     prompt: str,
@@ -1568,7 +3778,8 @@ def send_to_model(
     start_line: int,
     end_line: int,
     wait_seconds: int = 60,
-    config: Config = None
+    config: Config = None,
+    prefix_hash: typing.Optional[str] = None
 ) -> str:
     """
     Send a prompt to the AI model and return the response transcript.
@@ -1593,12 +3804,53 @@ def send_to_model(
         end_line: Ending line number
         wait_seconds: How long to wait for response
         config: Config object (must have use_cursor_driver and cursor_driver_path)
+        prefix_hash: Optional hash of the static prompt prefix (see
+                     build_enhance_prompt_parts()); logged with the call
     
     Returns:
         Response transcript (should contain markers for parsing)
     
+    Every call passes the performance.ai_usage gate (rate limits and token
+    budget, see UsageGate) first and is accounted to it afterwards.
+    
     Raises:
         RuntimeError: If Cursor mode fails or transcript is empty
+        BudgetExceeded: If enforced usage limits refuse the call
+    """
+    if config is None:
+        raise ValueError("Config is required")
+    
+    gate = get_usage_gate(config)
+    reservation = gate.acquire(
+        describe_model_target(config)[0], prompt,
+        {"phase_id": phase_id, "step": "usage_gate"}
+    )
+    try:
+        response = _send_to_model_unmetered(
+            prompt, chunk_text, phase_id, start_line, end_line, wait_seconds, config, prefix_hash
+        )
+    except Exception:
+        gate.settle(reservation, None, outcome="error")
+        raise
+    gate.settle(reservation, response)
+    return response
+
+
+def _send_to_model_unmetered(
+    prompt: str,
+    chunk_text: str,
+    phase_id: str,
+    start_line: int,
+    end_line: int,
+    wait_seconds: int = 60,
+    config: Config = None,
+    prefix_hash: typing.Optional[str] = None
+) -> str:
+    """
+    send_to_model() without the usage gate: fake stub or Cursor driver call.
+
+    The Cursor driver only takes the whole prompt, so prefix_hash is recorded
+    in the mode log line rather than handed to the backend.
     """
     if config is None:
         raise ValueError("Config is required")
@@ -1610,32 +3862,20 @@ def send_to_model(
         # FAKE MODE: Local stub for testing
         log(
             f"[mode=fake] use_cursor_driver=false; returning stubbed improved chunk",
-            {"step": "send_to_model_mode"},
+            {"step": "send_to_model_mode", "prefix_hash": prefix_hash or "-"},
             config
         )
         
-        # Create a fake "enhanced" version
-        enhanced_lines = [
-            f"> [LOCAL-STUB] Phase {phase_id} (lines {start_line}-{end_line}) – No Cursor driver. Echoing original chunk for testing.",
-            "",
-            chunk_text.rstrip(),
-            "",
-            f"<!-- Enhanced by automation system (fake mode) at {datetime.datetime.now().isoformat()} -->"
-        ]
-        
-        enhanced_text = "\n".join(enhanced_lines)
-        
-        # Wrap with markers
-        response = f"""<<<IMPROVED_CHUNK_START>>>
-{enhanced_text}
-<<<IMPROVED_CHUNK_END>>>
-"""
-        return response
+        simulate_fake_latency(config)
+        code_files = int(get_benchmark_settings(config).get("fake_code_files_per_task", 0) or 0)
+        if code_files > 0 and "<<<CODE_FILE_START" in prompt:
+            return _fake_code_response(prompt, phase_id, code_files, config.implementation.generated_dir)
+        return _fake_model_response(chunk_text, phase_id, start_line, end_line)
     
     # CURSOR MODE: Real integration via AppleScript
     log(
         f"[mode=cursor] use_cursor_driver=true; calling cursor_driver.scpt",
-        {"step": "send_to_model_mode"},
+        {"step": "send_to_model_mode", "prefix_hash": prefix_hash or "-"},
         config
     )
     
@@ -1755,10 +3995,966 @@ def send_to_model(
         raise RuntimeError(error_msg) from e
 
 
+def stream_model_response(
+    prompt: str,
+    chunk_text: str,
+    phase_id: str,
+    start_line: int,
+    end_line: int,
+    wait_seconds: int = 60,
+    config: Config = None,
+    prefix_hash: typing.Optional[str] = None,
+    batch_items: typing.Optional[list[dict]] = None
+) -> typing.Iterator[str]:
+    """
+    Streaming counterpart of send_to_model(): yields the response in pieces.
+
+    Callers may stop iterating (and close() the generator) as soon as they
+    have what they need or decide to abort; no further output is produced.
+    Fake mode yields the stub response line by line. The Cursor driver hands
+    back a complete transcript via the clipboard, so it is yielded as a single
+    piece.
+
+    Args:
+        Same as send_to_model(), plus:
+        prefix_hash: Hash of the static prompt prefix (prompt[:len(prefix)]),
+                     for backends that can reuse a cached prompt/KV prefix
+        batch_items: For batched prompts, the chunks in the batch (as passed to
+                     build_enhance_batch_prompt_parts()); fake mode answers
+                     each with numbered markers
+
+    Yields:
+        Response text pieces
+    """
+    if config is None:
+        raise ValueError("Config is required")
+
+    if not getattr(config, 'use_cursor_driver', False):
+        log(
+            "[mode=fake] use_cursor_driver=false; streaming stubbed improved chunk",
+            {"step": "send_to_model_mode", "prefix_hash": prefix_hash or "-"},
+            config
+        )
+        gate = get_usage_gate(config)
+        reservation = gate.acquire("fake", prompt, {"phase_id": phase_id, "step": "usage_gate"})
+        simulate_fake_latency(config)
+        if batch_items:
+            response = "".join(
+                _fake_model_response(item["chunk_text"], item["phase_id"], item["start_line"], item["end_line"], index)
+                for index, item in enumerate(batch_items, start=1)
+            )
+        else:
+            response = _fake_model_response(chunk_text, phase_id, start_line, end_line)
+        gate.settle(reservation, response)
+        yield from response.splitlines(keepends=True)
+        return
+
+    yield send_to_model(prompt, chunk_text, phase_id, start_line, end_line, wait_seconds, config, prefix_hash)
+
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+class ResponseCache:
+    """
+    Persistent content-addressed cache of validated model responses.
+
+    Entries are keyed by sha256(provider | model | prompt) and stored one JSON
+    file per entry under `<path>/<key[:2]>/<key>.json`, so a retry, a resume or
+    a re-chunked pass that produces an identical prompt costs no model call.
+    Only responses that passed validation are stored. Entries older than
+    max_age_days are treated as misses and removed; when the cache grows past
+    max_entries or max_size_mb the oldest entries are evicted first.
+
+    Hit/miss counters are kept in memory and added to `<path>/stats.json` by
+    flush_stats(); `status` reports the cumulative totals.
+    """
+
+    STATS_FILE = "stats.json"
+
+    def __init__(self, config: Config, settings: dict):
+        self.config = config
+        self.root = pathlib.Path(settings.get("path", ".auto_cache/responses"))
+        self.max_entries = int(settings.get("max_entries", 5000))
+        self.max_bytes = int(float(settings.get("max_size_mb", 200)) * 1024 * 1024)
+        self.max_age_seconds = float(settings.get("max_age_days", 30)) * 86400
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._index: typing.Optional[dict] = None  # key -> (mtime, size)
+        self._total_bytes = 0
+
+    @staticmethod
+    def make_key(provider: str, model: str, prompt: str) -> str:
+        """Return the cache key for a (provider, model, prompt) triple."""
+        digest = hashlib.sha256()
+        for part in (provider, model, prompt):
+            digest.update(part.encode('utf-8'))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _load_index(self) -> dict:
+        """Scan the cache directory once; later lookups use the in-memory index."""
+        if self._index is not None:
+            return self._index
+        self._index = {}
+        self._total_bytes = 0
+        if self.root.exists():
+            for bucket in os.scandir(self.root):
+                if not bucket.is_dir():
+                    continue
+                for entry in os.scandir(bucket.path):
+                    if not entry.name.endswith(".json"):
+                        continue
+                    stat = entry.stat()
+                    self._index[entry.name[:-5]] = (stat.st_mtime, stat.st_size)
+                    self._total_bytes += stat.st_size
+        return self._index
+
+    def _remove(self, key: str) -> None:
+        mtime, size = self._index.pop(key, (0, 0))
+        self._total_bytes -= size
+        try:
+            self._entry_path(key).unlink()
+        except OSError:
+            pass
+
+    def get(self, key: str) -> typing.Optional[str]:
+        """Return the cached response for key, or None on a miss."""
+        with self._lock:
+            index = self._load_index()
+            meta = index.get(key)
+            if meta is not None and time.time() - meta[0] > self.max_age_seconds:
+                self._remove(key)
+                self.evictions += 1
+                meta = None
+            if meta is None:
+                self.misses += 1
+                return None
+            try:
+                with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                    response = json.load(f)["response"]
+            except (OSError, ValueError, KeyError):
+                self._remove(key)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return response
+
+    def put(self, key: str, response: str, provider: str, model: str) -> None:
+        """Store a validated response and evict old entries if over the limits."""
+        record = {
+            "key": key,
+            "provider": provider,
+            "model": model,
+            "created_at": datetime.datetime.now().isoformat(),
+            "response": response,
+        }
+        data = json.dumps(record)
+        with self._lock:
+            index = self._load_index()
+            path = self._entry_path(key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = path.with_suffix(".tmp")
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                temp_path.replace(path)
+            except OSError as e:
+                log(f"WARNING: Could not write response cache entry: {e}", {"step": "response_cache"}, self.config)
+                return
+            if key in index:
+                self._total_bytes -= index[key][1]
+            size = len(data.encode('utf-8'))
+            index[key] = (time.time(), size)
+            self._total_bytes += size
+            self.stores += 1
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the oldest ones until within limits."""
+        if len(self._index) <= self.max_entries and self._total_bytes <= self.max_bytes:
+            return
+        now = time.time()
+        for key, (mtime, _) in list(self._index.items()):
+            if now - mtime > self.max_age_seconds:
+                self._remove(key)
+                self.evictions += 1
+        if len(self._index) <= self.max_entries and self._total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][0]):
+            if len(self._index) <= self.max_entries and self._total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+            self.evictions += 1
+
+    def summary(self) -> dict:
+        """Return cumulative counters (persisted totals plus this run) and size."""
+        totals = self.read_stats(self.root)
+        with self._lock:
+            index = self._load_index()
+            return {
+                "hits": totals.get("hits", 0) + self.hits,
+                "misses": totals.get("misses", 0) + self.misses,
+                "stores": totals.get("stores", 0) + self.stores,
+                "evictions": totals.get("evictions", 0) + self.evictions,
+                "entries": len(index),
+                "size_bytes": self._total_bytes,
+            }
+
+    @classmethod
+    def read_stats(cls, root: pathlib.Path) -> dict:
+        """Read persisted counters from the stats file (empty dict if absent)."""
+        try:
+            with open(root / cls.STATS_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def flush_stats(self) -> None:
+        """Add this run's counters to the persisted totals and reset them."""
+        with self._lock:
+            if not (self.hits or self.misses or self.stores or self.evictions):
+                return
+            totals = self.read_stats(self.root)
+            for name in ("hits", "misses", "stores", "evictions"):
+                totals[name] = totals.get(name, 0) + getattr(self, name)
+                setattr(self, name, 0)
+            totals["updated_at"] = datetime.datetime.now().isoformat()
+            try:
+                self.root.mkdir(parents=True, exist_ok=True)
+                with open(self.root / self.STATS_FILE, 'w') as f:
+                    json.dump(totals, f, indent=2)
+            except OSError as e:
+                log(f"WARNING: Could not write response cache stats: {e}", {"step": "response_cache"}, self.config)
+
+
+_response_caches: dict = {}
+_response_caches_lock = threading.Lock()
+
+
+def get_response_cache_settings(config: Config) -> dict:
+    """Return performance.response_cache settings (empty dict if not configured)."""
+    performance = config._raw_data.get("performance", {}) if config._raw_data else {}
+    return performance.get("response_cache", {}) or {}
+
+
+def get_response_cache(config: Config, use_cache: bool = True,
+                       provider: typing.Optional[str] = None) -> typing.Optional[ResponseCache]:
+    """
+    Return the shared ResponseCache for this config, or None when caching is off.
+
+    Caching is off when use_cache is False (--no-cache), when
+    performance.response_cache.enabled is false, or for the fake provider
+    unless cache_fake_mode is set (stub responses cost nothing to regenerate).
+
+    Args:
+        config: Config object
+        use_cache: False to bypass the cache
+        provider: Provider the response comes from (default: describe_model_target())
+    """
+    if not use_cache:
+        return None
+    settings = get_response_cache_settings(config)
+    if not settings.get("enabled", False):
+        return None
+    if provider is None:
+        provider = describe_model_target(config)[0]
+    if provider == "fake" and not settings.get("cache_fake_mode", False):
+        return None
+
+    root = str(pathlib.Path(settings.get("path", ".auto_cache/responses")).resolve())
+    with _response_caches_lock:
+        cache = _response_caches.get(root)
+        if cache is None:
+            cache = ResponseCache(config, settings)
+            _response_caches[root] = cache
+            atexit.register(cache.flush_stats)
+        return cache
+
+
+def describe_model_target(config: Config) -> tuple[str, str]:
+    """
+    Return the (provider, model) pair send_to_model will talk to, for cache keys.
+    """
+    if not getattr(config, 'use_cursor_driver', False):
+        return "fake", "local-stub"
+    ai_config = config._raw_data.get("ai", {}) if config._raw_data else {}
+    cursor_config = ai_config.get("providers", {}).get("cursor", {})
+    return "cursor", str(cursor_config.get("model", "default"))
+
+
+# ============================================================================
+# RETRY POLICY
+# ============================================================================
+
+# Error kinds used by the retry policy and circuit breaker
+ERROR_KINDS = (
+    "timeout", "provider_error", "parse_error", "aborted", "too_short",
+    "too_large", "budget", "circuit_open", "error",
+)
+
+DEFAULT_RETRY_POLICY = {
+    "enabled": True,
+    "max_attempts_per_call": 3,
+    "base_delay_seconds": 2.0,
+    "max_delay_seconds": 60.0,
+    "retry_on": ["timeout", "provider_error", "parse_error"],
+    "max_attempts_per_chunk": 3,
+    "circuit_breaker": {
+        "failure_threshold": 5,
+        "cooldown_seconds": 120,
+        "count_kinds": ["timeout", "provider_error", "parse_error"],
+    },
+    "wait_for_circuit": True,
+    "max_circuit_waits_per_run": 3,
+}
+
+
+class ModelResponseError(ValueError):
+    """A model response that was received but rejected; `kind` says why."""
+
+    def __init__(self, message: str, kind: str):
+        super().__init__(message)
+        self.kind = kind
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+    def __init__(self, provider: str, retry_in_seconds: float):
+        super().__init__(f"Circuit open for provider {provider}; retry in {retry_in_seconds:.0f}s")
+        self.provider = provider
+        self.retry_in_seconds = retry_in_seconds
+
+
+def classify_model_error(error: BaseException) -> str:
+    """
+    Map an exception from a model call to one of ERROR_KINDS.
+    """
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, ModelResponseError):
+        return error.kind
+    if isinstance(error, BudgetExceeded):
+        return "too_large" if error.scope == "call" else "budget"
+    if isinstance(error, (TimeoutError, subprocess.TimeoutExpired)) or "timed out" in str(error).lower():
+        return "timeout"
+    if isinstance(error, (RuntimeError, OSError)):
+        return "provider_error"
+    return "error"
+
+
+def get_retry_policy(config: Config) -> dict:
+    """Return performance.retry_policy merged over DEFAULT_RETRY_POLICY."""
+    performance = config._raw_data.get("performance", {}) if config._raw_data else {}
+    configured = performance.get("retry_policy", {}) or {}
+    policy = {**DEFAULT_RETRY_POLICY, **configured}
+    policy["circuit_breaker"] = {**DEFAULT_RETRY_POLICY["circuit_breaker"], **(configured.get("circuit_breaker") or {})}
+    return policy
+
+
+def retry_backoff_seconds(policy: dict, attempt: int) -> float:
+    """
+    Delay before retry number `attempt` (1-based): exponential backoff with full jitter.
+    """
+    ceiling = min(float(policy["max_delay_seconds"]), float(policy["base_delay_seconds"]) * (2 ** (attempt - 1)))
+    return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    After failure_threshold consecutive failures of the counted kinds the
+    circuit opens and calls are refused (CircuitOpenError) until
+    cooldown_seconds have passed; then a single trial call is let through
+    (half-open). Its success closes the circuit, its failure re-opens it.
+    Thread-safe, since parallel chunk workers share one breaker.
+    """
+
+    def __init__(self, provider: str, failure_threshold: int = 5, cooldown_seconds: float = 120,
+                 count_kinds: typing.Iterable[str] = ("timeout", "provider_error", "parse_error")):
+        self.provider = provider
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown_seconds = float(cooldown_seconds)
+        self.count_kinds = set(count_kinds)
+        self.state = "closed"  # closed | open | half_open
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a trial call through (0 if not open)."""
+        with self._lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self.opened_at + self.cooldown_seconds - time.monotonic())
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may be made now."""
+        with self._lock:
+            if self.state == "open":
+                remaining = self.opened_at + self.cooldown_seconds - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(self.provider, remaining)
+                self.state = "half_open"
+            elif self.state == "half_open":
+                # Only one trial call at a time
+                raise CircuitOpenError(self.provider, 0.0)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+
+    def record_failure(self, kind: str) -> bool:
+        """
+        Count a failed call. Returns True if this failure opened the circuit.
+        """
+        with self._lock:
+            if kind not in self.count_kinds:
+                if self.state == "half_open":
+                    self.state = "closed"
+                return False
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(config: Config, provider: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for a provider."""
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(provider)
+        if breaker is None:
+            settings = get_retry_policy(config)["circuit_breaker"]
+            breaker = CircuitBreaker(
+                provider,
+                failure_threshold=settings["failure_threshold"],
+                cooldown_seconds=settings["cooldown_seconds"],
+                count_kinds=settings["count_kinds"],
+            )
+            _circuit_breakers[provider] = breaker
+        return breaker
+
+
+def call_with_retry(
+    config: Config,
+    provider: str,
+    call: typing.Callable[[], typing.Any],
+    context: typing.Optional[dict] = None,
+    metrics: typing.Optional[dict] = None,
+) -> typing.Any:
+    """
+    Run a model call under the retry policy and the provider's circuit breaker.
+
+    Failures whose kind is in retry_on are retried up to max_attempts_per_call
+    with exponential backoff and jitter; anything else is raised at once. Every
+    outcome is reported to the circuit breaker, and no call is made while the
+    circuit is open (CircuitOpenError). If `metrics` is given, "retries" is
+    set to the number of retries made.
+
+    Args:
+        config: Config object
+        provider: Provider name (circuit breaker key)
+        call: Zero-argument function making one attempt
+        context: Logging context
+        metrics: Optional dict for call metrics
+
+    Returns:
+        The result of the first successful attempt
+    """
+    policy = get_retry_policy(config)
+    context = context or {}
+    if not policy.get("enabled", True):
+        return call()
+
+    breaker = get_circuit_breaker(config, provider)
+    max_attempts = max(1, int(policy["max_attempts_per_call"]))
+    attempt = 1
+    while True:
+        breaker.before_call()
+        try:
+            result = call()
+        except Exception as e:
+            kind = classify_model_error(e)
+            if breaker.record_failure(kind):
+                log(
+                    f"Circuit opened for provider {provider} after {breaker.consecutive_failures} failure(s) (cooldown {breaker.cooldown_seconds:.0f}s)",
+                    {**context, "step": "circuit_open", "provider": provider, "error_kind": kind},
+                    config
+                )
+            if kind not in policy["retry_on"] or attempt >= max_attempts or breaker.state == "open":
+                raise
+            delay = retry_backoff_seconds(policy, attempt)
+            log(
+                f"Attempt {attempt}/{max_attempts} failed ({kind}: {e}); retrying in {delay:.1f}s",
+                {**context, "step": "retry", "provider": provider, "error_kind": kind},
+                config
+            )
+            time.sleep(delay)
+            attempt += 1
+            if metrics is not None:
+                metrics["retries"] = attempt - 1
+            continue
+        breaker.record_success()
+        return result
+
+
+def decide_chunk_failure(config: Config, error: BaseException, attempts: int) -> tuple[str, str]:
+    """
+    Decide what happens to a chunk whose processing failed.
+
+    Returns:
+        Tuple of (decision, error_kind) where decision is:
+        - "halt": stop the pass (the provider's circuit is open, or the
+          run/day usage budget is spent)
+        - "defer": leave the chunk pending for a later pass
+        - "fail": mark the chunk failed (max_attempts_per_chunk reached, or
+          the prompt is over max_tokens_per_call, which no retry can change)
+    """
+    kind = classify_model_error(error)
+    policy = get_retry_policy(config)
+    if kind in ("circuit_open", "budget"):
+        return "halt", kind
+    if kind == "too_large":
+        return "fail", kind
+    if attempts < int(policy["max_attempts_per_chunk"]):
+        return "defer", kind
+    return "fail", kind
+
+
+# ============================================================================
+# USAGE LIMITS (RATE LIMITING & TOKEN BUDGET)
+# ============================================================================
+
+try:
+    import fcntl  # POSIX only; without it the daily ledger is not locked across processes
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+class BudgetExceeded(RuntimeError):
+    """
+    A model call was refused by performance.ai_usage limits.
+
+    scope is "call" (prompt over max_tokens_per_call), "run"
+    (max_calls_per_run reached) or "day" (soft_budget_tokens_per_day spent).
+    """
+
+    def __init__(self, message: str, scope: str, provider: typing.Optional[str] = None):
+        super().__init__(message)
+        self.scope = scope
+        self.provider = provider
+
+
+def get_ai_usage_settings(config: Config) -> dict:
+    """Return performance.ai_usage settings (empty dict if not configured)."""
+    performance = config._raw_data.get("performance", {}) if config._raw_data else {}
+    return performance.get("ai_usage", {}) or {}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at rate_per_minute.
+
+    acquire() blocks until the requested amount is available; consume()
+    debits without waiting (the balance may go negative, delaying later
+    acquires), for costs only known after a call.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: typing.Optional[float] = None):
+        self.rate_per_second = float(rate_per_minute) / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate_per_second)
+        self.updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Take `amount` (capped at capacity), waiting as needed. Returns seconds waited."""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate_per_second
+            time.sleep(delay)
+            waited += delay
+
+    def consume(self, amount: float) -> None:
+        with self._lock:
+            self._refill()
+            self.tokens -= float(amount)
+
+
+class DailyTokenLedger:
+    """
+    Tokens and calls spent today, shared by every run on this machine.
+
+    Stored as a small JSON file ({"date", "tokens", "calls"}) that is
+    read-modify-written under an exclusive flock, so concurrent grows add up
+    correctly. The counters reset when the date changes.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+
+    def update(self, tokens: int = 0, calls: int = 0, limit: typing.Optional[int] = None) -> tuple[bool, dict]:
+        """
+        Add tokens/calls unless that would exceed `limit` tokens for today.
+
+        Returns:
+            Tuple of (applied, today's totals after the update)
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        today = datetime.date.today().isoformat()
+        with open(self.path, "a+", encoding="utf-8") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    data = json.loads(f.read() or "{}")
+                except json.JSONDecodeError:
+                    data = {}
+                if data.get("date") != today:
+                    data = {"date": today, "tokens": 0, "calls": 0}
+                if limit is not None and tokens > 0 and data["tokens"] + tokens > limit:
+                    return False, data
+                data["tokens"] = max(0, data["tokens"] + tokens)
+                data["calls"] = max(0, data["calls"] + calls)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(data))
+                f.flush()
+                return True, data
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def read(self) -> dict:
+        """Today's totals (zeros if nothing was spent today)."""
+        today = datetime.date.today().isoformat()
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        if data.get("date") != today:
+            return {"date": today, "tokens": 0, "calls": 0}
+        return data
+
+
+def read_lines_reverse(path: pathlib.Path, block_size: int = 65536) -> typing.Iterator[str]:
+    """
+    Yield the lines of a text file from last to first, without newlines.
+
+    Reads fixed-size blocks backwards from the end, so a caller that stops
+    early (e.g. once records fall outside a time window) only pays for the
+    tail it consumed, not for the whole file. Empty lines are skipped.
+    """
+    for _, raw in _read_raw_lines_reverse(path, block_size):
+        yield raw.decode("utf-8", errors="replace")
+
+
+def _read_raw_lines_reverse(path: pathlib.Path, block_size: int = 65536) -> typing.Iterator[tuple[int, bytes]]:
+    """Yield (byte offset, raw line) for the non-empty lines of a file, last to first."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size) + remainder
+            parts = block.split(b"\n")
+            # The first part may be cut mid-line; keep it for the next block
+            remainder = parts[0]
+            end = position + len(block)
+            for raw in reversed(parts[1:]):
+                end -= len(raw) + 1
+                if raw:
+                    yield end + 1, raw
+        if remainder:
+            yield 0, remainder
+
+
+# Identifies this process's records in the usage ledger (set by main)
+_usage_run_context = {
+    "run_id": f"{datetime.datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}",
+    "command": "-",
+}
+
+
+def set_usage_run_context(command: str) -> None:
+    """Record which command this process runs, for usage ledger records."""
+    _usage_run_context["command"] = command
+
+
+class UsageLedger:
+    """
+    Append-only JSONL record of every model call (performance.ai_usage.usage_ledger_path).
+
+    One compact line per call:
+    {"t": epoch seconds, "run": run id, "cmd": command, "id": chunk/task id,
+     "provider", "model", "pc"/"rc": prompt/response chars,
+     "pt"/"rt": estimated prompt/response tokens, "lat": latency seconds,
+     "out": "ok" | "error", "metered": whether the call counted towards
+     the performance.ai_usage limits (fake-mode calls do not by default)}
+    Records are appended in time order, so windowed queries read the file
+    backwards (read_lines_reverse) and stop at the window start.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, record: dict) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            except OSError as e:
+                print(f"Warning: Could not write usage ledger: {e}", file=sys.stderr)
+
+    def read_since(self, since_epoch: typing.Optional[float] = None) -> list[dict]:
+        """
+        Records with t >= since_epoch (all records if None), oldest first.
+        """
+        records = []
+        for line in read_lines_reverse(self.path):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn trailing write
+            if since_epoch is not None and record.get("t", 0) < since_epoch:
+                break
+            records.append(record)
+        records.reverse()
+        return records
+
+
+def get_usage_ledger(config: Config) -> typing.Optional[UsageLedger]:
+    """Return the usage ledger, or None when performance.ai_usage.track_usage is false."""
+    settings = get_ai_usage_settings(config)
+    if not settings.get("track_usage", True):
+        return None
+    return UsageLedger(pathlib.Path(settings.get("usage_ledger_path", ".auto_cache/usage.jsonl")))
+
+
+class UsageGate:
+    """
+    Central rate limiter and budget gate in front of every model call.
+
+    Settings come from performance.ai_usage:
+    - calls_per_minute / tokens_per_minute: pace calls with token buckets
+      (unset = no pacing)
+    - max_tokens_per_call, max_calls_per_run, soft_budget_tokens_per_day:
+      limits checked before each call; the day budget is tracked in a
+      DailyTokenLedger at ledger_path, shared across runs and processes
+    - enforce_limits: if false, limits are only logged; if true, a call over
+      a limit raises BudgetExceeded (callers decide whether to fail or, per
+      budget_exhausted_action "degrade", fall back to stub behavior)
+
+    Fake-mode calls are not limited unless limit_fake_mode is set. Every
+    call, fake or not, is recorded in the UsageLedger when settled.
+    """
+
+    # Tokens reserved for the response before it is known, as a multiple of
+    # the prompt estimate; corrected when the call is settled
+    RESPONSE_RESERVE_RATIO = 1.0
+
+    def __init__(self, config: Config):
+        self.config = config
+        settings = get_ai_usage_settings(config)
+        self.settings = settings
+        self.enforce = bool(settings.get("enforce_limits", False))
+        self.max_tokens_per_call = settings.get("max_tokens_per_call")
+        self.max_calls_per_run = settings.get("max_calls_per_run")
+        self.day_budget = settings.get("soft_budget_tokens_per_day")
+        self.limit_fake_mode = bool(settings.get("limit_fake_mode", False))
+        self.call_bucket = TokenBucket(settings["calls_per_minute"]) if settings.get("calls_per_minute") else None
+        self.token_bucket = TokenBucket(settings["tokens_per_minute"]) if settings.get("tokens_per_minute") else None
+        self.ledger = DailyTokenLedger(pathlib.Path(settings.get("ledger_path", ".auto_cache/token_ledger.json")))
+        self.usage_ledger = get_usage_ledger(config)
+        self.calls_this_run = 0
+        self.tokens_this_run = 0
+        self._warned: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _over_limit(self, scope: str, message: str, provider: str, context: dict) -> None:
+        if self.enforce:
+            log(
+                f"Usage limit reached: {message}",
+                {**context, "step": "budget_exceeded", "scope": scope, "provider": provider},
+                self.config
+            )
+            raise BudgetExceeded(message, scope, provider)
+        if scope not in self._warned:
+            self._warned.add(scope)
+            log(
+                f"WARNING: {message} (enforce_limits=false, continuing)",
+                {**context, "step": "budget_warning", "scope": scope, "provider": provider},
+                self.config
+            )
+
+    def acquire(self, provider: str, prompt: str, context: typing.Optional[dict] = None) -> dict:
+        """
+        Check limits and wait for rate-limit capacity before a call.
+
+        Returns:
+            Reservation to pass to settle() once the call has finished
+
+        Raises:
+            BudgetExceeded: If enforce_limits is on and a limit would be exceeded
+        """
+        context = context or {}
+        prompt_tokens = estimate_tokens(prompt)
+        reservation = {
+            "provider": provider,
+            "id": context.get("chunk") or context.get("task_type") or context.get("phase_id") or "-",
+            "prompt_chars": len(prompt),
+            "prompt_tokens": prompt_tokens,
+            "reserved": 0,
+            "metered": False,
+            "started": time.monotonic(),
+        }
+        if provider == "fake" and not self.limit_fake_mode:
+            return reservation
+
+        if self.max_tokens_per_call and prompt_tokens > int(self.max_tokens_per_call):
+            self._over_limit(
+                "call", f"prompt ~{prompt_tokens} tokens exceeds max_tokens_per_call={self.max_tokens_per_call}",
+                provider, context
+            )
+        with self._lock:
+            if self.max_calls_per_run and self.calls_this_run >= int(self.max_calls_per_run):
+                self._over_limit("run", f"max_calls_per_run={self.max_calls_per_run} reached", provider, context)
+            self.calls_this_run += 1
+
+        reserved = int(prompt_tokens * (1 + self.RESPONSE_RESERVE_RATIO))
+        limit = int(self.day_budget) if (self.day_budget and self.enforce) else None
+        applied, today = self.ledger.update(tokens=reserved, calls=1, limit=limit)
+        if not applied:
+            with self._lock:
+                self.calls_this_run -= 1
+            self._over_limit(
+                "day", f"soft_budget_tokens_per_day={self.day_budget} spent ({today['tokens']} tokens today)",
+                provider, context
+            )
+        elif self.day_budget and today["tokens"] > int(self.day_budget):
+            self._over_limit(
+                "day", f"soft_budget_tokens_per_day={self.day_budget} exceeded ({today['tokens']} tokens today)",
+                provider, context
+            )
+        waited = 0.0
+        if self.call_bucket is not None:
+            waited += self.call_bucket.acquire(1)
+        if self.token_bucket is not None:
+            waited += self.token_bucket.acquire(prompt_tokens)
+        if waited >= 0.5:
+            log(
+                f"Rate limit: waited {waited:.1f}s before calling {provider}",
+                {**context, "step": "rate_limit", "provider": provider},
+                self.config
+            )
+        reservation.update(reserved=reserved, metered=True, started=time.monotonic())
+        return reservation
+
+    def settle(self, reservation: dict, response: typing.Optional[str], outcome: str = "ok") -> int:
+        """
+        Record the actual usage of a call made under `reservation`.
+
+        Args:
+            reservation: As returned by acquire()
+            response: Response text (None if the call failed)
+            outcome: "ok" or "error", for the usage ledger
+
+        Returns:
+            Estimated tokens used (prompt + response)
+        """
+        response_tokens = estimate_tokens(response or "")
+        used = reservation["prompt_tokens"] + response_tokens
+        if self.usage_ledger is not None:
+            provider = reservation["provider"]
+            self.usage_ledger.append({
+                "t": round(time.time(), 3),
+                "run": _usage_run_context["run_id"],
+                "cmd": _usage_run_context["command"],
+                "id": reservation["id"],
+                "provider": provider,
+                "model": describe_model_target(self.config)[1] if provider in ("fake", "cursor") else provider,
+                "pc": reservation["prompt_chars"],
+                "rc": len(response or ""),
+                "pt": reservation["prompt_tokens"],
+                "rt": response_tokens,
+                "lat": round(time.monotonic() - reservation["started"], 3),
+                "out": outcome,
+                "metered": bool(reservation.get("metered")),
+            })
+        if not reservation.get("metered"):
+            return used
+        with self._lock:
+            self.tokens_this_run += used
+        if self.token_bucket is not None and response_tokens:
+            self.token_bucket.consume(response_tokens)
+        if used != reservation["reserved"]:
+            self.ledger.update(tokens=used - reservation["reserved"])
+        return used
+
+
+_usage_gates: dict[int, UsageGate] = {}
+_usage_gates_lock = threading.Lock()
+
+
+def get_usage_gate(config: Config) -> UsageGate:
+    """Return the process-wide UsageGate for this config."""
+    with _usage_gates_lock:
+        gate = _usage_gates.get(id(config))
+        if gate is None:
+            gate = UsageGate(config)
+            _usage_gates[id(config)] = gate
+        return gate
+
+
 # ============================================================================
 # RESPONSE PARSING
 # ============================================================================
 
+def batch_chunk_markers(index: int) -> tuple[str, str]:
+    """
+    Return the (start, end) markers for chunk `index` (1-based) of a batched prompt.
+    """
+    return f"<<<IMPROVED_CHUNK_{index}_START>>>", f"<<<IMPROVED_CHUNK_{index}_END>>>"
+
+
 def parse_enhanced_chunk(response: str) -> typing.Optional[str]:
     """
     Parse the enhanced chunk from AI response.
@@ -1771,45 +4967,389 @@ def parse_enhanced_chunk(response: str) -> typing.Optional[str]:
     Returns:
         Enhanced chunk text (without markers) or None if parsing fails
     """
-    start_marker = "<<<IMPROVED_CHUNK_START>>>"
-    end_marker = "<<<IMPROVED_CHUNK_END>>>"
-    
-    start_idx = response.find(start_marker)
-    end_idx = response.find(end_marker)
-    
-    if start_idx == -1 or end_idx == -1:
-        return None
-    
-    if start_idx >= end_idx:
-        return None
-    
-    # Extract content between markers
-    content = response[start_idx + len(start_marker):end_idx].strip()
-    return content
+    parser = ImprovedChunkStreamParser()
+    parser.feed(response)
+    return parser.result()
+
+
+# Minimum body allowance (chars) on top of max_growth_ratio, so short chunks
+# are not aborted for a few added lines
+STREAM_GROWTH_SLACK_CHARS = 2048
+
+
+class ImprovedChunkStreamParser:
+    """
+    Incremental parser for <<<IMPROVED_CHUNK_START>>> ... <<<IMPROVED_CHUNK_END>>>.
+
+    Pieces are fed as they arrive. Text before the start marker is discarded
+    (only a marker-length tail is kept so markers split across pieces are
+    found); the body is accumulated until the end marker. Parsing stops early
+    (aborted) when the end marker appears before the start marker, or when the
+    body grows past max_body_chars.
+
+    With marker_index set, the numbered markers of a batched response are
+    parsed instead (<<<IMPROVED_CHUNK_<n>_START>>> ... <<<IMPROVED_CHUNK_<n>_END>>>).
+    """
+
+    START_MARKER = "<<<IMPROVED_CHUNK_START>>>"
+    END_MARKER = "<<<IMPROVED_CHUNK_END>>>"
+
+    def __init__(self, max_body_chars: typing.Optional[int] = None, marker_index: typing.Optional[int] = None):
+        self.max_body_chars = max_body_chars
+        if marker_index is None:
+            self.start_marker, self.end_marker = self.START_MARKER, self.END_MARKER
+        else:
+            self.start_marker, self.end_marker = batch_chunk_markers(marker_index)
+        self.state = "preamble"  # preamble | body | done | aborted
+        self.error: typing.Optional[str] = None
+        self._pending = ""
+        self._body_parts: list[str] = []
+        self._body_chars = 0
+
+    @classmethod
+    def for_chunk(
+        cls,
+        config: Config,
+        chunk_text: str,
+        marker_index: typing.Optional[int] = None,
+    ) -> "ImprovedChunkStreamParser":
+        """
+        Create a parser whose body limit follows performance.growth_tuning.max_growth_ratio.
+        """
+        max_growth_ratio = get_growth_tuning(config).get("max_growth_ratio")
+        if not max_growth_ratio:
+            return cls(marker_index=marker_index)
+        limit = max(int(len(chunk_text) * float(max_growth_ratio)), len(chunk_text) + STREAM_GROWTH_SLACK_CHARS)
+        return cls(max_body_chars=limit, marker_index=marker_index)
+
+    @property
+    def finished(self) -> bool:
+        """True once no more input is needed (complete or aborted)."""
+        return self.state in ("done", "aborted")
+
+    def _abort(self, reason: str) -> None:
+        self.state = "aborted"
+        self.error = reason
+        self._body_parts = []
+        self._pending = ""
+
+    def _append_body(self, text: str) -> None:
+        if text:
+            self._body_parts.append(text)
+            self._body_chars += len(text)
+        if self.max_body_chars is not None and self._body_chars > self.max_body_chars:
+            self._abort(
+                f"response body exceeds {self.max_body_chars} chars (max_growth_ratio)"
+            )
+
+    def feed(self, piece: str) -> bool:
+        """
+        Consume the next piece of the response.
+
+        Returns:
+            True if parsing is finished (done or aborted)
+        """
+        if self.finished:
+            return True
+        text = self._pending + piece
+        self._pending = ""
+
+        if self.state == "preamble":
+            start_idx = text.find(self.start_marker)
+            end_idx = text.find(self.end_marker)
+            if end_idx != -1 and (start_idx == -1 or end_idx < start_idx):
+                self._abort("end marker before start marker")
+                return True
+            if start_idx == -1:
+                keep = max(len(self.start_marker), len(self.end_marker)) - 1
+                self._pending = text[-keep:]
+                return False
+            text = text[start_idx + len(self.start_marker):]
+            self.state = "body"
+
+        end_idx = text.find(self.end_marker)
+        if end_idx == -1:
+            keep = len(self.end_marker) - 1
+            split = max(len(text) - keep, 0)
+            self._pending = text[split:]
+            self._append_body(text[:split])
+            return self.finished
+
+        self._append_body(text[:end_idx])
+        if not self.finished:
+            self.state = "done"
+        return True
+
+    def result(self) -> typing.Optional[str]:
+        """Return the stripped body, or None unless the end marker was reached."""
+        if self.state != "done":
+            return None
+        return "".join(self._body_parts).strip()
+
+
+# ============================================================================
+# DOCUMENT MODEL
+# ============================================================================
+
+class PrdDocument:
+    """
+    Line-oriented piece table holding prd.md during enhancement passes.
+
+    The lines read from disk stay in an immutable original buffer and
+    replacement lines are appended to an add buffer. The document itself is a
+    sequence of pieces (buffer, start, length), each referencing a run of lines
+    in one buffer. Replacing a line range splits at most two pieces and swaps
+    the pieces in between for a single new piece, so edits cost O(pieces)
+    rather than O(lines). Piece start offsets are cached for bisect lookups.
+    """
+
+    _ORIGINAL = 0
+    _ADD = 1
+
+    def __init__(self, lines: typing.Optional[list[str]] = None):
+        original = lines if lines is not None else []
+        self._buffers = [original, []]
+        self._pieces: list[tuple[int, int, int]] = []
+        if original:
+            self._pieces.append((self._ORIGINAL, 0, len(original)))
+        self._starts: list[int] = []
+        self._line_count = 0
+        self._digest: typing.Optional[str] = None  # None: not computed since the last edit
+        self._reindex(0)
+
+    @classmethod
+    def from_file(cls, path: pathlib.Path) -> "PrdDocument":
+        """Load a document from a UTF-8 text file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.readlines())
+
+    def __len__(self) -> int:
+        return self._line_count
+
+    def _reindex(self, from_piece: int) -> None:
+        """Recompute cached piece start offsets from `from_piece` onwards."""
+        del self._starts[from_piece:]
+        offset = 0
+        if from_piece > 0:
+            _, _, prev_length = self._pieces[from_piece - 1]
+            offset = self._starts[from_piece - 1] + prev_length
+        for _, _, length in self._pieces[from_piece:]:
+            self._starts.append(offset)
+            offset += length
+        self._line_count = offset
+
+    def _split(self, offset: int) -> int:
+        """
+        Ensure a piece boundary at 0-based line `offset`.
+
+        Returns:
+            Index of the piece starting at `offset` (len(pieces) at end of document)
+        """
+        if offset >= self._line_count:
+            return len(self._pieces)
+        i = bisect.bisect_right(self._starts, offset) - 1
+        piece_start = self._starts[i]
+        if piece_start == offset:
+            return i
+        buffer_id, start, length = self._pieces[i]
+        head = offset - piece_start
+        self._pieces[i:i + 1] = [(buffer_id, start, head), (buffer_id, start + head, length - head)]
+        self._starts.insert(i + 1, offset)
+        return i + 1
+
+    def get_lines(self, start_line: int, end_line: int) -> list[str]:
+        """
+        Return lines start_line..end_line (1-indexed, inclusive).
+        """
+        lo = max(start_line - 1, 0)
+        hi = min(end_line, self._line_count)
+        result: list[str] = []
+        if lo >= hi:
+            return result
+        i = bisect.bisect_right(self._starts, lo) - 1
+        while lo < hi and i < len(self._pieces):
+            buffer_id, start, length = self._pieces[i]
+            piece_start = self._starts[i]
+            take_from = lo - piece_start
+            take_to = min(length, hi - piece_start)
+            result.extend(self._buffers[buffer_id][start + take_from:start + take_to])
+            lo = piece_start + take_to
+            i += 1
+        return result
+
+    def get_text(self, start_line: int, end_line: int) -> str:
+        """
+        Return lines start_line..end_line (1-indexed, inclusive) as one string.
+        """
+        return "".join(self.get_lines(start_line, end_line))
+
+    def replace_lines(self, start_line: int, end_line: int, new_lines: list[str]) -> int:
+        """
+        Replace lines start_line..end_line (1-indexed, inclusive) with new_lines.
+
+        Returns:
+            Line count change (len(new_lines) - replaced line count)
+        """
+        started = time.perf_counter()
+        lo = start_line - 1
+        hi = end_line
+        first = self._split(lo)
+        last = self._split(hi)
+
+        replacement = []
+        if new_lines:
+            add_buffer = self._buffers[self._ADD]
+            replacement.append((self._ADD, len(add_buffer), len(new_lines)))
+            add_buffer.extend(new_lines)
+
+        self._pieces[first:last] = replacement
+        self._reindex(first)
+        self._digest = None
+        perf_count("document_edit", time.perf_counter() - started, sum(len(line) for line in new_lines))
+        return len(new_lines) - (hi - lo)
+
+    def iter_lines(self) -> typing.Iterator[str]:
+        """
+        Yield every line in document order without building a joined copy.
+        """
+        for buffer_id, start, length in self._pieces:
+            yield from self._buffers[buffer_id][start:start + length]
+
+    def to_lines(self) -> list[str]:
+        """Return the document as a plain list of lines."""
+        return list(self.iter_lines())
+
+    def digest(self) -> str:
+        """
+        Return the sha256 of the document text, cached until the next edit.
+        """
+        if self._digest is None:
+            self._digest = lines_sha256(self.iter_lines())
+        return self._digest
+
+
+class GrowWorkspace:
+    """
+    In-memory session for a grow run: owns the PRD document, the state and the
+    line count, so passes do not re-read prd.md or the state file.
+
+    prd.md is read once by open(). After that, refresh() compares the file's
+    (mtime_ns, size) with the values recorded at the last read or write; only
+    when they differ is the file read again, and the document is replaced only
+    if its sha256 differs from the in-memory content (an external edit).
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.prd_path = pathlib.Path(config.master_md_path)
+        self.document: typing.Optional[PrdDocument] = None
+        self.state: typing.Optional[dict] = None
+        self.disk_reads = 0
+        self._stat_key: typing.Optional[tuple[int, int]] = None
+        self._digest: typing.Optional[str] = None  # None: recompute from document
+
+    def open(self) -> bool:
+        """
+        Load state and prd.md.
+
+        Returns:
+            False if the state file or prd.md is missing
+        """
+        self.state = load_state(self.config)
+        if self.state is None or not self.prd_path.exists():
+            return False
+        self._read_document()
+        return True
+
+    @property
+    def line_count(self) -> int:
+        return len(self.document) if self.document is not None else 0
+
+    def _read_lines(self) -> list[str]:
+        with open(self.prd_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        self.disk_reads += 1
+        return lines
+
+    def _file_stat_key(self) -> tuple[int, int]:
+        stat = self.prd_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_document(self) -> None:
+        stat_key = self._file_stat_key()
+        lines = self._read_lines()
+        self.document = PrdDocument(lines)
+        self._stat_key = stat_key
+        self._digest = self.document.digest()
+
+    def refresh(self) -> bool:
+        """
+        Reload prd.md if it was modified outside this workspace.
+
+        Returns:
+            True if the document was reloaded
+        """
+        stat_key = self._file_stat_key()
+        if stat_key == self._stat_key:
+            return False
+
+        document = PrdDocument(self._read_lines())
+        disk_digest = document.digest()
+        if self._digest is None:
+            self._digest = self.document.digest()
+        self._stat_key = stat_key
+        if disk_digest == self._digest:
+            return False
+
+        self.document = document
+        self._digest = disk_digest
+        log(
+            f"prd.md changed on disk; reloaded ({len(self.document)} lines)",
+            {"step": "workspace_refresh"},
+            self.config
+        )
+        return True
+
+    def reload(self) -> None:
+        """Discard the in-memory document and read prd.md again."""
+        self._read_document()
+
+    def lines(self) -> list[str]:
+        """Return the current document as a plain list of lines."""
+        return self.document.to_lines()
+
+    def write_document(self) -> None:
+        """Commit the document to prd.md and record the new fingerprint."""
+        self._digest = commit_prd_document(self.config, self.prd_path, self.document)
+        self._stat_key = self._file_stat_key()
 
 
 # ============================================================================
 # SAFE FILE WRITING
 # ============================================================================
 
-def atomic_write_file(file_path: pathlib.Path, content: str) -> None:
+def atomic_write_file(file_path: pathlib.Path, content: typing.Union[str, typing.Iterable[str]]) -> None:
     """
     Atomically write content to a file.
-    
+
     Writes to a temp file first, then replaces the original.
     This ensures we don't corrupt the file if something goes wrong.
-    
+
     Args:
         file_path: Path to target file
-        content: Content to write
+        content: Content to write, either a string or an iterable of string
+                 pieces (e.g. PrdDocument.iter_lines()) streamed to the temp file
     """
     # Create temp file in same directory
     temp_path = file_path.with_suffix(file_path.suffix + '.tmp')
-    
+
     try:
         # Write to temp file
         with open(temp_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                f.writelines(content)
         
         # Replace original with temp file
         shutil.move(str(temp_path), str(file_path))
@@ -1859,7 +5399,7 @@ def run_git_command(args: list[str], cwd: typing.Optional[pathlib.Path] = None,
         if result.returncode != 0:
             log(
                 f"Git command failed: {' '.join(git_cmd)} (returncode={result.returncode})",
-                {"command": "git", "step": "run_git_command", "returncode": result.returncode},
+                {"command": "git", "step": "run_git_command", "returncode": result.returncode, "level": "warning"},
                 config
             )
         
@@ -1867,14 +5407,14 @@ def run_git_command(args: list[str], cwd: typing.Optional[pathlib.Path] = None,
     except subprocess.TimeoutExpired:
         log(
             f"Git command timed out: {' '.join(git_cmd)}",
-            {"command": "git", "step": "run_git_command", "error": "timeout"},
+            {"command": "git", "step": "run_git_command", "error": "timeout", "level": "warning"},
             config
         )
         return 1, "", "Command timed out"
     except Exception as e:
         log(
             f"Git command error: {e}",
-            {"command": "git", "step": "run_git_command", "error": str(e)},
+            {"command": "git", "step": "run_git_command", "error": str(e), "level": "warning"},
             config
         )
         return 1, "", str(e)
@@ -2221,6 +5761,41 @@ def check_config_schema(config: Config) -> dict:
     elif config.chunk_size_lines > 500:
         warnings.append(f"chunk_size_lines={config.chunk_size_lines} is very large (recommended <= 200)")
     
+    # Check chunk_strategy
+    if config.chunk_strategy not in CHUNK_STRATEGIES:
+        errors.append(f"chunk_strategy={config.chunk_strategy!r} is not supported (expected one of {', '.join(CHUNK_STRATEGIES)})")
+    elif config.chunk_strategy == "sections":
+        tuning = get_chunking_tuning(config)
+        min_lines = tuning.get("min_chunk_lines", 50)
+        max_lines = tuning.get("max_chunk_lines", 400)
+        if max_lines < min_lines:
+            warnings.append(f"performance.chunking_tuning.max_chunk_lines={max_lines} < min_chunk_lines={min_lines}; min is used as the cap")
+
+    # Check chunk scheduler
+    if get_scheduler_name(config) not in CHUNK_SCHEDULERS:
+        errors.append(f"performance.growth_tuning.scheduler={get_scheduler_name(config)!r} is not supported (expected one of {', '.join(CHUNK_SCHEDULERS)})")
+
+    # Check logging backend
+    logging_settings = get_logging_settings(config)
+    if str(logging_settings.get("level", "debug")).lower() not in LOG_LEVELS:
+        errors.append(f"logging.level={logging_settings.get('level')!r} is not supported (expected one of {', '.join(LOG_LEVELS)})")
+    if logging_settings.get("format", "text") not in ("text", "jsonl"):
+        errors.append("logging.format must be 'text' or 'jsonl'")
+    if logging_settings.get("queue_policy", "block") not in LOG_QUEUE_POLICIES:
+        errors.append(f"logging.queue_policy={logging_settings.get('queue_policy')!r} is not supported (expected one of {', '.join(LOG_QUEUE_POLICIES)})")
+
+    # Check usage limits
+    if get_ai_usage_settings(config).get("budget_exhausted_action", "degrade") not in ("degrade", "fail"):
+        errors.append("performance.ai_usage.budget_exhausted_action must be 'degrade' or 'fail'")
+
+    # Check small-chunk batching
+    batching = get_batching_settings(config)
+    if batching["enabled"] and estimate_batch_tokens(config, ["x" * 80 * batching["max_chunk_lines"]] * 2) > batching["max_tokens_per_call"]:
+        warnings.append(
+            f"performance.ai_usage.max_tokens_per_call={batching['max_tokens_per_call']} leaves no room for batches of "
+            f"{batching['max_chunk_lines']}-line chunks; most small chunks will be sent alone"
+        )
+    
     # Check target_line_count
     if config.growth.target_line_count <= 0:
         errors.append("growth.target_line_count must be > 0")
@@ -2243,6 +5818,12 @@ def check_config_schema(config: Config) -> dict:
     if config.safety.max_consecutive_failures <= 0:
         errors.append("safety.max_consecutive_failures must be > 0")
     
+    # Check max_parallel_chats
+    if config.max_parallel_chats < 1:
+        errors.append("max_parallel_chats must be >= 1")
+    elif config.max_parallel_chats > 1 and config.use_cursor_driver:
+        warnings.append(f"max_parallel_chats={config.max_parallel_chats} is ignored with use_cursor_driver=true (Cursor runs one chat at a time)")
+    
     return {"warnings": warnings, "errors": errors}
 
 
@@ -2322,6 +5903,11 @@ def check_logs(config: Config) -> dict:
     """
     Analyze recent log entries for patterns and errors.
     
+    Uses the LogStats sidecar when it matches the log file and holds enough
+    lines (constant time, same counts as a scan);
+    otherwise classifies the last safety.doctor_scan_log_lines lines, read
+    backwards from the end of the file.
+    
     Returns:
         Dict with analysis: {error_counts: {...}, hot_spots: [...], last_error_time: str | None}
     """
@@ -2335,56 +5921,36 @@ def check_logs(config: Config) -> dict:
             "lines_scanned": 0
         }
     
-    error_counts = {
-        "send_to_model": 0,
-        "cursor": 0,
-        "osascript": 0,
-        "git": 0,
-        "invariant_violation": 0,
-        "parse_error": 0
-    }
-    
-    hot_spots = {}  # chunk_id -> failure_count
-    last_error_time = None
-    
     try:
-        # Read last N lines
-        with open(log_path, 'r') as f:
-            all_lines = f.readlines()
+        flush_log_sinks()
+        stats_path = get_log_stats_path(config)
+        if stats_path is not None:
+            stats = LogStats.load(stats_path, os.path.abspath(config.log_path), _log_stats_keep_blocks(config))
+            if stats is not None and stats.log_size == log_path.stat().st_size \
+                    and stats.covers(config.safety.doctor_scan_log_lines):
+                return {**stats.window(config.safety.doctor_scan_log_lines), "source": "sidecar"}
         
-        lines_to_scan = min(config.safety.doctor_scan_log_lines, len(all_lines))
-        recent_lines = all_lines[-lines_to_scan:]
+        error_counts = {kind: 0 for kind in LOG_ERROR_KINDS}
+        hot_spots = {}  # chunk_id -> failure_count
+        last_error_time = None
+        lines_scanned = 0
         
-        for line in recent_lines:
-            # Extract timestamp if present
-            if "ERROR" in line.upper() or "error" in line.lower():
-                # Try to extract timestamp
-                timestamp_match = re.search(r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]', line)
-                if timestamp_match:
-                    last_error_time = timestamp_match.group(1)
-            
-            # Count error types
-            if "send_to_model" in line.lower() and ("error" in line.lower() or "failed" in line.lower()):
-                error_counts["send_to_model"] += 1
-            if "cursor" in line.lower() and ("error" in line.lower() or "failed" in line.lower()):
-                error_counts["cursor"] += 1
-            if "osascript" in line.lower() and ("error" in line.lower() or "failed" in line.lower()):
-                error_counts["osascript"] += 1
-            if "git" in line.lower() and ("error" in line.lower() or "failed" in line.lower()):
-                error_counts["git"] += 1
-            if "invariant_violation" in line.lower() or "invariant" in line.lower():
-                error_counts["invariant_violation"] += 1
-            if "parse" in line.lower() and ("error" in line.lower() or "failed" in line.lower()):
-                error_counts["parse_error"] += 1
-            
+        # Read last N lines, newest first (JSON-lines records are scanned in their text form)
+        for line in itertools.islice(read_lines_reverse(log_path), config.safety.doctor_scan_log_lines):
+            lines_scanned += 1
+            if line.startswith("{"):
+                line = log_record_to_text(line)
+            classified = classify_log_line(line)
+            if classified is None:
+                continue
+            kinds, chunk_id, timestamp = classified
+            for kind in kinds:
+                error_counts[kind] += 1
             # Track hot spots (chunks failing repeatedly)
-            chunk_match = re.search(r'\[chunk=(\d+)\]', line)
-            if chunk_match and ("error" in line.lower() or "failed" in line.lower()):
-                chunk_id = int(chunk_match.group(1))
+            if chunk_id is not None:
                 hot_spots[chunk_id] = hot_spots.get(chunk_id, 0) + 1
-        
-        # Filter hot spots (only chunks with 3+ failures)
-        hot_spots_filtered = {k: v for k, v in hot_spots.items() if v >= 3}
+            if timestamp is not None and last_error_time is None:
+                last_error_time = timestamp
         
     except Exception as e:
         return {
@@ -2397,9 +5963,11 @@ def check_logs(config: Config) -> dict:
     
     return {
         "error_counts": error_counts,
-        "hot_spots": hot_spots_filtered,
+        # Filter hot spots (only chunks with 3+ failures)
+        "hot_spots": {k: v for k, v in hot_spots.items() if v >= 3},
         "last_error_time": last_error_time,
-        "lines_scanned": lines_to_scan
+        "lines_scanned": lines_scanned,
+        "source": "scan"
     }
 
 
@@ -3026,8 +6594,10 @@ def safe_write_code_file(file_path: str, code: str, config: Config, dry_run: boo
     
     # Write file
     try:
+        started = time.perf_counter()
         with open(full_path, 'w', encoding='utf-8') as f:
             f.write(code)
+        perf_count("code_write", time.perf_counter() - started, len(code))
         return True, f"Wrote {file_path}"
     except Exception as e:
         return False, f"Failed to write {file_path}: {e}"
@@ -3187,6 +6757,21 @@ def command_status(config: Config, verbose: bool = False) -> int:
     for status in ["pending", "running", "done", "failed"]:
         count = status_counts.get(status, 0)
         print(f"  {status:8s}: {count:3d}")
+    
+    cache_settings = get_response_cache_settings(config)
+    if cache_settings.get("enabled", False):
+        cache = ResponseCache(config, cache_settings)
+        cache_summary = cache.summary()
+        lookups = cache_summary["hits"] + cache_summary["misses"]
+        hit_rate = (cache_summary["hits"] / lookups * 100) if lookups else 0.0
+        print("\nResponse Cache:")
+        print(f"  entries : {cache_summary['entries']} ({cache_summary['size_bytes'] / 1024:.1f} KB)")
+        print(f"  hits    : {cache_summary['hits']}")
+        print(f"  misses  : {cache_summary['misses']} (hit rate {hit_rate:.1f}%)")
+        print(f"  evicted : {cache_summary['evictions']}")
+    scheduler_model = meta.get("growth", {}).get("scheduler_model")
+    if scheduler_model:
+        print(f"\nScheduler: {get_scheduler_name(config)} (model trained on {scheduler_model.get('samples', 0)} chunk(s))")
     print("="*60)
     
     # Verbose mode: show chunk table
@@ -3214,311 +6799,1019 @@ def command_status(config: Config, verbose: bool = False) -> int:
     return 0
 
 
-def command_reset(config: Config) -> int:
+def command_reset(config: Config) -> int:
+    """
+    Reset automation state (remove state and optionally rotate log).
+    
+    After reset, user should run 'init' to rebuild state.
+    """
+    log("Running 'reset' command", {"command": "reset", "step": "start"}, config)
+    
+    state_path = pathlib.Path(config.state_path)
+    log_path = pathlib.Path(config.log_path)
+    
+    # Delete state file
+    if state_path.exists():
+        state_path.unlink()
+        log("Deleted state file", {"command": "reset", "step": "delete_state"}, config)
+    else:
+        log("State file does not exist", {"command": "reset", "step": "check_state"}, config)
+    
+    # Delete state journal and apply log (records would not match a rebuilt snapshot)
+    journal_path = get_state_journal_path(config)
+    if journal_path.exists():
+        journal_path.unlink()
+        log("Deleted state journal", {"command": "reset", "step": "delete_state_journal"}, config)
+    apply_log_path = get_apply_log_path(config)
+    if apply_log_path.exists():
+        apply_log_path.unlink()
+        log("Deleted apply log", {"command": "reset", "step": "delete_apply_log"}, config)
+    
+    # Rotate log file (buffered lines go to the old file first); the stats
+    # sidecar no longer matches and is dropped
+    close_log_sink(config.log_path)
+    stats_path = get_log_stats_path(config)
+    if stats_path is not None and stats_path.exists():
+        stats_path.unlink()
+    if log_path.exists():
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_path = log_path.with_suffix(f".bak.{timestamp}")
+        shutil.move(str(log_path), str(backup_path))
+        log(f"Rotated log file to {backup_path}", {"command": "reset", "step": "rotate_log"}, config)
+    
+    log("Reset complete. Run 'init' to rebuild state.", {"command": "reset", "step": "complete"}, config)
+    return 0
+
+
+def _enhance_chunk_text(
+    config: Config,
+    chunk_text: str,
+    phase_id: str,
+    start_line: int,
+    end_line: int,
+    context: dict,
+    use_cache: bool = True,
+    metrics: typing.Optional[dict] = None,
+) -> str:
+    """
+    Model-side half of chunk processing: build prompt, call model, parse and
+    length-check the response.
+
+    This function never touches the PRD lines or the state dict, so it is safe
+    to run from worker threads when max_parallel_chats > 1. When the response
+    cache is enabled, a cached response for the same prompt is reused instead
+    of calling the model, and new responses are cached once they validate.
+
+    If a `metrics` dict is passed, the model call latency is stored in it as
+    "latency_seconds" (also when the call raises), "cached" is set, and the
+    estimated prompt tokens are split into "prompt_prefix_tokens" (static,
+    cacheable prefix) and "prompt_suffix_tokens" (per-chunk part).
+
+    Returns:
+        Improved chunk text (without markers)
+
+    Raises:
+        ModelResponseError: If the response cannot be parsed or is too short
+        RuntimeError: If the model call fails (CircuitOpenError if the provider's
+            circuit breaker refuses the call)
+    """
+    chunk_id = context.get("chunk")
+    if metrics is None:
+        metrics = {}
+
+    # Build prompt (static prefix + per-chunk suffix)
+    with stage_span("prepare_prompt", chunk=chunk_id):
+        prompt_parts = build_enhance_prompt_parts(config, chunk_text, phase_id, start_line, end_line)
+    prompt = prompt_parts["prefix"] + prompt_parts["suffix"]
+    metrics["prompt_prefix_tokens"] = estimate_tokens(prompt_parts["prefix"])
+    metrics["prompt_suffix_tokens"] = estimate_tokens(prompt_parts["suffix"])
+    log(
+        f"Built prompt for chunk {chunk_id} (length={len(prompt)} chars, prefix={prompt_parts['prefix_hash']})",
+        {**context, "step": "prepare_prompt"},
+        config
+    )
+
+    # Determine mode for logging
+    mode = "cursor" if getattr(config, 'use_cursor_driver', False) else "fake"
+    log(
+        f"Sending to model (mode={mode}, wait={config.wait_seconds}s)",
+        {**context, "step": "send_prompt"},
+        config
+    )
+
+    cache = get_response_cache(config, use_cache)
+    provider, model = describe_model_target(config)
+    cache_key = ResponseCache.make_key(provider, model, prompt) if cache else None
+    response = cache.get(cache_key) if cache else None
+    from_cache = response is not None
+    metrics["cached"] = from_cache
+
+    if from_cache:
+        log(
+            f"Response cache hit for chunk {chunk_id} (key={cache_key[:12]})",
+            {**context, "step": "cache_hit"},
+            config
+        )
+    if from_cache:
+        parser = ImprovedChunkStreamParser.for_chunk(config, chunk_text)
+        parser.feed(response)
+        log(
+            f"Received response (length={len(response)} chars)",
+            {**context, "step": "receive_response"},
+            config
+        )
+        return _check_parsed_chunk(config, parser, chunk_text, context)
+
+    def attempt() -> tuple[str, str]:
+        # Parse incrementally; stop reading once the end marker arrives or the
+        # output is malformed / over the growth limit
+        parser = ImprovedChunkStreamParser.for_chunk(config, chunk_text)
+        call_started = time.monotonic()
+        pieces = []
+        stream = stream_model_response(
+            prompt, chunk_text, phase_id, start_line, end_line,
+            config.wait_seconds, config, prefix_hash=prompt_parts["prefix_hash"]
+        )
+        try:
+            with stage_span("send_prompt", chunk=chunk_id):
+                for piece in stream:
+                    pieces.append(piece)
+                    if parser.feed(piece):
+                        break
+        finally:
+            stream.close()
+            metrics["latency_seconds"] = time.monotonic() - call_started
+        attempt_response = "".join(pieces)
+
+        log(
+            f"Received response (length={len(attempt_response)} chars)",
+            {**context, "step": "receive_response"},
+            config
+        )
+        return _check_parsed_chunk(config, parser, chunk_text, context), attempt_response
+
+    # Retries (timeouts, provider errors, malformed output) happen here under
+    # performance.retry_policy; the provider's circuit breaker sees every attempt
+    improved_text, response = call_with_retry(config, provider, attempt, context, metrics)
+
+    if cache:
+        cache.put(cache_key, response, provider, model)
+
+    return improved_text
+
+
+def _check_parsed_chunk(
+    config: Config,
+    parser: "ImprovedChunkStreamParser",
+    chunk_text: str,
+    context: dict,
+) -> str:
+    """
+    Validate one parsed chunk: markers complete, not aborted, long enough.
+
+    Returns:
+        Improved chunk text (without markers)
+
+    Raises:
+        ModelResponseError: If the response was aborted, cannot be parsed or is too short
+    """
+    chunk_id = context.get("chunk")
+    with stage_span("parse_response", chunk=chunk_id):
+        if parser.state == "aborted":
+            log(
+                f"Aborted response for chunk {chunk_id}: {parser.error}",
+                {**context, "step": "stream_abort"},
+                config
+            )
+            raise ModelResponseError(f"Aborted model response: {parser.error}", "aborted")
+
+        # Parse response
+        improved_text = parser.result()
+        if improved_text is None:
+            raise ModelResponseError("Failed to parse enhanced chunk from response (missing markers)", "parse_error")
+
+        log(
+            f"Parsed response for chunk {chunk_id}",
+            {**context, "step": "parse_response"},
+            config
+        )
+
+        # Safety check: length ratio
+        orig_len = len(chunk_text)
+        new_len = len(improved_text)
+        length_ratio = new_len / max(orig_len, 1)
+
+        log(
+            f"Length check: orig={orig_len} new={new_len} ratio={length_ratio:.2f}",
+            {**context, "step": "safety_check"},
+            config
+        )
+
+        if length_ratio < config.min_length_ratio_ok:
+            raise ModelResponseError(
+                f"Enhanced chunk too short: ratio {length_ratio:.2f} < {config.min_length_ratio_ok}",
+                "too_short"
+            )
+
+        return improved_text
+
+
+def _enhance_chunk_batch(
+    config: Config,
+    items: list[dict],
+    context: dict,
+    use_cache: bool = True,
+    metrics_list: typing.Optional[list[dict]] = None,
+) -> list[typing.Union[str, Exception]]:
+    """
+    Model-side processing of several adjacent chunks in one batched prompt.
+
+    Like _enhance_chunk_text(), this never touches the PRD lines or the state
+    dict. The response is split by numbered markers and each chunk is parsed
+    and length-checked on its own, so one bad chunk does not fail the others.
+    The response is cached only if every chunk in it validates.
+
+    Args:
+        config: Config object
+        items: Chunks in document order, each {"chunk_id", "chunk_text", "phase_id", "start_line", "end_line"}
+        context: Logging context for the batch
+        use_cache: If False, bypass the response cache
+        metrics_list: Optional per-item metrics dicts. The call latency and
+                      prompt tokens are split across items by chunk size; the
+                      static prefix is counted on the first item only.
+
+    Returns:
+        One entry per item: the improved chunk text, or the exception that
+        rejected that chunk
+
+    Raises:
+        RuntimeError: If the model call fails after retries (affects every chunk in the batch)
+    """
+    if metrics_list is None:
+        metrics_list = [{} for _ in items]
+
+    batch_ids = ",".join(str(item["chunk_id"]) for item in items)
+    with stage_span("prepare_prompt", chunks=batch_ids):
+        prompt_parts = build_enhance_batch_prompt_parts(config, items)
+    prompt = prompt_parts["prefix"] + prompt_parts["suffix"]
+    total_chars = sum(len(item["chunk_text"]) for item in items) or 1
+    shares = [len(item["chunk_text"]) / total_chars for item in items]
+    suffix_tokens = estimate_tokens(prompt_parts["suffix"])
+    for index, metrics in enumerate(metrics_list):
+        metrics["prompt_prefix_tokens"] = estimate_tokens(prompt_parts["prefix"]) if index == 0 else 0
+        metrics["prompt_suffix_tokens"] = round(suffix_tokens * shares[index])
+        metrics["batch_size"] = len(items)
+    log(
+        f"Built batched prompt for chunks {','.join(str(item['chunk_id']) for item in items)} (length={len(prompt)} chars, prefix={prompt_parts['prefix_hash']})",
+        {**context, "step": "prepare_prompt", "batch_size": len(items)},
+        config
+    )
+
+    cache = get_response_cache(config, use_cache)
+    provider, model = describe_model_target(config)
+    cache_key = ResponseCache.make_key(provider, model, prompt) if cache else None
+    response = cache.get(cache_key) if cache else None
+    from_cache = response is not None
+    for metrics in metrics_list:
+        metrics["cached"] = from_cache
+
+    parsers = [
+        ImprovedChunkStreamParser.for_chunk(config, item["chunk_text"], marker_index=index)
+        for index, item in enumerate(items, start=1)
+    ]
+    if from_cache:
+        log(
+            f"Response cache hit for batch (key={cache_key[:12]})",
+            {**context, "step": "cache_hit"},
+            config
+        )
+        for parser in parsers:
+            parser.feed(response)
+    else:
+        first = items[0]
+
+        def attempt() -> str:
+            call_started = time.monotonic()
+            pieces = []
+            stream = stream_model_response(
+                prompt, first["chunk_text"], first["phase_id"], first["start_line"], items[-1]["end_line"],
+                config.wait_seconds, config, prefix_hash=prompt_parts["prefix_hash"], batch_items=items
+            )
+            try:
+                with stage_span("send_prompt", chunks=batch_ids):
+                    for piece in stream:
+                        pieces.append(piece)
+                        finished = [parser.feed(piece) for parser in parsers if not parser.finished]
+                        if all(finished):
+                            break
+            finally:
+                stream.close()
+                latency = time.monotonic() - call_started
+                for index, metrics in enumerate(metrics_list):
+                    metrics["latency_seconds"] = latency * shares[index]
+            return "".join(pieces)
+
+        # Only the call itself is retried; per-chunk parse failures stay per chunk
+        response = call_with_retry(config, provider, attempt, context, metrics_list[0])
+
+    log(
+        f"Received batched response (length={len(response)} chars)",
+        {**context, "step": "receive_response", "batch_size": len(items)},
+        config
+    )
+
+    results: list[typing.Union[str, Exception]] = []
+    for item, parser in zip(items, parsers):
+        item_context = {**context, "chunk": item["chunk_id"], "phase_id": item["phase_id"]}
+        try:
+            results.append(_check_parsed_chunk(config, parser, item["chunk_text"], item_context))
+        except ModelResponseError as e:
+            results.append(e)
+
+    if cache and not from_cache and not any(isinstance(result, Exception) for result in results):
+        cache.put(cache_key, response, provider, model)
+
+    return results
+
+
+def _run_inline(fn: typing.Callable, *args) -> concurrent.futures.Future:
+    """
+    Run fn(*args) immediately and wrap the outcome in a completed Future.
+
+    Used for the sequential (max_parallel_chats=1) path so it shares the
+    result-handling code of the worker-pool path without spawning threads.
+    """
+    future = concurrent.futures.Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def get_parallel_chat_limit(config: Config) -> int:
+    """
+    Number of chunks that may be in flight at once during an enhancement pass.
+
+    The Cursor driver automates a single IDE window and the clipboard, so it
+    always runs sequentially regardless of max_parallel_chats.
+    """
+    limit = max(1, config.max_parallel_chats or 1)
+    if getattr(config, 'use_cursor_driver', False):
+        return 1
+    return limit
+
+
+def get_batching_settings(config: Config) -> dict:
+    """
+    Resolve small-chunk batching settings.
+
+    Batching is enabled by performance.chunking_tuning.batch_small_chunks.
+    Adjacent chunks of at most batch_max_chunk_lines lines are packed, up to
+    max_chunks_per_batch per prompt, while the estimated prompt plus response
+    fits performance.ai_usage.max_tokens_per_call.
+    """
+    tuning = get_chunking_tuning(config)
+    performance = config._raw_data.get("performance", {}) if config._raw_data else {}
+    ai_usage = performance.get("ai_usage", {}) or {}
+    return {
+        "enabled": bool(tuning.get("batch_small_chunks", False)),
+        "max_chunk_lines": int(tuning.get("batch_max_chunk_lines", 40)),
+        "max_chunks_per_batch": max(1, int(tuning.get("max_chunks_per_batch", 4))),
+        "max_tokens_per_call": int(ai_usage.get("max_tokens_per_call") or 8000),
+    }
+
+
+def group_batch_neighbours(
+    chunks: list[dict],
+    candidates: list[dict],
+    line_index: "ChunkLineIndex",
+    batching: dict,
+) -> list[dict]:
+    """
+    Reorder scheduled candidates so batchable file neighbours sit together.
+
+    A scheduler other than file_order scatters adjacent small chunks across
+    the queue, and the pass only packs a chunk with the candidates that follow
+    it directly. Candidates of at most batching["max_chunk_lines"] lines are
+    therefore grouped into runs of file neighbours (up to max_chunks_per_batch
+    each); a run is emitted, in file order, where its first scheduled member
+    stands. Other candidates keep their scheduled position. File-order input
+    comes back unchanged.
+
+    Args:
+        chunks: Full chunk table in file order (the one line_index was built on)
+        candidates: Eligible chunks in scheduled order
+        line_index: Offset index for resolving current chunk ranges
+        batching: Settings from get_batching_settings()
+
+    Returns:
+        Reordered candidate list (same chunks)
+    """
+    candidate_ids = {chunk["id"] for chunk in candidates}
+    group_of: dict[int, list[dict]] = {}
+    group: list[dict] = []
+    for position, chunk in enumerate(chunks):
+        start_line, end_line = line_index.resolve(position)
+        if chunk["id"] not in candidate_ids or end_line - start_line + 1 > batching["max_chunk_lines"]:
+            group = []
+            continue
+        if len(group) >= batching["max_chunks_per_batch"]:
+            group = []
+        group.append(chunk)
+        group_of[chunk["id"]] = group
+
+    ordered = []
+    emitted: set[int] = set()
+    for chunk in candidates:
+        if chunk["id"] in emitted:
+            continue
+        for member in group_of.get(chunk["id"], [chunk]):
+            if member["id"] not in emitted:
+                emitted.add(member["id"])
+                ordered.append(member)
+    return ordered
+
+
+# Estimated prompt tokens per chunk for the batch headers (Phase ID, lines, separators)
+BATCH_CHUNK_OVERHEAD_TOKENS = 40
+
+
+def estimate_batch_tokens(config: Config, chunk_texts: list[str]) -> int:
     """
-    Reset automation state (remove state and optionally rotate log).
-    
-    After reset, user should run 'init' to rebuild state.
+    Estimate prompt plus response tokens for a batched prompt of chunk_texts.
+
+    The response is assumed to grow up to performance.growth_tuning.max_growth_ratio
+    (1.5 if unset), since that is the most the stream parser accepts.
     """
-    log("Running 'reset' command", {"command": "reset", "step": "start"}, config)
-    
-    state_path = pathlib.Path(config.state_path)
-    log_path = pathlib.Path(config.log_path)
-    
-    # Delete state file
-    if state_path.exists():
-        state_path.unlink()
-        log("Deleted state file", {"command": "reset", "step": "delete_state"}, config)
-    else:
-        log("State file does not exist", {"command": "reset", "step": "check_state"}, config)
-    
-    # Rotate log file
-    if log_path.exists():
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = log_path.with_suffix(f".bak.{timestamp}")
-        shutil.move(str(log_path), str(backup_path))
-        log(f"Rotated log file to {backup_path}", {"command": "reset", "step": "rotate_log"}, config)
-    
-    log("Reset complete. Run 'init' to rebuild state.", {"command": "reset", "step": "complete"}, config)
-    return 0
+    growth_ratio = float(get_growth_tuning(config).get("max_growth_ratio") or 1.5)
+    chunk_tokens = sum(estimate_tokens(text) for text in chunk_texts)
+    prompt_tokens = (
+        estimate_tokens(ENHANCE_PROMPT_PREFIX)
+        + chunk_tokens
+        + BATCH_CHUNK_OVERHEAD_TOKENS * (len(chunk_texts) + 1)
+    )
+    return prompt_tokens + int(chunk_tokens * growth_ratio)
+
+
+def _calls_in_flight(in_flight: collections.deque) -> int:
+    """Number of model calls in the window; a batch counts once."""
+    return sum(1 for entry in in_flight if entry.get("batch_index", 0) == 0)
 
 
 def run_enhancement_pass(
     config: Config,
     state: dict,
-    lines: list[str],
+    document: typing.Union["PrdDocument", list[str]],
     max_chunks: typing.Optional[int] = None,
     dry_run: bool = False,
     command_name: str = "enhance",
-) -> tuple[dict, list[str], dict]:
+    use_cache: bool = True,
+) -> tuple[dict, "PrdDocument", dict]:
     """
     Runs a single enhancement pass over up to max_chunks eligible chunks.
-    
+
+    When max_parallel_chats > 1, up to that many chunks are sent to the model
+    concurrently (a sliding window over the candidate list). Results are always
+    applied to `lines` and `state` on the calling thread, in candidate order, so
+    line renumbering, consecutive-failure accounting and state journaling
+    behave exactly as in the sequential case.
+
+    With small-chunk batching enabled (see get_batching_settings()), runs of
+    adjacent small chunks share one model call; each chunk still gets its own
+    result, status and journal record. Such runs are kept together in the
+    candidate order whatever the scheduler (see group_batch_neighbours()).
+
     Args:
         config: Config object
         state: Current state dict
-        lines: Current PRD file lines (list of strings)
+        document: Current PRD document (a plain list of lines is wrapped in a PrdDocument)
         max_chunks: Maximum number of chunks to process (None = all eligible)
         dry_run: If True, don't modify files, just log what would happen
         command_name: Command name for logging context (e.g., "enhance" or "grow")
-    
+        use_cache: If False, bypass the response cache for this pass
+
     Returns:
-        Tuple of (updated_state, updated_lines, pass_stats)
+        Tuple of (updated_state, updated_document, pass_stats)
         where pass_stats includes:
         {
             "chunks_attempted": int,
             "chunks_succeeded": int,
             "chunks_failed": int,
             "lines_before": int,
-            "lines_after": int
+            "lines_after": int,
+            "chunks_deferred": int,
+            "halt_reason": Optional[str],
+            "batched_calls": int,
+            "batched_chunks": int,
+            ...
         }
     """
-    lines_before = len(lines)
-    
+    if not isinstance(document, PrdDocument):
+        document = PrdDocument(document)
+    lines_before = len(document)
+
     # Select eligible chunks (prefer pending, fallback to failed if no pending)
     pending_chunks = [chunk for chunk in state["chunks"] if chunk["status"] == "pending"]
     failed_chunks = [chunk for chunk in state["chunks"] if chunk["status"] == "failed"]
-    
+
     candidate_chunks = pending_chunks if pending_chunks else failed_chunks
-    
+
     if not candidate_chunks:
         # No chunks to process
-        return state, lines, {
+        return state, document, {
             "chunks_attempted": 0,
             "chunks_succeeded": 0,
             "chunks_failed": 0,
             "lines_before": lines_before,
             "lines_after": lines_before
         }
-    
-    # Apply limit
+
+    # Chunk positions are tracked as cumulative deltas; dicts are only
+    # renumbered when state is persisted.
+    line_index = ChunkLineIndex(state["chunks"])
+
+    # Order candidates (performance.growth_tuning.scheduler), then apply limit
+    candidate_chunks, yield_model, chunk_features = schedule_chunks(
+        config, state, candidate_chunks, document, line_index
+    )
+    batching = get_batching_settings(config)
+    if batching["enabled"]:
+        # Keep small file neighbours together so the pass can pack them
+        candidate_chunks = group_batch_neighbours(state["chunks"], candidate_chunks, line_index, batching)
     if max_chunks is not None:
         candidate_chunks = candidate_chunks[:max_chunks]
-    
+    if yield_model is not None:
+        log(
+            f"Scheduler growth_yield: first chunks {', '.join(str(chunk['id']) for chunk in candidate_chunks[:5])} "
+            f"(model samples={yield_model.samples})",
+            {"command": command_name, "step": "schedule", "scheduler": "growth_yield"},
+            config
+        )
+    yield_errors: list[float] = []
+
+    parallel_limit = get_parallel_chat_limit(config)
+
+    # Per-chunk transitions go to the append-only journal; a full snapshot
+    # is written once, at the end of the pass. Applied replacements are
+    # checkpointed in the apply log before the journal acknowledges them.
+    journal = StateJournal(config, state)
+    apply_log = ApplyLog(config)
+
     log(
-        f"Processing {len(candidate_chunks)} chunk(s) in {command_name} pass",
+        f"Processing {len(candidate_chunks)} chunk(s) in {command_name} pass (parallel={parallel_limit})",
         {"command": command_name, "step": "select_chunks"},
         config
     )
-    
+
     # Process each chunk
     chunks_attempted = 0
     chunks_succeeded = 0
     chunks_failed = 0
     consecutive_failures = 0
-    
-    for chunk in candidate_chunks:
-        # Check consecutive failures (before processing this chunk)
-        if consecutive_failures >= config.safety.max_consecutive_failures:
-            log(
-                f"Stopping pass: {consecutive_failures} consecutive failures (max={config.safety.max_consecutive_failures})",
-                {"command": command_name, "step": "stop_consecutive_failures", "consecutive_failures": consecutive_failures},
-                config
-            )
-            break
-        chunk_id = chunk["id"]
-        phase_id = chunk["phase_id"]
-        start_line = chunk["start_line"]
-        end_line = chunk["end_line"]
-        
-        context = {
-            "command": command_name,
-            "chunk": chunk_id,
-            "phase_id": phase_id,
-            "step": "process"
-        }
-        
-        # Invariant check: Validate chunk line range
-        if start_line < 1 or end_line < start_line or end_line > len(lines):
-            violation_msg = f"Chunk {chunk_id} has invalid line range: {start_line}-{end_line} (file has {len(lines)} lines)"
-            log(
-                f"INVARIANT VIOLATION: {violation_msg}",
-                {**context, "step": "invariant_violation"},
-                config
-            )
-            
-            if config.safety.stop_on_invariant_violation:
-                raise RuntimeError(f"Invariant violation: {violation_msg}")
+    prompt_prefix_tokens = 0
+    prompt_suffix_tokens = 0
+    batched_calls = 0
+    batched_chunks = 0
+    chunks_deferred = 0
+    retry_enabled = bool(get_retry_policy(config).get("enabled", True))
+    halt_reason: typing.Optional[str] = None
+    halt_provider: typing.Optional[str] = None
+
+    executor = None
+    if parallel_limit > 1 and not dry_run:
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=parallel_limit,
+            thread_name_prefix="enhance"
+        )
+
+    # Each in-flight entry: {"chunk", "context", "chunk_text", "previous_status", "future"}.
+    # Entries without a future were resolved at submission time (invariant
+    # failure or dry-run) and only need their outcome recorded in order.
+    # Chunks of one batch share a future and carry their "batch_index".
+    queue = collections.deque(candidate_chunks)
+    in_flight = collections.deque()
+    stop_submitting = False
+    pass_trace_start = trace_span_start()
+
+    try:
+        while queue or in_flight:
+            # Fill the window up to parallel_limit chunks
+            while queue and not stop_submitting and _calls_in_flight(in_flight) < parallel_limit:
+                chunk = queue.popleft()
+                chunk_id = chunk["id"]
+                phase_id = chunk["phase_id"]
+                position = line_index.position_of(chunk_id)
+                start_line, end_line = line_index.resolve(position)
+
+                context = {
+                    "command": command_name,
+                    "chunk": chunk_id,
+                    "phase_id": phase_id,
+                    "step": "process"
+                }
+                entry = {"chunk": chunk, "position": position, "context": context, "future": None, "outcome": None}
+
+                # Invariant check: Validate chunk line range.
+                # Earlier in-flight chunks only shift this range when applied,
+                # so checking at submission time is equivalent to checking later.
+                if start_line < 1 or end_line < start_line or end_line > len(document):
+                    violation_msg = f"Chunk {chunk_id} has invalid line range: {start_line}-{end_line} (file has {len(document)} lines)"
+                    log(
+                        f"INVARIANT VIOLATION: {violation_msg}",
+                        {**context, "step": "invariant_violation"},
+                        config
+                    )
+
+                    if config.safety.stop_on_invariant_violation:
+                        raise RuntimeError(f"Invariant violation: {violation_msg}")
+
+                    entry["outcome"] = ("invalid", violation_msg)
+                    in_flight.append(entry)
+                    continue
+
+                chunks_attempted += 1
+
+                if dry_run:
+                    # Determine mode for dry-run logging
+                    mode = "cursor" if getattr(config, 'use_cursor_driver', False) else "fake"
+                    log(
+                        f"DRY-RUN: Would process chunk {chunk_id} ({phase_id}, lines {start_line}-{end_line}, mode={mode})",
+                        {**context, "step": "dry_run", "mode": "dry-run"},
+                        config
+                    )
+                    chunks_attempted += 1  # Count dry-run attempts for stats
+                    entry["outcome"] = ("dry_run", None)
+                    in_flight.append(entry)
+                    continue
+
+                # Pack following adjacent small chunks into the same call
+                batch = [(entry, start_line, end_line)]
+                if batching["enabled"] and end_line - start_line + 1 <= batching["max_chunk_lines"]:
+                    batch_texts = [document.get_text(start_line, end_line)]
+                    while queue and len(batch) < batching["max_chunks_per_batch"]:
+                        next_chunk = queue[0]
+                        next_position = line_index.position_of(next_chunk["id"])
+                        next_start, next_end = line_index.resolve(next_position)
+                        if (
+                            next_start != batch[-1][2] + 1
+                            or next_end < next_start
+                            or next_end > len(document)
+                            or next_end - next_start + 1 > batching["max_chunk_lines"]
+                        ):
+                            break
+                        next_text = document.get_text(next_start, next_end)
+                        if estimate_batch_tokens(config, batch_texts + [next_text]) > batching["max_tokens_per_call"]:
+                            break
+                        queue.popleft()
+                        chunks_attempted += 1
+                        next_context = {
+                            "command": command_name,
+                            "chunk": next_chunk["id"],
+                            "phase_id": next_chunk["phase_id"],
+                            "step": "process"
+                        }
+                        batch.append((
+                            {"chunk": next_chunk, "position": next_position, "context": next_context, "future": None, "outcome": None},
+                            next_start,
+                            next_end
+                        ))
+                        batch_texts.append(next_text)
+
+                for batch_entry, batch_start, batch_end in batch:
+                    batch_chunk = batch_entry["chunk"]
+
+                    # Mark as running
+                    batch_entry["trace_start_ns"] = trace_span_start()
+                    batch_entry["previous_status"] = batch_chunk["status"]
+                    batch_chunk["status"] = "running"
+                    batch_chunk["attempts"] += 1
+                    batch_chunk["last_updated_at"] = datetime.datetime.now().isoformat()
+                    journal.append(batch_chunk)
+
+                    # Extract chunk text
+                    with stage_span("extract", chunk=batch_chunk["id"]):
+                        batch_entry["chunk_text"] = document.get_text(batch_start, batch_end)
+                    batch_entry["metrics"] = {}
+
+                    log(
+                        f"Processing chunk {batch_chunk['id']} (lines {batch_start}-{batch_end})",
+                        {**batch_entry["context"], "step": "extract"},
+                        config
+                    )
+
+                if len(batch) == 1:
+                    args = (config, entry["chunk_text"], phase_id, start_line, end_line, context, use_cache, entry["metrics"])
+                    worker = _enhance_chunk_text
+                else:
+                    items = [
+                        {
+                            "chunk_id": batch_entry["chunk"]["id"],
+                            "chunk_text": batch_entry["chunk_text"],
+                            "phase_id": batch_entry["chunk"]["phase_id"],
+                            "start_line": batch_start,
+                            "end_line": batch_end,
+                        }
+                        for batch_entry, batch_start, batch_end in batch
+                    ]
+                    log(
+                        f"Batching {len(batch)} small chunks (lines {start_line}-{batch[-1][2]}) into one call",
+                        {**context, "step": "batch", "batch_size": len(batch)},
+                        config
+                    )
+                    args = (config, items, context, use_cache, [batch_entry["metrics"] for batch_entry, _, _ in batch])
+                    worker = _enhance_chunk_batch
+                    batched_calls += 1
+                    batched_chunks += len(batch)
+
+                if executor is not None:
+                    future = executor.submit(worker, *args)
+                else:
+                    future = _run_inline(worker, *args)
+                for batch_index, (batch_entry, _, _) in enumerate(batch):
+                    batch_entry["future"] = future
+                    if len(batch) > 1:
+                        batch_entry["batch_index"] = batch_index
+                    in_flight.append(batch_entry)
+
+            if not in_flight:
+                break
+
+            # Consume the oldest entry so results are applied in candidate order
+            entry = in_flight.popleft()
+            chunk = entry["chunk"]
+            context = entry["context"]
+            chunk_id = chunk["id"]
+
+            line_diff = 0
+            if entry["future"] is not None:
+                # Metrics are filled by the worker thread; wait for it before reading them
+                entry["future"].exception()
+                prompt_prefix_tokens += entry["metrics"].get("prompt_prefix_tokens", 0)
+                prompt_suffix_tokens += entry["metrics"].get("prompt_suffix_tokens", 0)
+            if entry["outcome"] is not None:
+                kind, violation_msg = entry["outcome"]
+                if kind == "invalid":
+                    chunk["status"] = "failed"
+                    chunk["last_error"] = violation_msg
+                    chunk["last_updated_at"] = datetime.datetime.now().isoformat()
+                    chunks_failed += 1
+                    consecutive_failures += 1
+                    # Journal the failure so the pass-end snapshot persists it
+                    # even when no chunk in the pass was sent
+                    journal.append(chunk, line_diff=0, total_lines=len(document))
             else:
-                chunk["status"] = "failed"
-                chunk["last_error"] = violation_msg
-                chunks_failed += 1
-                consecutive_failures += 1
-                continue
-        
-        chunks_attempted += 1
-        
-        if dry_run:
-            # Determine mode for dry-run logging
-            mode = "cursor" if getattr(config, 'use_cursor_driver', False) else "fake"
-            log(
-                f"DRY-RUN: Would process chunk {chunk_id} ({phase_id}, lines {start_line}-{end_line}, mode={mode})",
-                {**context, "step": "dry_run", "mode": "dry-run"},
-                config
-            )
-            chunks_attempted += 1  # Count dry-run attempts for stats
-            continue
-        
-        # Mark as running
-        chunk["status"] = "running"
-        chunk["attempts"] += 1
-        chunk["last_updated_at"] = datetime.datetime.now().isoformat()
-        save_state(config, state)
-        
-        try:
-            # Extract chunk text (convert to 0-indexed for list access)
-            chunk_lines = lines[start_line - 1:end_line]
-            chunk_text = "".join(chunk_lines)
-            
-            log(
-                f"Processing chunk {chunk_id} (lines {start_line}-{end_line})",
-                {**context, "step": "extract"},
-                config
-            )
-            
-            # Build prompt
-            prompt = build_enhance_prompt(config, chunk_text, phase_id, start_line, end_line)
-            log(
-                f"Built prompt for chunk {chunk_id} (length={len(prompt)} chars)",
-                {**context, "step": "prepare_prompt"},
-                config
-            )
-            
-            # Determine mode for logging
-            mode = "cursor" if getattr(config, 'use_cursor_driver', False) else "fake"
-            log(
-                f"Sending to model (mode={mode}, wait={config.wait_seconds}s)",
-                {**context, "step": "send_prompt"},
-                config
-            )
-            
-            # Send to model
-            response = send_to_model(
-                prompt, chunk_text, phase_id, start_line, end_line,
-                config.wait_seconds, config
-            )
-            
-            log(
-                f"Received response (length={len(response)} chars)",
-                {**context, "step": "receive_response"},
-                config
-            )
-            
-            # Parse response
-            improved_text = parse_enhanced_chunk(response)
-            if improved_text is None:
-                raise ValueError("Failed to parse enhanced chunk from response (missing markers)")
-            
-            log(
-                f"Parsed response for chunk {chunk_id}",
-                {**context, "step": "parse_response"},
-                config
-            )
-            
-            # Safety check: length ratio
-            orig_len = len(chunk_text)
-            new_len = len(improved_text)
-            length_ratio = new_len / max(orig_len, 1)
-            
-            log(
-                f"Length check: orig={orig_len} new={new_len} ratio={length_ratio:.2f}",
-                {**context, "step": "safety_check"},
-                config
-            )
-            
-            if length_ratio < config.min_length_ratio_ok:
-                raise ValueError(
-                    f"Enhanced chunk too short: ratio {length_ratio:.2f} < {config.min_length_ratio_ok}"
+                try:
+                    improved_text = entry["future"].result()
+                    if "batch_index" in entry:
+                        improved_text = improved_text[entry["batch_index"]]
+                        if isinstance(improved_text, Exception):
+                            raise improved_text
+
+                    # Recompute the range: chunks applied since submission may
+                    # have shifted this chunk's line numbers.
+                    start_line, end_line = line_index.resolve(entry["position"])
+
+                    # Replace chunk in the document
+                    # Convert improved text to lines
+                    improved_lines = improved_text.splitlines(keepends=False)
+                    # Add newlines to match original format
+                    improved_lines_with_newlines = [line + "\n" for line in improved_lines]
+
+                    # Checkpoint, then replace in document (returns line count change)
+                    with stage_span("update_file", chunk=chunk_id):
+                        apply_log.record_apply(document, chunk, start_line, end_line, improved_lines_with_newlines)
+                        line_diff = document.replace_lines(start_line, end_line, improved_lines_with_newlines)
+
+                    # Shift this chunk's end and all subsequent chunks (O(log n))
+                    line_index.apply_delta(entry["position"], line_diff)
+
+                    # Update chunk status
+                    chunk["status"] = "done"
+                    chunk["last_error"] = None
+                    chunk["last_updated_at"] = datetime.datetime.now().isoformat()
+                    chunk["metrics"] = _chunk_metrics(
+                        entry["metrics"], "done", end_line - start_line + 1, len(improved_lines_with_newlines)
+                    )
+                    if yield_model is not None and chunk_id in chunk_features:
+                        yield_errors.append(yield_model.update(chunk_features[chunk_id], line_diff))
+                    chunk["content_hash"] = hash_chunk_text("".join(improved_lines_with_newlines))
+
+                    # Update meta
+                    state["meta"]["total_lines"] = len(document)
+                    state["meta"]["updated_at"] = datetime.datetime.now().isoformat()
+
+                    log(
+                        f"Updated chunk {chunk_id}: new_total_lines={len(document)} line_diff={line_diff:+d}",
+                        {**context, "step": "update_file"},
+                        config
+                    )
+
+                    chunks_succeeded += 1
+                    consecutive_failures = 0  # Reset on success
+
+                except Exception as e:
+                    # The retry policy already retried transient errors; now
+                    # decide between deferring the chunk, failing it, or
+                    # halting the pass (provider circuit open)
+                    if retry_enabled:
+                        decision, error_kind = decide_chunk_failure(config, e, chunk["attempts"])
+                    else:
+                        decision, error_kind = "fail", classify_model_error(e)
+                    chunk["last_error"] = str(e)
+                    chunk["last_updated_at"] = datetime.datetime.now().isoformat()
+
+                    if decision == "halt":
+                        # The call was refused, not attempted
+                        chunk["status"] = entry.get("previous_status") or "pending"
+                        chunk["attempts"] = max(0, chunk["attempts"] - 1)
+                        halt_reason = error_kind
+                        halt_provider = getattr(e, "provider", None)
+                        log(
+                            f"Chunk {chunk_id} not sent: {e}",
+                            {**context, "step": "call_refused", "error_kind": error_kind},
+                            config
+                        )
+                    else:
+                        chunk["status"] = "pending" if decision == "defer" else "failed"
+                        start_line, end_line = line_index.resolve(entry["position"])
+                        outcome = "timeout" if error_kind == "timeout" else "failed"
+                        chunk["metrics"] = _chunk_metrics(entry["metrics"], outcome, end_line - start_line + 1, 0)
+                        if yield_model is not None and chunk_id in chunk_features:
+                            yield_errors.append(yield_model.update(chunk_features[chunk_id], 0.0))
+
+                        log(
+                            f"ERROR processing chunk {chunk_id} ({error_kind}, {'deferred to a later pass' if decision == 'defer' else 'failed'}): {e}",
+                            {**context, "step": "error", "error_kind": error_kind, "decision": decision},
+                            config
+                        )
+
+                        if decision == "defer":
+                            chunks_deferred += 1
+                        else:
+                            chunks_failed += 1
+                        consecutive_failures += 1
+
+            if entry["outcome"] is None:
+                # Invariant check: Validate lines after update
+                if not dry_run and chunks_succeeded > 0:
+                    if len(document) == 0:
+                        violation_msg = "Document is empty after update"
+                        log(
+                            f"INVARIANT VIOLATION: {violation_msg}",
+                            {**context, "step": "invariant_violation"},
+                            config
+                        )
+                        if config.safety.stop_on_invariant_violation:
+                            raise RuntimeError(f"Invariant violation: {violation_msg}")
+
+                # Record the transition after each chunk
+                journal.append(chunk, line_diff=line_diff, total_lines=len(document))
+                record_span(
+                    "chunk", "chunk", entry.get("trace_start_ns", 0),
+                    {"chunk": chunk_id, "status": chunk["status"], "line_diff": line_diff}, async_id=chunk_id
                 )
-            
-            # Replace chunk in lines array
-            # Convert improved text to lines
-            improved_lines = improved_text.splitlines(keepends=False)
-            # Add newlines to match original format
-            improved_lines_with_newlines = [line + "\n" for line in improved_lines]
-            
-            # Calculate line count change
-            orig_line_count = end_line - start_line + 1
-            new_line_count = len(improved_lines_with_newlines)
-            line_diff = new_line_count - orig_line_count
-            
-            # Replace in lines array
-            lines[start_line - 1:end_line] = improved_lines_with_newlines
-            
-            # Update subsequent chunks' line numbers
-            if line_diff != 0:
-                for other_chunk in state["chunks"]:
-                    if other_chunk["id"] > chunk_id:
-                        other_chunk["start_line"] += line_diff
-                        other_chunk["end_line"] += line_diff
-            
-            # Update chunk status
-            chunk["status"] = "done"
-            chunk["last_error"] = None
-            chunk["last_updated_at"] = datetime.datetime.now().isoformat()
-            
-            # Update meta
-            state["meta"]["total_lines"] = len(lines)
-            state["meta"]["updated_at"] = datetime.datetime.now().isoformat()
-            
-            log(
-                f"Updated chunk {chunk_id}: new_total_lines={len(lines)} line_diff={line_diff:+d}",
-                {**context, "step": "update_file"},
-                config
-            )
-            
-            chunks_succeeded += 1
-            consecutive_failures = 0  # Reset on success
-            
-        except Exception as e:
-            # Mark as failed
-            chunk["status"] = "failed"
-            chunk["last_error"] = str(e)
-            chunk["last_updated_at"] = datetime.datetime.now().isoformat()
-            
-            log(
-                f"ERROR processing chunk {chunk_id}: {e}",
-                {**context, "step": "error"},
-                config
-            )
-            
-            chunks_failed += 1
-            consecutive_failures += 1
-        
-        # Invariant check: Validate lines after update
-        if not dry_run and chunks_succeeded > 0:
-            if len(lines) == 0:
-                violation_msg = "Lines array is empty after update"
+
+            # Check halt conditions (before processing further chunks). With the
+            # retry policy on, only an open circuit halts the pass; otherwise
+            # the legacy consecutive-failure limit applies.
+            if not retry_enabled and consecutive_failures >= config.safety.max_consecutive_failures and not stop_submitting:
+                halt_reason = "consecutive_failures"
                 log(
-                    f"INVARIANT VIOLATION: {violation_msg}",
-                    {**context, "step": "invariant_violation"},
+                    f"Stopping pass: {consecutive_failures} consecutive failures (max={config.safety.max_consecutive_failures})",
+                    {"command": command_name, "step": "stop_consecutive_failures", "consecutive_failures": consecutive_failures},
                     config
                 )
-                if config.safety.stop_on_invariant_violation:
-                    raise RuntimeError(f"Invariant violation: {violation_msg}")
-        
-        # Save state after each chunk
-        save_state(config, state)
-    
-    lines_after = len(lines)
-    
+            elif halt_reason and not stop_submitting:
+                log(
+                    f"Stopping pass: {'usage budget exhausted' if halt_reason == 'budget' else 'circuit open'} for provider {halt_provider or '-'}",
+                    {"command": command_name, "step": "stop_halt", "halt_reason": halt_reason, "provider": halt_provider or "-"},
+                    config
+                )
+            if halt_reason and not stop_submitting:
+                stop_submitting = True
+                queue.clear()
+                _discard_in_flight(config, in_flight, command_name, journal)
+    finally:
+        if executor is not None:
+            # Drop queued work; running model calls are allowed to finish
+            executor.shutdown(wait=True, cancel_futures=True)
+        # Chunks still in flight here were abandoned by an exception; do not
+        # leave them marked as running in the saved state.
+        if in_flight:
+            _discard_in_flight(config, in_flight, command_name, journal)
+        line_index.materialize()
+        journal.close()
+        apply_log.close()
+        if yield_errors:
+            yield_model.save(state)
+        # Compact the journal into a snapshot at the pass boundary
+        if journal.records_written:
+            save_state(config, state)
+        record_span("pass", "pass", pass_trace_start, {"command": command_name, "chunks": len(candidate_chunks)})
+
+    lines_after = len(document)
+
+    if prompt_prefix_tokens or prompt_suffix_tokens:
+        prompt_tokens = prompt_prefix_tokens + prompt_suffix_tokens
+        log(
+            f"Prompt tokens (est.) this pass: total={prompt_tokens} prefix={prompt_prefix_tokens} "
+            f"({prompt_prefix_tokens / prompt_tokens * 100:.1f}% cacheable) suffix={prompt_suffix_tokens}",
+            {"command": command_name, "step": "prompt_tokens", "prefix_hash": ENHANCE_PROMPT_PREFIX_HASH, "prompt_prefix_tokens": prompt_prefix_tokens, "prompt_suffix_tokens": prompt_suffix_tokens},
+            config
+        )
+
+    if yield_errors:
+        log(
+            f"Scheduler model updated from {len(yield_errors)} chunk(s): "
+            f"mean_abs_error={sum(abs(error) for error in yield_errors) / len(yield_errors):.1f} lines "
+            f"samples={yield_model.samples}",
+            {"command": command_name, "step": "schedule_update", "scheduler": "growth_yield"},
+            config
+        )
+
+    if batched_calls:
+        log(
+            f"Batched {batched_chunks} small chunk(s) into {batched_calls} call(s)",
+            {"command": command_name, "step": "batch_summary", "batched_calls": batched_calls, "batched_chunks": batched_chunks},
+            config
+        )
+
     pass_stats = {
         "chunks_attempted": chunks_attempted,
         "chunks_succeeded": chunks_succeeded,
         "chunks_failed": chunks_failed,
         "lines_before": lines_before,
         "lines_after": lines_after,
+        "chunks_deferred": chunks_deferred,
         "consecutive_failures": consecutive_failures,
-        "stopped_early": consecutive_failures >= config.safety.max_consecutive_failures
+        "stopped_early": halt_reason is not None,
+        "halt_reason": halt_reason,
+        "halt_provider": halt_provider,
+        "prompt_prefix_tokens": prompt_prefix_tokens,
+        "prompt_suffix_tokens": prompt_suffix_tokens,
+        "batched_calls": batched_calls,
+        "batched_chunks": batched_chunks
     }
-    
-    return state, lines, pass_stats
+
+    return state, document, pass_stats
+
+
+def _chunk_metrics(call_metrics: dict, outcome: str, lines_in: int, lines_out: int) -> dict:
+    """
+    Build the per-chunk metrics record used by adaptive chunk sizing.
+    """
+    latency = call_metrics.get("latency_seconds")
+    return {
+        "latency_seconds": round(latency, 3) if latency is not None else None,
+        "lines_in": lines_in,
+        "lines_out": lines_out,
+        "outcome": outcome,
+        "cached": bool(call_metrics.get("cached", False)),
+        "retries": int(call_metrics.get("retries", 0)),
+    }
+
+
+def _discard_in_flight(
+    config: Config,
+    in_flight: collections.deque,
+    command_name: str,
+    journal: StateJournal,
+) -> None:
+    """
+    Abandon chunks that were submitted but whose results will not be applied.
+
+    Pending model calls are cancelled where possible; each chunk is restored to
+    the status it had before it was marked running, so it stays eligible for a
+    later pass.
+    """
+    restored = 0
+    while in_flight:
+        entry = in_flight.popleft()
+        future = entry.get("future")
+        if future is None:
+            continue
+        future.cancel()
+        chunk = entry["chunk"]
+        if chunk["status"] == "running":
+            chunk["status"] = entry.get("previous_status") or "pending"
+            chunk["last_updated_at"] = datetime.datetime.now().isoformat()
+            journal.append(chunk)
+            restored += 1
+
+    if restored:
+        log(
+            f"Discarded {restored} in-flight chunk(s); restored previous status",
+            {"command": command_name, "step": "discard_in_flight", "restored": restored},
+            config
+        )
 
 
 def command_enhance(
     config: Config,
     limit: typing.Optional[int] = None,
-    dry_run: bool = False
+    dry_run: bool = False,
+    use_cache: bool = True
 ) -> int:
     """
     Run enhancement loop on pending chunks (single pass).
@@ -3527,6 +7820,7 @@ def command_enhance(
         config: Config object
         limit: Maximum number of chunks to process (None = all)
         dry_run: If True, don't modify files, just log what would happen
+        use_cache: If False, bypass the response cache (--no-cache)
     """
     log(
         f"Running 'enhance' command (limit={limit}, dry_run={dry_run})",
@@ -3534,6 +7828,10 @@ def command_enhance(
         config
     )
     
+    # Finish or roll back a pass interrupted by a crash
+    if not dry_run:
+        recover_interrupted_pass(config, "enhance")
+    
     # Load state
     state = load_state(config)
     if state is None:
@@ -3546,21 +7844,20 @@ def command_enhance(
         log(f"ERROR: PRD file not found: {prd_path}", {"command": "enhance", "step": "error"}, config)
         return 1
     
-    with open(prd_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+    document = PrdDocument.from_file(prd_path)
     
     # Run enhancement pass
-    state, lines, pass_stats = run_enhancement_pass(
-        config, state, lines, max_chunks=limit, dry_run=dry_run, command_name="enhance"
+    state, document, pass_stats = run_enhancement_pass(
+        config, state, document, max_chunks=limit, dry_run=dry_run, command_name="enhance",
+        use_cache=use_cache
     )
     
     # Write updated PRD file (if not dry-run and we processed something)
     if not dry_run and pass_stats["chunks_succeeded"] > 0:
         try:
-            content = "".join(lines)
-            atomic_write_file(prd_path, content)
+            commit_prd_document(config, prd_path, document)
             log(
-                f"Wrote updated PRD file ({len(lines)} lines)",
+                f"Wrote updated PRD file ({len(document)} lines)",
                 {"command": "enhance", "step": "write_file"},
                 config
             )
@@ -3582,7 +7879,11 @@ def command_enhance(
     return 0 if pass_stats["chunks_failed"] == 0 else 1
 
 
-def command_grow(config: Config, dry_run: bool = False) -> int:
+# Number of growth passes kept in meta.growth.pass_history (read by perf_suggest)
+PASS_HISTORY_LIMIT = 50
+
+
+def command_grow(config: Config, dry_run: bool = False, use_cache: bool = True) -> int:
     """
     Run autonomous growth loop to expand prd.md towards target line count.
     
@@ -3592,6 +7893,7 @@ def command_grow(config: Config, dry_run: bool = False) -> int:
     Args:
         config: Config object
         dry_run: If True, log operations without making changes
+        use_cache: If False, bypass the response cache (--no-cache)
     """
     log(f"Running 'grow' command: dry_run={dry_run}", {"command": "grow", "dry_run": dry_run, "step": "start"}, config)
     
@@ -3601,17 +7903,19 @@ def command_grow(config: Config, dry_run: bool = False) -> int:
         print("[DRY_RUN] grow command would expand PRD, but dry-run mode is enabled. No changes made.")
         return 0
     
-    # Load state
-    state = load_state(config)
-    if state is None:
-        log("ERROR: State file not found. Run 'init' first.", {"command": "grow", "step": "error"}, config)
-        return 1
+    # Finish or roll back a pass interrupted by a crash
+    recover_interrupted_pass(config, "grow")
     
-    # Read PRD file
-    prd_path = pathlib.Path(config.master_md_path)
-    if not prd_path.exists():
-        log(f"ERROR: PRD file not found: {prd_path}", {"command": "grow", "step": "error"}, config)
+    # Load state and PRD once; passes work on the in-memory workspace
+    workspace = GrowWorkspace(config)
+    prd_path = workspace.prd_path
+    if not workspace.open():
+        if workspace.state is None:
+            log("ERROR: State file not found. Run 'init' first.", {"command": "grow", "step": "error"}, config)
+        else:
+            log(f"ERROR: PRD file not found: {prd_path}", {"command": "grow", "step": "error"}, config)
         return 1
+    state = workspace.state
     
     # Initialize growth tracking
     growth_meta = state["meta"].get("growth", {})
@@ -3632,12 +7936,13 @@ def command_grow(config: Config, dry_run: bool = False) -> int:
     # Main growth loop
     passes_completed = 0
     stop_reason = None
+    circuit_waits = 0
     
     for pass_index in range(1, max_passes + 1):
-        # Check stop conditions before starting pass
-        with open(prd_path, 'r', encoding='utf-8') as f:
-            current_lines = f.readlines()
-        current_line_count = len(current_lines)
+        # Check stop conditions before starting pass (re-reads prd.md only if
+        # it was modified outside this run)
+        workspace.refresh()
+        current_line_count = workspace.line_count
         
         # Stop condition: target reached (within 5% tolerance)
         if current_line_count >= target_line_count * 0.95:
@@ -3666,14 +7971,12 @@ def command_grow(config: Config, dry_run: bool = False) -> int:
                 {"command": "grow", "step": "growth_rebuild_state", "pass_index": current_pass},
                 config
             )
-            # Preserve growth metadata
-            preserve_growth = state["meta"].get("growth", {})
-            state = build_state_from_file(config, growth_pass=current_pass, preserve_growth_meta=preserve_growth)
+            # Keeps unchanged chunks; falls back to a full rebuild when needed
+            state = rechunk_state(config, state, growth_pass=current_pass, lines=workspace.lines())
+            workspace.state = state
             save_state(config, state)
         
-        # Read current PRD lines
-        with open(prd_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        document = workspace.document
         
         # Check if there are eligible chunks
         pending_chunks = [chunk for chunk in state["chunks"] if chunk["status"] == "pending"]
@@ -3698,20 +8001,21 @@ def command_grow(config: Config, dry_run: bool = False) -> int:
                 break
         
         # Run enhancement pass
+        pass_started = time.monotonic()
         try:
-            state, lines, pass_stats = run_enhancement_pass(
-                config, state, lines, max_chunks=max_chunks_per_pass, dry_run=False, command_name="grow"
+            state, document, pass_stats = run_enhancement_pass(
+                config, state, document, max_chunks=max_chunks_per_pass, dry_run=False, command_name="grow",
+                use_cache=use_cache
             )
             
-            # Check if stopped early due to consecutive failures
+            # Stopped early: the pass's results are still written below, then
+            # the run either waits out an open circuit or stops
             if pass_stats.get("stopped_early"):
-                stop_reason = "too_many_failures"
                 log(
-                    f"Growth pass {current_pass} stopped early due to consecutive failures",
-                    {"command": "grow", "step": "stop_consecutive_failures", "pass_index": current_pass},
+                    f"Growth pass {current_pass} stopped early ({pass_stats.get('halt_reason') or 'consecutive_failures'})",
+                    {"command": "grow", "step": "stop_consecutive_failures", "pass_index": current_pass, "halt_reason": pass_stats.get("halt_reason") or "-"},
                     config
                 )
-                break
         except RuntimeError as e:
             # Invariant violation or other runtime error
             if config.safety.stop_on_invariant_violation:
@@ -3741,10 +8045,9 @@ def command_grow(config: Config, dry_run: bool = False) -> int:
         # Write updated PRD file
         if pass_stats["chunks_succeeded"] > 0:
             try:
-                content = "".join(lines)
-                atomic_write_file(prd_path, content)
+                workspace.write_document()
                 log(
-                    f"Wrote updated PRD file ({len(lines)} lines)",
+                    f"Wrote updated PRD file ({len(document)} lines)",
                     {"command": "grow", "step": "write_file", "pass_index": current_pass},
                     config
                 )
@@ -3754,6 +8057,8 @@ def command_grow(config: Config, dry_run: bool = False) -> int:
                     {"command": "grow", "step": "write_error", "pass_index": current_pass},
                     config
                 )
+                # Unwritten edits are lost; keep the summary in line with disk
+                workspace.reload()
                 stop_reason = "error"
                 break
         
@@ -3766,8 +8071,20 @@ def command_grow(config: Config, dry_run: bool = False) -> int:
             "chunks_succeeded": pass_stats["chunks_succeeded"],
             "chunks_failed": pass_stats["chunks_failed"],
             "lines_before": pass_stats["lines_before"],
-            "lines_after": pass_stats["lines_after"]
+            "lines_after": pass_stats["lines_after"],
+            "prompt_prefix_tokens": pass_stats.get("prompt_prefix_tokens", 0),
+            "prompt_suffix_tokens": pass_stats.get("prompt_suffix_tokens", 0)
         }
+        pass_history = state["meta"]["growth"].setdefault("pass_history", [])
+        pass_history.append({
+            **state["meta"]["growth"]["last_pass_summary"],
+            "finished_at": datetime.datetime.now().isoformat(),
+            "duration_seconds": round(time.monotonic() - pass_started, 3),
+            "max_chunks_per_pass": max_chunks_per_pass,
+            "chunk_size_lines": config.chunk_size_lines,
+            "max_parallel_chats": config.max_parallel_chats,
+        })
+        del pass_history[:-PASS_HISTORY_LIMIT]
         state["meta"]["total_lines"] = pass_stats["lines_after"]
         state["meta"]["updated_at"] = datetime.datetime.now().isoformat()
         save_state(config, state)
@@ -3802,19 +8119,40 @@ def command_grow(config: Config, dry_run: bool = False) -> int:
                 {"command": "grow", "step": "growth_stop_condition", "reason": stop_reason},
                 config
             )
-            break
+            break
+
+        if pass_stats.get("stopped_early"):
+            if pass_stats.get("halt_reason") == "budget":
+                stop_reason = "budget_exhausted"
+                break
+            if pass_stats.get("halt_reason") != "circuit_open":
+                stop_reason = "too_many_failures"
+                break
+            # Provider circuit open: wait for its cooldown instead of ending an
+            # unattended run, a limited number of times
+            retry_policy = get_retry_policy(config)
+            if not retry_policy.get("wait_for_circuit", True) or circuit_waits >= int(retry_policy["max_circuit_waits_per_run"]):
+                stop_reason = "circuit_open"
+                break
+            circuit_waits += 1
+            provider = pass_stats.get("halt_provider") or describe_model_target(config)[0]
+            wait_seconds = get_circuit_breaker(config, provider).retry_in()
+            log(
+                f"Circuit open for provider {provider}; waiting {wait_seconds:.0f}s before the next pass ({circuit_waits}/{retry_policy['max_circuit_waits_per_run']})",
+                {"command": "grow", "step": "circuit_wait", "pass_index": current_pass, "provider": provider},
+                config
+            )
+            time.sleep(wait_seconds)
     
     # Final summary
     if stop_reason is None:
         stop_reason = "max_passes"
     
-    # Read final line count
-    with open(prd_path, 'r', encoding='utf-8') as f:
-        final_lines = f.readlines()
-    final_line_count = len(final_lines)
+    # Final line count and chunk statuses come from the workspace
+    final_line_count = workspace.line_count
     
     # Count final chunk statuses
-    final_state = load_state(config)
+    final_state = workspace.state
     if final_state:
         final_pending = len([c for c in final_state["chunks"] if c["status"] == "pending"])
         final_done = len([c for c in final_state["chunks"] if c["status"] == "done"])
@@ -3843,11 +8181,11 @@ def command_grow(config: Config, dry_run: bool = False) -> int:
     return 0
 
 
-def command_start(config: Config, limit: typing.Optional[int] = None, dry_run: bool = False) -> int:
+def command_start(config: Config, limit: typing.Optional[int] = None, dry_run: bool = False, use_cache: bool = True) -> int:
     """
     Alias for 'enhance' command.
     """
-    return command_enhance(config, limit, dry_run)
+    return command_enhance(config, limit, dry_run, use_cache)
 
 
 def command_sync_roles(config: Config) -> int:
@@ -4050,7 +8388,8 @@ def command_impl_phase(
     config: Config,
     phase_id: str,
     limit_files: typing.Optional[int] = None,
-    dry_run: bool = False
+    dry_run: bool = False,
+    use_cache: bool = True
 ) -> int:
     """
     Implement a specific phase or task.
@@ -4060,6 +8399,7 @@ def command_impl_phase(
         phase_id: Phase ID to implement (e.g., "3.2.1")
         limit_files: Maximum number of files to generate (None = use config default)
         dry_run: If True, don't write files, just log what would happen
+        use_cache: If False, bypass the response cache (--no-cache)
     """
     log(
         f"Running 'impl_phase' command: phase_id={phase_id} limit_files={limit_files} dry_run={dry_run}",
@@ -4122,6 +8462,9 @@ def command_impl_phase(
     # Extract relevant PRD excerpt (simplified - in full implementation, find the actual phase section)
     prd_excerpt = prd_content[:2000]  # First 2000 chars as context
     
+    cache = get_response_cache(config, use_cache)
+    provider, model = describe_model_target(config)
+    
     files_created = 0
     files_updated = 0
     files_failed = 0
@@ -4150,12 +8493,24 @@ def command_impl_phase(
             )
             continue
         
-        # Send to model
+        # Send to model (or reuse a cached response for the same prompt)
         try:
-            response = send_to_model(
-                prompt, "", phase_id, 0, 0,
-                config.wait_seconds, config
-            )
+            cache_key = ResponseCache.make_key(provider, model, prompt) if cache else None
+            response = cache.get(cache_key) if cache else None
+            from_cache = response is not None
+            if from_cache:
+                log(
+                    f"Response cache hit for task {task['task_id']} (key={cache_key[:12]})",
+                    {"command": "impl_phase", "step": "cache_hit", "task_id": task["task_id"]},
+                    config
+                )
+            else:
+                started = time.perf_counter()
+                response = send_to_model(
+                    prompt, "", phase_id, 0, 0,
+                    config.wait_seconds, config
+                )
+                perf_count("impl_model_call", time.perf_counter() - started, len(response))
             
             log(
                 f"Received implementation response (length={len(response)})",
@@ -4164,7 +8519,9 @@ def command_impl_phase(
             )
             
             # Parse code files
+            started = time.perf_counter()
             code_files = parse_code_file_blocks(response)
+            perf_count("code_parse", time.perf_counter() - started, len(response))
             
             if not code_files:
                 log(
@@ -4175,6 +8532,9 @@ def command_impl_phase(
                 files_failed += 1
                 continue
             
+            if cache and not from_cache:
+                cache.put(cache_key, response, provider, model)
+            
             # Write files
             for code_file in code_files:
                 file_path = code_file["path"]
@@ -4523,36 +8883,504 @@ def command_smoke_test(config: Config) -> int:
     return 0
 
 
-def command_benchmark_growth(config: Config) -> int:
+try:
+    import resource  # POSIX only; without it benchmarks report no peak RSS
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+# Line counts benchmarked when --bench-sizes is not given (1000000 is opt-in)
+BENCHMARK_DEFAULT_SIZES = (1000, 10000, 100000)
+
+# Perf counter groups reported by benchmark_growth: state persistence vs document editing
+BENCHMARK_STATE_COUNTERS = ("state_snapshot", "state_journal", "apply_log")
+BENCHMARK_DOCUMENT_COUNTERS = ("document_edit", "prd_write")
+
+
+def generate_synthetic_prd(line_count: int, seed: int = 0) -> typing.Iterator[str]:
     """
-    Run growth benchmarks to measure PRD expansion performance.
-    
-    This is a conceptual command stub. Full implementation would:
-    - Measure baseline line count
-    - Run controlled growth pass
-    - Calculate metrics (lines per pass, success rate)
-    - Report results
+    Yield a deterministic synthetic PRD of exactly line_count lines.
+
+    The text mixes numbered headings, prose, bullets with TBD placeholders,
+    [OPEN_QUESTION] markers, tables and code fences, so chunk planning, the
+    growth-yield scheduler and the apply path see realistic structure.
+
+    Args:
+        line_count: Number of lines to generate
+        seed: Seed for the block sequence (same seed, same document)
+
+    Yields:
+        Lines, each ending with a newline
+    """
+    rng = random.Random(seed)
+    words = (
+        "user", "service", "latency", "budget", "release", "schema", "account", "session",
+        "metric", "rollout", "cache", "queue", "export", "policy", "review", "tenant",
+    )
+    emitted = 0
+    section = 0
+    while emitted < line_count:
+        section += 1
+        block = [f"# {section}. Synthetic Section {section}", ""]
+        for sub in range(1, rng.randint(2, 4) + 1):
+            block += [f"## {section}.{sub} {rng.choice(words).title()} {rng.choice(words).title()}", ""]
+            kind = rng.randrange(4)
+            if kind == 0:
+                block += [" ".join(rng.choice(words) for _ in range(rng.randint(8, 16))) + "." for _ in range(rng.randint(2, 5))]
+            elif kind == 1:
+                block += [f"- {rng.choice(words).title()} requirement: TBD" if rng.random() < 0.3 else f"- {rng.choice(words).title()} handles {rng.choice(words)}" for _ in range(rng.randint(3, 6))]
+                if rng.random() < 0.5:
+                    block.append(f"- [OPEN_QUESTION] Who owns {rng.choice(words)} {rng.choice(words)}?")
+            elif kind == 2:
+                block += ["| Item | Owner | Status |", "|------|-------|--------|"]
+                block += [f"| {rng.choice(words)} | {rng.choice(words)} | {rng.choice(('TBD', 'done', 'planned'))} |" for _ in range(rng.randint(2, 5))]
+            else:
+                block += ["```python", f"def handle_{rng.choice(words)}(request):", "    ...", "```"]
+            block.append("")
+        for line in block[:line_count - emitted]:
+            yield line + "\n"
+        emitted += min(len(block), line_count - emitted)
+
+
+def parse_benchmark_sizes(value: typing.Optional[str]) -> list[int]:
+    """
+    Parse --bench-sizes ("1000,10k,1m") into ascending line counts.
+
+    Raises:
+        ValueError: If a size is not a positive integer (with optional k/m suffix)
+    """
+    if not value:
+        return list(BENCHMARK_DEFAULT_SIZES)
+    sizes = []
+    for part in value.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        factor = {"k": 1000, "m": 1000000}.get(part[-1], 1)
+        number = part[:-1] if factor > 1 else part
+        if not number.isdigit() or int(number) <= 0:
+            raise ValueError(f"Invalid benchmark size: {part!r}")
+        sizes.append(int(number) * factor)
+    return sorted(set(sizes))
+
+
+def _peak_rss_mb() -> typing.Optional[float]:
+    """Peak resident set size of this process in MB (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+# Settings pinned for benchmark runs so results do not depend on timing noise
+BENCHMARK_PINNED_SETTINGS = {
+    "adaptive_chunking": False,
+    "scheduler": "file_order",
+}
+
+
+def _benchmark_raw_config(config: Config, latency: float) -> dict:
+    """
+    Config data for one benchmark run: fake provider, no cache/git, paths
+    relative to the run dir. Adaptive chunking (sized from measured latency)
+    and the scheduler are pinned (BENCHMARK_PINNED_SETTINGS) so identical runs
+    plan identical chunks.
+    """
+    raw = json.loads(json.dumps(config._raw_data or {}))
+    raw.update({
+        "master_md_path": "prd.md",
+        "state_path": ".auto_state.json",
+        "use_cursor_driver": False,
+    })
+    raw.setdefault("git", {})["enable_auto"] = False
+    performance = raw.setdefault("performance", {})
+    performance.setdefault("response_cache", {})["enabled"] = False
+    performance.setdefault("benchmark", {})["fake_latency_seconds"] = latency
+    performance.setdefault("chunking_tuning", {})["adaptive_chunking"] = BENCHMARK_PINNED_SETTINGS["adaptive_chunking"]
+    performance.setdefault("growth_tuning", {})["scheduler"] = BENCHMARK_PINNED_SETTINGS["scheduler"]
+    return raw
+
+
+@contextlib.contextmanager
+def _benchmark_run(raw: dict) -> typing.Iterator[Config]:
+    """
+    Run a benchmark in a scratch directory: writes `raw` as its auto_config.json,
+    chdirs there, resets the perf counters and yields the loaded Config.
+    """
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="auto_bench_") as run_dir:
+        os.chdir(run_dir)
+        # Absolute, so the run gets its own log sink rather than the caller's
+        raw = {**raw, "log_path": os.path.join(run_dir, "auto_master.log")}
+        try:
+            config_path = pathlib.Path("auto_config.json")
+            atomic_write_file(config_path, json.dumps(raw, indent=2))
+            reset_perf_counters()
+            yield load_config(config_path)
+        finally:
+            close_log_sink(raw["log_path"])
+            os.chdir(original_cwd)
+
+
+def _counter_group(counters: dict, names: tuple) -> dict:
+    """Sum perf counters for `names` into {"seconds", "bytes", "calls"}."""
+    return {
+        "seconds": round(sum(counters.get(f"{name}_seconds", 0.0) for name in names), 4),
+        "bytes": int(sum(counters.get(f"{name}_bytes", 0) for name in names)),
+        "calls": int(sum(counters.get(f"{name}_calls", 0) for name in names)),
+    }
+
+
+def _write_benchmark_report(config: Config, name: str, report: dict, output: typing.Optional[str]) -> str:
+    """
+    Write a benchmark report as sorted-key JSON.
+
+    Without an explicit output path the report goes to
+    performance.benchmark.output_dir (default .auto_cache/benchmarks).
+
+    Returns:
+        Path the report was written to
+    """
+    if output is None:
+        output_dir = pathlib.Path(get_benchmark_settings(config).get("output_dir", ".auto_cache/benchmarks"))
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output = str(output_dir / f"{name}_{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    atomic_write_file(pathlib.Path(output), json.dumps(report, indent=2, sort_keys=True) + "\n")
+    return output
+
+
+def run_growth_benchmark(config: Config, size: int, latency: float, chunks: int, passes: int, seed: int = 0) -> dict:
+    """
+    Run command_grow on a synthetic PRD of `size` lines in a scratch directory.
+
+    Returns:
+        Result dict: timings, chunk/line throughput, bytes written, the split
+        between state persistence and document editing, and peak RSS
+    """
+    raw = _benchmark_raw_config(config, latency)
+    raw.setdefault("growth", {}).update({
+        "target_line_count": size + size // 2,
+        "max_passes": passes,
+        "max_chunks_per_pass": chunks,
+        "stop_when_all_done": True,
+    })
+    with _benchmark_run(raw) as bench_config:
+        started = time.perf_counter()
+        atomic_write_file(pathlib.Path(bench_config.master_md_path), generate_synthetic_prd(size, seed))
+        state = build_state_from_file(bench_config)
+        save_state(bench_config, state)
+        setup_seconds = time.perf_counter() - started
+
+        reset_perf_counters()
+        started = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            exit_code = command_grow(bench_config, use_cache=False)
+        grow_seconds = time.perf_counter() - started
+        counters = snapshot_perf_counters()
+
+        state = load_state(bench_config) or {}
+        history = state.get("meta", {}).get("growth", {}).get("pass_history", [])
+        lines_after = pathlib.Path(bench_config.master_md_path).read_text(encoding="utf-8").count("\n")
+
+    chunks_attempted = sum(entry.get("chunks_attempted", 0) for entry in history)
+    chunks_succeeded = sum(entry.get("chunks_succeeded", 0) for entry in history)
+    lines_added = lines_after - size
+
+    return {
+        "size_lines": size,
+        "exit_code": exit_code,
+        "passes": len(history),
+        "chunks_attempted": chunks_attempted,
+        "chunks_succeeded": chunks_succeeded,
+        "lines_after": lines_after,
+        "lines_added": lines_added,
+        "setup_seconds": round(setup_seconds, 4),
+        "grow_seconds": round(grow_seconds, 4),
+        "chunks_per_second": round(chunks_attempted / grow_seconds, 2) if grow_seconds > 0 else None,
+        "lines_per_second": round(lines_added / grow_seconds, 2) if grow_seconds > 0 else None,
+        "state_persistence": _counter_group(counters, BENCHMARK_STATE_COUNTERS),
+        "document_editing": _counter_group(counters, BENCHMARK_DOCUMENT_COUNTERS),
+        "bytes_written": _counter_group(counters, BENCHMARK_STATE_COUNTERS + BENCHMARK_DOCUMENT_COUNTERS)["bytes"],
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def command_benchmark_growth(
+    config: Config,
+    sizes: typing.Optional[str] = None,
+    latency: typing.Optional[float] = None,
+    chunks: typing.Optional[int] = None,
+    passes: typing.Optional[int] = None,
+    output: typing.Optional[str] = None,
+) -> int:
+    """
+    Benchmark the growth loop on synthetic PRDs with the in-process fake provider.
+
+    Each size runs in its own scratch directory, so the real prd.md and state
+    are never touched. Results are written as JSON (stable key order, one
+    entry per size) for diffing between revisions.
+
+    Args:
+        config: Config object (performance.benchmark supplies defaults)
+        sizes: Comma-separated line counts (--bench-sizes), e.g. "1000,10k,1m"
+        latency: Simulated provider latency per call in seconds (--bench-latency)
+        chunks: Chunks per pass (--bench-chunks)
+        passes: Growth passes per size
+        output: Path for the JSON report (--output)
     """
     log("Running 'benchmark_growth' command", {"command": "benchmark_growth", "step": "start"}, config)
-    print("benchmark_growth is not fully implemented yet, but stub is reachable and safe.")
-    print("This command would measure: growth rate, success rate, quality metrics")
-    return 0
+    settings = get_benchmark_settings(config)
+    try:
+        size_list = parse_benchmark_sizes(sizes or settings.get("sizes"))
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    if latency is None:
+        latency = float(settings.get("fake_latency_seconds", 0) or 0)
+    if chunks is None:
+        chunks = int(settings.get("chunks_per_pass", config.growth.max_chunks_per_pass))
+    if passes is None:
+        passes = int(settings.get("passes", 2))
+    seed = int(settings.get("seed", 0))
+
+    results = []
+    for size in size_list:
+        log(
+            f"benchmark_growth: size={size} latency={latency}s chunks_per_pass={chunks} passes={passes}",
+            {"command": "benchmark_growth", "step": "run", "size": size},
+            config
+        )
+        results.append(run_growth_benchmark(config, size, latency, chunks, passes, seed))
+
+    report = {
+        "benchmark": "growth",
+        "template_version": TEMPLATE_VERSION,
+        "python": platform.python_version(),
+        "timestamp": datetime.datetime.now().isoformat(),
+        "settings": {
+            "sizes": size_list,
+            "fake_latency_seconds": latency,
+            "chunks_per_pass": chunks,
+            "passes": passes,
+            "seed": seed,
+            "chunk_strategy": config.chunk_strategy,
+            "chunk_size_lines": config.chunk_size_lines,
+            "max_parallel_chats": config.max_parallel_chats,
+            **BENCHMARK_PINNED_SETTINGS,
+        },
+        "results": results,
+    }
+    output = _write_benchmark_report(config, "growth", report, output)
+
+    print("\n" + "="*60)
+    print("GROWTH BENCHMARK")
+    print("="*60)
+    print(f"{'Lines':>9} {'Chunks':>7} {'Grow s':>8} {'Chunks/s':>9} {'Lines/s':>9} {'State s':>8} {'Doc s':>7} {'RSS MB':>7}")
+    for result in results:
+        print(
+            f"{result['size_lines']:>9} {result['chunks_attempted']:>7} {result['grow_seconds']:>8.2f} "
+            f"{result['chunks_per_second'] or 0:>9.2f} {result['lines_per_second'] or 0:>9.1f} "
+            f"{result['state_persistence']['seconds']:>8.3f} {result['document_editing']['seconds']:>7.3f} "
+            f"{result['peak_rss_mb'] if result['peak_rss_mb'] is not None else '-':>7}"
+        )
+    print(f"\nReport written to {output}")
+
+    log(
+        f"benchmark_growth complete: {len(results)} size(s)",
+        {"command": "benchmark_growth", "step": "complete"},
+        config
+    )
+    return 0 if all(result["exit_code"] == 0 for result in results) else 1
 
 
-def command_benchmark_impl(config: Config) -> int:
+# Task counts benchmarked by benchmark_impl when --bench-sizes is not given
+BENCHMARK_DEFAULT_TASK_COUNTS = (1000, 5000)
+
+# Tasks generated per phase in the synthetic task PRD
+BENCHMARK_TASKS_PER_PHASE = 3
+
+
+def generate_synthetic_task_prd(task_count: int, seed: int = 0) -> typing.Iterator[str]:
     """
-    Run implementation benchmarks to test code generation pipeline.
-    
-    This is a conceptual command stub. Full implementation would:
-    - Verify implementation plan exists
-    - Test impl_phase dry-run
-    - Validate file paths and parsing
-    - Report results
+    Yield a deterministic synthetic PRD with task_count `#### Task:` blocks.
+
+    Tasks are grouped BENCHMARK_TASKS_PER_PHASE to a phase (1.1.1, 1.1.2, ...)
+    and carry the Summary and Target Files lines build_implementation_plan()
+    looks for; summaries rotate through keywords so every track is hit.
+
+    Yields:
+        Lines, each ending with a newline
+    """
+    rng = random.Random(seed)
+    topics = ("api endpoint", "database schema", "ai model", "test suite", "deploy pipeline", "settings screen")
+    extensions = ("ts", "tsx", "py")
+    yield "# 9. TASKS, BACKLOG & ROADMAP\n"
+    yield "\n"
+    for index in range(task_count):
+        phase_number = index // BENCHMARK_TASKS_PER_PHASE
+        phase_id = f"{phase_number // 100 + 1}.{phase_number // 10 % 10 + 1}.{phase_number % 10 + 1}"
+        if index % BENCHMARK_TASKS_PER_PHASE == 0:
+            yield f"### Phase {phase_id} - Synthetic Phase {phase_number + 1}\n"
+            yield "\n"
+        topic = topics[rng.randrange(len(topics))]
+        slug = topic.replace(" ", "_")
+        yield f"#### Task: {phase_id} - Build {topic} {index + 1}\n"
+        yield f"**Summary:** Build the {topic} for synthetic task {index + 1}\n"
+        yield "**Target Files**:\n"
+        yield f"- `src/generated/{slug}/task_{index + 1}.{extensions[rng.randrange(len(extensions))]}`\n"
+        yield "\n"
+
+
+def synthetic_phase_ids(task_count: int, phase_count: int) -> list[str]:
+    """Phase IDs of the first phase_count phases in generate_synthetic_task_prd(task_count)."""
+    phases = (task_count + BENCHMARK_TASKS_PER_PHASE - 1) // BENCHMARK_TASKS_PER_PHASE
+    return [
+        f"{number // 100 + 1}.{number // 10 % 10 + 1}.{number % 10 + 1}"
+        for number in range(min(phase_count, phases))
+    ]
+
+
+def run_impl_benchmark(config: Config, task_count: int, latency: float, phases: int, files_per_task: int, seed: int = 0) -> dict:
+    """
+    Run the planning stages and impl_phase on a synthetic task PRD in a scratch directory.
+
+    Returns:
+        Result dict: per-stage timings, plan size, files written and files/sec
+    """
+    raw = _benchmark_raw_config(config, latency)
+    raw.setdefault("implementation", {}).update({
+        "enabled": True,
+        "project_root": ".",
+        "impl_allow_overwrite_generated": True,
+    })
+    raw["performance"]["benchmark"]["fake_code_files_per_task"] = files_per_task
+    stages = {}
+
+    def timed(stage: str, func, *args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        stages[stage] = round(time.perf_counter() - started, 4)
+        return result
+
+    with _benchmark_run(raw) as bench_config:
+        prd_path = pathlib.Path(bench_config.master_md_path)
+        timed("generate_prd", atomic_write_file, prd_path, generate_synthetic_task_prd(task_count, seed))
+        prd_lines = timed("read_prd", lambda: prd_path.read_text(encoding="utf-8").splitlines(keepends=True))
+        plan = timed("build_plan", build_implementation_plan, bench_config, prd_lines)
+        plan_markdown = timed("format_plan", format_implementation_plan_markdown, plan)
+        plan_written = timed("write_plan", write_implementation_plan_section, prd_path, plan_markdown, bench_config)
+
+        exit_codes = []
+        started = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for phase_id in synthetic_phase_ids(task_count, phases):
+                exit_codes.append(command_impl_phase(
+                    bench_config, phase_id, limit_files=BENCHMARK_TASKS_PER_PHASE, use_cache=False
+                ))
+        impl_seconds = time.perf_counter() - started
+        stages["impl_phase"] = round(impl_seconds, 4)
+        counters = snapshot_perf_counters()
+
+    model_calls = _counter_group(counters, ("impl_model_call",))
+    code_write = _counter_group(counters, ("code_write",))
+    files_written = code_write["calls"]
+
+    return {
+        "task_count": task_count,
+        "exit_code": 0 if plan_written and all(code == 0 for code in exit_codes) else 1,
+        "tasks_planned": len(plan["tasks"]),
+        "plan_bytes": len(plan_markdown.encode("utf-8")),
+        "phases_implemented": len(exit_codes),
+        "stages": stages,
+        "model_calls": model_calls,
+        "code_parse": _counter_group(counters, ("code_parse",)),
+        "code_write": code_write,
+        "files_written": files_written,
+        "files_per_second": round(files_written / impl_seconds, 2) if impl_seconds > 0 else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def command_benchmark_impl(
+    config: Config,
+    sizes: typing.Optional[str] = None,
+    latency: typing.Optional[float] = None,
+    output: typing.Optional[str] = None,
+) -> int:
+    """
+    Benchmark the implementation pipeline on synthetic task PRDs.
+
+    For each task count: build_implementation_plan(),
+    format_implementation_plan_markdown() and write_implementation_plan_section()
+    are timed on a PRD of `#### Task:` blocks, then impl_phase runs for the
+    first performance.benchmark.impl_phases phases against the fake provider,
+    which answers with canned multi-file CODE_FILE blocks. Reported as JSON
+    like benchmark_growth.
+
+    Args:
+        config: Config object (performance.benchmark supplies defaults)
+        sizes: Comma-separated task counts (--bench-sizes), e.g. "1000,5k"
+        latency: Simulated provider latency per call in seconds (--bench-latency)
+        output: Path for the JSON report (--output)
     """
     log("Running 'benchmark_impl' command", {"command": "benchmark_impl", "step": "start"}, config)
-    print("benchmark_impl is not fully implemented yet, but stub is reachable and safe.")
-    print("This command would test: implementation planning, code generation, file parsing")
-    return 0
+    settings = get_benchmark_settings(config)
+    try:
+        task_counts = parse_benchmark_sizes(sizes or settings.get("impl_task_counts") or ",".join(map(str, BENCHMARK_DEFAULT_TASK_COUNTS)))
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    if latency is None:
+        latency = float(settings.get("fake_latency_seconds", 0) or 0)
+    phases = int(settings.get("impl_phases", 5))
+    files_per_task = int(settings.get("impl_files_per_task", 3))
+    seed = int(settings.get("seed", 0))
+
+    results = []
+    for task_count in task_counts:
+        log(
+            f"benchmark_impl: tasks={task_count} latency={latency}s phases={phases} files_per_task={files_per_task}",
+            {"command": "benchmark_impl", "step": "run", "tasks": task_count},
+            config
+        )
+        results.append(run_impl_benchmark(config, task_count, latency, phases, files_per_task, seed))
+
+    report = {
+        "benchmark": "impl",
+        "template_version": TEMPLATE_VERSION,
+        "python": platform.python_version(),
+        "timestamp": datetime.datetime.now().isoformat(),
+        "settings": {
+            "task_counts": task_counts,
+            "fake_latency_seconds": latency,
+            "phases": phases,
+            "files_per_task": files_per_task,
+            "tasks_per_phase": BENCHMARK_TASKS_PER_PHASE,
+            "seed": seed,
+        },
+        "results": results,
+    }
+    output = _write_benchmark_report(config, "impl", report, output)
+
+    print("\n" + "="*60)
+    print("IMPLEMENTATION BENCHMARK")
+    print("="*60)
+    print(f"{'Tasks':>7} {'Plan s':>8} {'Format s':>9} {'Write s':>8} {'Impl s':>7} {'Files':>6} {'Files/s':>8}")
+    for result in results:
+        stages = result["stages"]
+        print(
+            f"{result['task_count']:>7} {stages['build_plan']:>8.3f} {stages['format_plan']:>9.3f} "
+            f"{stages['write_plan']:>8.3f} {stages['impl_phase']:>7.3f} {result['files_written']:>6} "
+            f"{result['files_per_second'] or 0:>8.1f}"
+        )
+    print(f"\nReport written to {output}")
+
+    log(
+        f"benchmark_impl complete: {len(results)} size(s)",
+        {"command": "benchmark_impl", "step": "complete"},
+        config
+    )
+    return 0 if all(result["exit_code"] == 0 for result in results) else 1
 
 
 def command_deploy(config: Config, env: str, dry_run: bool = False, skip_tests: bool = False) -> int:
@@ -4636,41 +9464,474 @@ def command_security_check(config: Config, dry_run: bool = False, verbose: bool
     return 0
 
 
-def command_perf_status(config: Config, verbose: bool = False) -> int:
+def parse_since(value: typing.Optional[str], default_hours: float = 24.0) -> typing.Optional[float]:
+    """
+    Convert a --since value to an epoch timestamp.
+
+    Accepts durations ("30m", "24h", "7d"), ISO dates/datetimes, or "all"
+    (returns None). An empty value means the last `default_hours` hours.
+    """
+    if not value:
+        return time.time() - default_hours * 3600
+    value = value.strip().lower()
+    if value == "all":
+        return None
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([smhdw])", value)
+    if match:
+        unit_seconds = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}[match.group(2)]
+        return time.time() - float(match.group(1)) * unit_seconds
+    try:
+        return datetime.datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid --since value: {value!r} (use e.g. 30m, 24h, 7d, 2024-01-31 or all)")
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list (0.0 for an empty list)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(-(-pct * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_usage(records: list[dict]) -> dict:
+    """
+    Aggregate usage ledger records (oldest first) for perf_status.
+    """
+    latencies = sorted(record.get("lat", 0.0) for record in records)
+    tokens_by_run: dict[str, int] = collections.defaultdict(int)
+    calls_by_run: dict[str, int] = collections.defaultdict(int)
+    metered_calls_by_run: dict[str, int] = collections.defaultdict(int)
+    tokens_by_day: dict[str, int] = collections.defaultdict(int)
+    for record in records:
+        tokens = record.get("pt", 0) + record.get("rt", 0)
+        tokens_by_run[record.get("run", "-")] += tokens
+        calls_by_run[record.get("run", "-")] += 1
+        # Records written before "metered" existed: only fake-mode calls were exempt
+        if record.get("metered", record.get("provider") != "fake"):
+            metered_calls_by_run[record.get("run", "-")] += 1
+        day = datetime.datetime.fromtimestamp(record.get("t", 0)).date().isoformat()
+        tokens_by_day[day] += tokens
+
+    total_tokens = sum(tokens_by_run.values())
+    span_seconds = (records[-1]["t"] - records[0]["t"]) if len(records) > 1 else 0.0
+    span_minutes = max(span_seconds / 60.0, 1 / 60.0)
+    last_run = records[-1].get("run", "-") if records else None
+    return {
+        "calls": len(records),
+        "errors": sum(1 for record in records if record.get("out") != "ok"),
+        "runs": len(tokens_by_run),
+        "tokens": total_tokens,
+        "calls_per_minute": len(records) / span_minutes if records else 0.0,
+        "tokens_per_minute": total_tokens / span_minutes if records else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "tokens_per_run": total_tokens / len(tokens_by_run) if tokens_by_run else 0.0,
+        "last_run": last_run,
+        "last_run_calls": calls_by_run.get(last_run, 0),
+        "last_run_metered_calls": metered_calls_by_run.get(last_run, 0),
+        "last_run_tokens": tokens_by_run.get(last_run, 0),
+        "tokens_by_day": dict(sorted(tokens_by_day.items())),
+    }
+
+
+def command_perf_status(config: Config, verbose: bool = False, since: typing.Optional[str] = None) -> int:
     """
     Show performance configuration and usage status.
     
+    Usage comes from the usage ledger (performance.ai_usage.usage_ledger_path),
+    read backwards from the end so only the queried window is scanned.
+    
     Args:
         config: Config object
-        verbose: If True, include usage analysis from logs
+        verbose: If True, add per-provider/per-command breakdowns and the slowest calls
+        since: Window start (e.g. "24h", "7d", an ISO date, or "all"); default last 24h
     """
-    log(f"Running 'perf_status' command: verbose={verbose}", {"command": "perf_status", "step": "start"}, config)
+    log(f"Running 'perf_status' command: verbose={verbose} since={since}", {"command": "perf_status", "step": "start"}, config)
     
     # Check if performance is enabled
     if not config._raw_data or "performance" not in config._raw_data or not config._raw_data.get("performance", {}).get("enabled", False):
         print("WARNING: Performance features are disabled. Set performance.enabled=true in auto_config.json")
         return 0
     
-    # TODO: Implement full perf_status logic:
-    # 1. Load performance config
-    # 2. Summarize configuration
-    # 3. Analyze logs if verbose
-    # 4. Calculate usage statistics
-    # 5. Report budget status
-    # 6. Generate recommendations
+    try:
+        since_epoch = parse_since(since)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+    
+    ai_usage = get_ai_usage_settings(config)
+    chunking = get_chunking_tuning(config)
+    batching = get_batching_settings(config)
+    retry_policy = get_retry_policy(config)
     
-    print("perf_status is not fully implemented yet, but stub is reachable and safe.")
-    print("This command would show: AI usage budgets, chunking/growth tuning, usage statistics, budget status")
+    print("\n" + "="*60)
+    print("PERFORMANCE STATUS")
+    print("="*60)
+    print("Configuration:")
+    print(f"  AI usage  : max_tokens_per_call={ai_usage.get('max_tokens_per_call')} max_calls_per_run={ai_usage.get('max_calls_per_run')} "
+          f"soft_budget_tokens_per_day={ai_usage.get('soft_budget_tokens_per_day')} enforce_limits={ai_usage.get('enforce_limits', False)}")
+    print(f"  Rate      : calls_per_minute={ai_usage.get('calls_per_minute') or '-'} tokens_per_minute={ai_usage.get('tokens_per_minute') or '-'}")
+    print(f"  Chunking  : strategy={config.chunk_strategy} chunk_size_lines={config.chunk_size_lines} "
+          f"adaptive={chunking.get('adaptive_chunking', False)} batching={'on' if batching['enabled'] else 'off'}")
+    print(f"  Growth    : scheduler={get_scheduler_name(config)} max_passes={config.growth.max_passes} "
+          f"max_chunks_per_pass={config.growth.max_chunks_per_pass} max_parallel_chats={config.max_parallel_chats}")
+    print(f"  Retry     : enabled={retry_policy.get('enabled', True)} max_attempts_per_call={retry_policy['max_attempts_per_call']} "
+          f"breaker_threshold={retry_policy['circuit_breaker']['failure_threshold']}")
+    
+    ledger = get_usage_ledger(config)
+    if ledger is None:
+        print("\nUsage: not tracked (performance.ai_usage.track_usage=false)")
+        print("="*60 + "\n")
+        return 0
+    
+    records = ledger.read_since(since_epoch)
+    window = "all time" if since_epoch is None else f"since {datetime.datetime.fromtimestamp(since_epoch):%Y-%m-%d %H:%M}"
+    print(f"\nUsage ({window}):")
+    if not records:
+        print("  No model calls recorded in this window.")
+    else:
+        summary = summarize_usage(records)
+        print(f"  Calls      : {summary['calls']} ({summary['errors']} failed) across {summary['runs']} run(s)")
+        print(f"  Throughput : {summary['calls_per_minute']:.2f} calls/min, {summary['tokens_per_minute']:.0f} tokens/min")
+        print(f"  Latency    : p50={summary['latency_p50']:.2f}s p95={summary['latency_p95']:.2f}s "
+              f"p99={summary['latency_p99']:.2f}s mean={summary['latency_mean']:.2f}s")
+        print(f"  Tokens     : {summary['tokens']} total (est.), {summary['tokens_per_run']:.0f} per run, "
+              f"last run {summary['last_run_tokens']}")
+        print("  Tokens/day :")
+        for day, tokens in summary["tokens_by_day"].items():
+            print(f"    {day}: {tokens}")
+        
+        max_calls = ai_usage.get("max_calls_per_run")
+        if max_calls:
+            # Only metered calls count towards max_calls_per_run (see UsageGate.acquire)
+            metered_calls = summary["last_run_metered_calls"]
+            unmetered_calls = summary["last_run_calls"] - metered_calls
+            print(f"  Last run   : {metered_calls}/{max_calls} metered calls ({metered_calls / max_calls * 100:.0f}% of max_calls_per_run)"
+                  + (f", {unmetered_calls} unmetered" if unmetered_calls else ""))
+    
+    budget = ai_usage.get("soft_budget_tokens_per_day")
+    today = DailyTokenLedger(pathlib.Path(ai_usage.get("ledger_path", ".auto_cache/token_ledger.json"))).read()
+    print("\nBudget burn (today, metered calls):")
+    if budget:
+        print(f"  {today['tokens']}/{budget} tokens ({today['tokens'] / budget * 100:.1f}%), {today['calls']} call(s)")
+    else:
+        print(f"  {today['tokens']} tokens, {today['calls']} call(s) (no soft_budget_tokens_per_day)")
+    
+    if verbose and records:
+        for field, title in (("provider", "By provider"), ("cmd", "By command")):
+            groups: dict[str, list[dict]] = collections.defaultdict(list)
+            for record in records:
+                groups[record.get(field, "-")].append(record)
+            print(f"\n{title}:")
+            for name, group in sorted(groups.items()):
+                group_summary = summarize_usage(group)
+                print(f"  {name:<16} calls={group_summary['calls']:<6} tokens={group_summary['tokens']:<9} "
+                      f"p50={group_summary['latency_p50']:.2f}s p95={group_summary['latency_p95']:.2f}s errors={group_summary['errors']}")
+        print("\nSlowest calls:")
+        for record in sorted(records, key=lambda r: r.get("lat", 0.0), reverse=True)[:5]:
+            print(f"  {datetime.datetime.fromtimestamp(record['t']):%Y-%m-%d %H:%M:%S} {record.get('cmd', '-'):<10} "
+                  f"id={record.get('id', '-'):<10} {record.get('lat', 0.0):.2f}s tokens={record.get('pt', 0) + record.get('rt', 0)} {record.get('out')}")
+    print("="*60 + "\n")
     return 0
 
 
-def command_perf_suggest(config: Config, apply: bool = False) -> int:
+def _median(values: list[float]) -> typing.Optional[float]:
+    """Median of a list (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def build_perf_suggestions(
+    config: Config,
+    state: typing.Optional[dict],
+    records: list[dict],
+    prd_chars: int,
+) -> dict:
+    """
+    Derive tuning suggestions from measurements.
+
+    Inputs are the per-chunk metrics and pass history in the state, usage
+    ledger records, and the PRD size. Chunk size targets
+    chunking_tuning.target_latency_seconds_per_chunk, is capped so a
+    prompt plus its grown response fits ai_usage.max_tokens_per_call, and is
+    clamped to chunking_tuning.min/max_chunk_lines; the reason names whichever
+    limit decided the value. It is only suggested when the current size is
+    over the token cap or the predicted plan is better (less time to target,
+    or fewer tokens per added line at no time cost). Pass limits are sized to reach 95% of growth.target_line_count;
+    wait_seconds follows the measured p99 latency.
+
+    Returns:
+        {"measurements": dict, "suggestions": [{"setting", "current",
+         "suggested", "reason"}], "predictions": {"current": dict,
+         "suggested": dict}}
+    """
+    chunking = get_chunking_tuning(config)
+    growth_tuning = get_growth_tuning(config)
+    ai_usage = get_ai_usage_settings(config)
+    meta = (state or {}).get("meta", {})
+    chunks = (state or {}).get("chunks", [])
+    total_lines = max(int(meta.get("total_lines") or 0), 1)
+    pass_history = meta.get("growth", {}).get("pass_history", [])
+    provider, _ = describe_model_target(config)
+
+    # Per-chunk measurements (fresh model calls only)
+    measured = [
+        chunk["metrics"] for chunk in chunks
+        if (chunk.get("metrics") or {}).get("outcome") == "done"
+        and not chunk["metrics"].get("cached") and chunk["metrics"].get("lines_in")
+    ]
+    growth_ratio = _median([m["lines_out"] / m["lines_in"] for m in measured])
+    if growth_ratio is None and pass_history:
+        gained = sum(entry["lines_after"] - entry["lines_before"] for entry in pass_history)
+        succeeded = sum(entry.get("chunks_succeeded", 0) for entry in pass_history)
+        if succeeded:
+            growth_ratio = 1 + gained / (succeeded * config.chunk_size_lines)
+    seconds_per_line = _median([
+        m["latency_seconds"] / m["lines_in"] for m in measured if (m.get("latency_seconds") or 0) > 0
+    ])
+
+    provider_records = [r for r in records if r.get("provider") == provider]
+    ok_latencies = sorted(r.get("lat", 0.0) for r in provider_records if r.get("out") == "ok")
+    error_rate = (
+        sum(1 for r in provider_records if r.get("out") != "ok") / len(provider_records)
+        if provider_records else 0.0
+    )
+    tokens_per_line = (prd_chars / 4) / total_lines
+    prefix_tokens = estimate_tokens(ENHANCE_PROMPT_PREFIX)
+
+    measurements = {
+        "chunks_measured": len(measured),
+        "growth_ratio": growth_ratio,
+        "seconds_per_line": seconds_per_line,
+        "tokens_per_line": tokens_per_line,
+        "ledger_calls": len(provider_records),
+        "error_rate": error_rate,
+        "latency_p99": percentile(ok_latencies, 99) if ok_latencies else None,
+        "passes_in_history": len(pass_history),
+    }
+
+    min_lines = int(chunking.get("min_chunk_lines", 50))
+    max_lines = max(int(chunking.get("max_chunk_lines", 400)), min_lines)
+    max_growth_ratio = float(growth_tuning.get("max_growth_ratio") or 1.5)
+    max_tokens_per_call = int(ai_usage.get("max_tokens_per_call") or 8000)
+    target_latency = float(chunking.get("target_latency_seconds_per_chunk", 30))
+
+    suggestions = []
+
+    def suggest(setting: str, current, suggested, reason: str) -> None:
+        if suggested is not None and suggested != current:
+            suggestions.append({"setting": setting, "current": current, "suggested": suggested, "reason": reason})
+
+    # Predicted effect of a setting combination
+    remaining = max(0.0, config.growth.target_line_count * 0.95 - total_lines)
+
+    def plan(size: int, chunks_per_pass: int, passes: int, parallel_chats: int) -> dict:
+        gain = size * (growth_ratio - 1) if growth_ratio and growth_ratio > 1 else 0.0
+        needed = int(-(-remaining // gain)) if gain else None
+        tokens_per_call = prefix_tokens + size * tokens_per_line * (1 + (growth_ratio or 1.0))
+        reachable = needed is not None and needed <= chunks_per_pass * passes
+        return {
+            "chunks_to_target": needed,
+            "reachable_in_run": reachable,
+            "time_to_target_seconds": (
+                needed * size * seconds_per_line / parallel_chats if needed is not None and seconds_per_line else None
+            ),
+            "tokens_per_line": tokens_per_call / gain if gain else None,
+        }
+
+    # chunk_size_lines: latency target, capped by the per-call token limit,
+    # then clamped to min/max_chunk_lines
+    token_cap = int((max_tokens_per_call - prefix_tokens - BATCH_CHUNK_OVERHEAD_TOKENS) / (tokens_per_line * (1 + max_growth_ratio)))
+    chunk_size = config.chunk_size_lines
+    reason = None
+    if seconds_per_line:
+        chunk_size = int(target_latency / seconds_per_line)
+        reason = f"~{target_latency:.0f}s per chunk at {seconds_per_line:.3f}s/line"
+    if chunk_size > token_cap:
+        chunk_size = token_cap
+        reason = f"prompt + {max_growth_ratio}x response must fit max_tokens_per_call={max_tokens_per_call} (~{token_cap} lines)"
+    chunk_size = chunk_size // 10 * 10 or min_lines
+    if reason and chunk_size > max_lines:
+        chunk_size = max_lines
+        reason = f"capped at chunking_tuning.max_chunk_lines={max_lines} ({reason})"
+    elif reason and chunk_size < min_lines:
+        chunk_size = min_lines
+        reason = f"raised to chunking_tuning.min_chunk_lines={min_lines} ({reason})"
+
+    chunks_per_pass = config.growth.max_chunks_per_pass
+    passes = config.growth.max_passes
+    current_plan = plan(config.chunk_size_lines, chunks_per_pass, passes, max(1, config.max_parallel_chats))
+    if reason and chunk_size != config.chunk_size_lines:
+        # Same pass limits and parallelism, only the chunk size differs. A
+        # current size over the token cap is always corrected (those calls
+        # are refused); otherwise the change has to pay off.
+        if config.chunk_size_lines > token_cap or _plan_is_better(
+            plan(chunk_size, chunks_per_pass, passes, max(1, config.max_parallel_chats)), current_plan
+        ):
+            suggest("chunk_size_lines", config.chunk_size_lines, chunk_size, reason)
+        else:
+            chunk_size = config.chunk_size_lines
+
+    # max_parallel_chats
+    parallel = config.max_parallel_chats
+    if getattr(config, 'use_cursor_driver', False):
+        suggest("max_parallel_chats", parallel, 1, "the Cursor driver always runs one chat at a time")
+        parallel = 1
+    elif provider_records and error_rate > 0.2:
+        parallel = max(1, parallel // 2)
+        suggest("max_parallel_chats", config.max_parallel_chats, parallel, f"error rate {error_rate:.0%} suggests provider pressure")
+    elif ai_usage.get("calls_per_minute") and ok_latencies:
+        parallel = max(1, min(8, int(float(ai_usage["calls_per_minute"]) * _median(ok_latencies) / 60)))
+        suggest("max_parallel_chats", config.max_parallel_chats, parallel, f"fills calls_per_minute={ai_usage['calls_per_minute']} at p50 latency")
+    parallel = max(1, parallel)
+
+    # wait_seconds: headroom over p99 latency, scaled to the suggested chunk size
+    if ok_latencies and provider != "fake":
+        p99 = percentile(ok_latencies, 99) * chunk_size / max(config.chunk_size_lines, 1)
+        wait = max(30, min(600, int(-(-p99 * 1.5 // 10) * 10)))
+        suggest("wait_seconds", config.wait_seconds, wait, f"1.5x p99 latency ({p99:.0f}s at {chunk_size} lines)")
+
+    # Pass limits: enough chunks to reach 95% of the target
+    if growth_ratio and growth_ratio > 1 and remaining > 0:
+        needed = plan(chunk_size, 1, 1, parallel)["chunks_to_target"]
+        chunks_in_doc = max(1, -(-total_lines // chunk_size))
+        max_calls = int(ai_usage.get("max_calls_per_run") or needed)
+        chunks_per_pass = max(1, min(chunks_in_doc, -(-needed // max(passes, 1)), max_calls))
+        passes = max(1, min(200, -(-needed // chunks_per_pass)))
+        suggest("growth.max_chunks_per_pass", config.growth.max_chunks_per_pass, chunks_per_pass,
+                f"{needed} chunk(s) at ~{chunk_size * (growth_ratio - 1):.0f} lines each reach the target")
+        suggest("growth.max_passes", config.growth.max_passes, passes,
+                f"{needed} chunk(s) / {chunks_per_pass} per pass")
+    suggested_plan = plan(chunk_size, chunks_per_pass, passes, parallel)
+
+    return {
+        "measurements": measurements,
+        "suggestions": suggestions,
+        "predictions": {"current": current_plan, "suggested": suggested_plan},
+    }
+
+
+def _plan_is_better(candidate: dict, current: dict) -> bool:
+    """
+    True if a predicted plan (see build_perf_suggestions) beats the current one:
+    less time to target, or fewer tokens per added line without taking longer.
+    """
+    new_time, old_time = candidate["time_to_target_seconds"], current["time_to_target_seconds"]
+    new_tokens, old_tokens = candidate["tokens_per_line"], current["tokens_per_line"]
+    if new_time is not None and old_time is not None and new_time < old_time * 0.95:
+        return True
+    # Rounding up to whole chunks makes predicted times differ by a few percent
+    time_not_worse = new_time is None or old_time is None or new_time <= old_time * 1.05
+    return bool(new_tokens is not None and old_tokens is not None and new_tokens < old_tokens and time_not_worse)
+
+
+def _json_value_spans(text: str) -> dict[tuple[str, ...], tuple[int, int]]:
+    """
+    Map each object member's key path to the (start, end) offsets of its value in `text`.
+    """
+    decoder = json.JSONDecoder()
+    spans: dict[tuple[str, ...], tuple[int, int]] = {}
+
+    def skip_ws(i: int) -> int:
+        while i < len(text) and text[i] in " \t\r\n":
+            i += 1
+        return i
+
+    def parse(i: int, path: tuple[str, ...]) -> int:
+        i = skip_ws(i)
+        if text[i] != "{":
+            _, end = decoder.raw_decode(text, i)
+            return end
+        i = skip_ws(i + 1)
+        if text[i] == "}":
+            return i + 1
+        while True:
+            key, i = json.decoder.scanstring(text, skip_ws(i) + 1)
+            value_start = skip_ws(skip_ws(i) + 1)  # past the ':'
+            value_end = parse(value_start, path + (key,))
+            spans[path + (key,)] = (value_start, value_end)
+            i = skip_ws(value_end)
+            if text[i] != ",":
+                return i + 1  # '}'
+            i += 1
+
+    parse(0, ())
+    return spans
+
+
+def apply_perf_suggestions(config_path: pathlib.Path, suggestions: list[dict]) -> bool:
+    """
+    Write suggested values into the config file atomically.
+
+    Settings are dotted paths into the JSON ("growth.max_passes"). Existing
+    values are replaced in place so the rest of the file keeps its formatting;
+    only if a setting is missing is the whole file re-dumped with indent=2.
+
+    Returns:
+        True if the file had to be reformatted
+    """
+    text = config_path.read_text(encoding="utf-8")
+    spans = _json_value_spans(text)
+    paths = [tuple(suggestion["setting"].split(".")) for suggestion in suggestions]
+    if all(path in spans for path in paths):
+        edits = sorted(
+            ((spans[path], suggestion["suggested"]) for path, suggestion in zip(paths, suggestions)),
+            key=lambda edit: edit[0][0],
+            reverse=True,
+        )
+        for (start, end), value in edits:
+            text = text[:start] + json.dumps(value) + text[end:]
+        atomic_write_file(config_path, text)
+        return False
+
+    data = json.loads(text)
+    for path, suggestion in zip(paths, suggestions):
+        target = data
+        *parents, key = path
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[key] = suggestion["suggested"]
+    atomic_write_file(config_path, json.dumps(data, indent=2) + "\n")
+    return True
+
+
+def _format_duration(seconds: typing.Optional[float]) -> str:
+    if seconds is None:
+        return "n/a"
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+def command_perf_suggest(
+    config: Config,
+    apply: bool = False,
+    since: typing.Optional[str] = None,
+    config_path: typing.Optional[pathlib.Path] = None,
+) -> int:
     """
-    Suggest performance tuning optimizations.
+    Suggest performance tuning from measurements.
+    
+    Analyzes per-chunk metrics and growth pass history in the state plus the
+    usage ledger (--since window, default 7d), and recommends chunk_size_lines,
+    max_chunks_per_pass, max_passes, max_parallel_chats and wait_seconds with
+    their predicted effect on time-to-target and tokens per added line.
     
     Args:
         config: Config object
-        apply: If True, apply suggestions (requires explicit flag)
+        apply: If True, write the suggested values to the config file (atomically)
+        since: Usage ledger window (see parse_since)
+        config_path: Config file to update with --apply
     """
     log(f"Running 'perf_suggest' command: apply={apply}", {"command": "perf_suggest", "step": "start"}, config)
     
@@ -4679,17 +9940,62 @@ def command_perf_suggest(config: Config, apply: bool = False) -> int:
         print("WARNING: Performance features are disabled.")
         return 0
     
-    # TODO: Implement full perf_suggest logic:
-    # 1. Analyze current config
-    # 2. Analyze logs for patterns
-    # 3. Generate heuristic-based suggestions
-    # 4. Show suggestions with reasoning
-    # 5. Apply if --apply flag and safe
-    
-    print("perf_suggest is not fully implemented yet, but stub is reachable and safe.")
-    print("This command would suggest: chunk size adjustments, pass limits, token budgets, etc.")
-    if apply:
-        print("--apply flag would apply suggestions (not yet implemented)")
+    try:
+        since_epoch = parse_since(since or "7d")
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+    
+    state = load_state(config)
+    prd_path = pathlib.Path(config.master_md_path)
+    prd_chars = prd_path.stat().st_size if prd_path.exists() else 0
+    ledger = get_usage_ledger(config)
+    records = ledger.read_since(since_epoch) if ledger else []
+    report = build_perf_suggestions(config, state, records, prd_chars)
+    measurements = report["measurements"]
+    
+    def fmt(value, spec: str) -> str:
+        return "n/a" if value is None else format(value, spec)
+    
+    print("\n" + "="*60)
+    print("PERFORMANCE SUGGESTIONS")
+    print("="*60)
+    print("Measurements:")
+    print(f"  Chunks measured : {measurements['chunks_measured']} (growth ratio {fmt(measurements['growth_ratio'], '.2f')}, "
+          f"{fmt(measurements['seconds_per_line'], '.3f')} s/line)")
+    print(f"  Ledger calls    : {measurements['ledger_calls']} (error rate {measurements['error_rate']:.0%}, "
+          f"p99 {fmt(measurements['latency_p99'], '.1f')}s)")
+    print(f"  PRD             : ~{measurements['tokens_per_line']:.1f} tokens/line, {measurements['passes_in_history']} pass(es) in history")
+    
+    if not report["suggestions"]:
+        print("\nNo changes suggested (not enough measurements, or current settings already fit).")
+    else:
+        print("\nSuggestions:")
+        for suggestion in report["suggestions"]:
+            print(f"  {suggestion['setting']:<28} {str(suggestion['current']):>6} -> {str(suggestion['suggested']):<6} ({suggestion['reason']})")
+    
+    current = report["predictions"]["current"]
+    suggested = report["predictions"]["suggested"]
+    print("\nPredicted effect (to 95% of target):")
+    print(f"  Time to target  : {_format_duration(current['time_to_target_seconds'])} -> {_format_duration(suggested['time_to_target_seconds'])}")
+    print(f"  Tokens per line : {fmt(current['tokens_per_line'], '.1f')} -> {fmt(suggested['tokens_per_line'], '.1f')}")
+    print(f"  Chunks needed   : {fmt(current['chunks_to_target'], 'd')} -> {fmt(suggested['chunks_to_target'], 'd')} "
+          f"(reachable in one run: {'yes' if current['reachable_in_run'] else 'no'} -> {'yes' if suggested['reachable_in_run'] else 'no'})")
+    
+    if apply and report["suggestions"]:
+        config_path = config_path or pathlib.Path("auto_config.json")
+        reformatted = apply_perf_suggestions(config_path, report["suggestions"])
+        log(
+            f"Applied {len(report['suggestions'])} suggestion(s) to {config_path}",
+            {"command": "perf_suggest", "step": "apply", "settings": ",".join(s["setting"] for s in report["suggestions"]), "reformatted": reformatted},
+            config
+        )
+        print(f"\nApplied {len(report['suggestions'])} setting(s) to {config_path}")
+        if reformatted:
+            print("  (a setting was missing, so the file was rewritten with indent=2)")
+    elif report["suggestions"]:
+        print("\nRun with --apply to write these values to the config file.")
+    print("="*60 + "\n")
     return 0
 
 
@@ -4859,7 +10165,9 @@ def command_quick_test(config: Config, scope: str = "basic", verbose: bool = Fal
 # AI ABSTRACTION LAYER
 # ============================================================================
 
-def run_ai_task(task_type: str, prompt: str, config: Config, context: typing.Optional[dict] = None) -> str:
+def run_ai_task(task_type: str, prompt: str, config: Config, context: typing.Optional[dict] = None,
+                use_cache: bool = True, prefix_hash: typing.Optional[str] = None,
+                prefix_chars: int = 0) -> str:
     """
     Generic AI entrypoint for this automation.
     
@@ -4872,6 +10180,10 @@ def run_ai_task(task_type: str, prompt: str, config: Config, context: typing.Opt
         prompt: The text/prompt to send to the AI
         config: Config object with "ai" section
         context: Optional context dict (e.g., chunk info, phase info)
+        use_cache: If False, bypass the response cache
+        prefix_hash: For prompts built as prefix + suffix, hash of the static
+                     prefix (see build_enhance_prompt_parts())
+        prefix_chars: Length of that prefix (prompt[:prefix_chars])
     
     Returns:
         str: AI response text, or empty string if stub mode
@@ -4879,7 +10191,13 @@ def run_ai_task(task_type: str, prompt: str, config: Config, context: typing.Opt
     Behavior:
         - Reads config["ai"] to determine provider routing
         - Checks execution_modes to see what's allowed
-        - Tries preferred provider, falls back to fallback providers
+        - Serves a cached response for the same provider/model/prompt if present
+        - Tries preferred provider, falls back to fallback providers; each
+          provider call is retried under performance.retry_policy and skipped
+          while its circuit breaker is open
+        - Paces calls and enforces performance.ai_usage limits; once a budget
+          is exhausted it degrades to stub mode, or raises BudgetExceeded when
+          budget_exhausted_action is "fail"
         - Logs all operations
         - Returns stub response if no providers available
     """
@@ -4906,6 +10224,15 @@ def run_ai_task(task_type: str, prompt: str, config: Config, context: typing.Opt
     # Build provider list (preferred + fallbacks)
     providers_to_try = [preferred_provider] + fallback_providers
     
+    provider_context = dict(context or {})
+    if prefix_hash:
+        provider_context["prompt_prefix_hash"] = prefix_hash
+        provider_context["prompt_prefix_chars"] = prefix_chars
+    
+    # Every provider call passes the performance.ai_usage gate
+    gate = get_usage_gate(config)
+    budget_action = get_ai_usage_settings(config).get("budget_exhausted_action", "degrade")
+    
     # Try each provider in order
     for provider_name in providers_to_try:
         if provider_name == "none":
@@ -4948,12 +10275,40 @@ def run_ai_task(task_type: str, prompt: str, config: Config, context: typing.Opt
         log(f"Attempting to use provider: {provider_name} for task: {task_type}", 
             {"provider": provider_name, "task_type": task_type}, config)
         
+        cache = get_response_cache(config, use_cache, provider=provider_name)
+        model = str(provider_config.get("model", "default"))
+        cache_key = ResponseCache.make_key(provider_name, model, prompt) if cache else None
+        cached = cache.get(cache_key) if cache else None
+        if cached is not None:
+            log(f"Response cache hit for provider {provider_name} task {task_type}",
+                {"provider": provider_name, "task_type": task_type, "step": "cache_hit"}, config)
+            return cached
+        
+        def call_once() -> str:
+            reservation = gate.acquire(provider_name, prompt, {"provider": provider_name, "task_type": task_type})
+            try:
+                response = _call_provider(provider_name, provider_config, task_type, prompt, provider_context, config)
+            except Exception:
+                gate.settle(reservation, None, outcome="error")
+                raise
+            gate.settle(reservation, response)
+            return response
+
         try:
-            result = _call_provider(provider_name, provider_config, task_type, prompt, context or {}, config)
+            result = call_with_retry(config, provider_name, call_once, {"provider": provider_name, "task_type": task_type})
             if result:
                 log(f"Successfully used provider {provider_name} for task {task_type}", 
                     {"provider": provider_name, "task_type": task_type}, config)
+                if cache:
+                    cache.put(cache_key, result, provider_name, model)
                 return result
+        except BudgetExceeded as e:
+            # Budgets are global, so no other provider is tried
+            if budget_action == "fail":
+                raise
+            log(f"Usage limit reached ({e}); degrading to stub mode",
+                {"provider": provider_name, "task_type": task_type, "scope": e.scope}, config)
+            break
         except Exception as e:
             log(f"Provider {provider_name} failed: {e}, trying next provider", 
                 {"provider": provider_name, "error": str(e), "task_type": task_type}, config)
@@ -4983,6 +10338,9 @@ def _call_provider(provider_name: str, provider_config: dict, task_type: str,
     
     This function handles provider-specific integration logic.
     For now, this is mostly a stub that can be extended with actual provider integrations.
+    When run_ai_task() was given a prefix hash, context carries
+    "prompt_prefix_hash" and "prompt_prefix_chars" so integrations with
+    prompt/KV prefix caching can reuse the prefix.
     """
     provider_type = provider_config.get("type", "")
     
@@ -5371,6 +10729,10 @@ def command_template_check(config: Config, verbose: bool = False) -> int:
     # Runtime files that must NOT be committed
     runtime_files = [
         ".auto_state.json",
+        ".auto_state.json.journal",
+        ".auto_state.json.sections",
+        ".auto_state.json.applylog",
+        ".auto_cache",
         "auto_master.log"
     ]
     
@@ -5695,7 +11057,7 @@ def main():
           init       - Initialize state from prd.md and auto_config.json (rebuilds .auto_state.json, no AI calls)
           status     - Show system status (PRD line count, chunk status, growth progress). Use --verbose for detailed chunk breakdown
           start      - Alias for enhance (single pass)
-          enhance    - Run single enhancement pass (processes chunks using AI or stubs). Use --limit N to process N chunks, --dry-run to test
+          enhance    - Run single enhancement pass (processes chunks using AI or stubs). Use --limit N to process N chunks, --dry-run to test, --no-cache to bypass the response cache
           grow       - Use AI (or stubs) to expand and enhance prd.md towards target size & detail. Runs multiple passes until target reached or limits hit
           reset      - Reset automation state
           sync_roles - Sync Omni-Corp Role Library and Prompt Templates into prd.md (ensures roles are up to date)
@@ -5706,8 +11068,8 @@ def main():
           impl_phase - Implement or update code for a specific Phase ID defined in prd.md. Requires --phase X.Y.Z, optionally --limit-files N
           impl_loop  - Run automated implementation loop for multiple tasks. Processes tasks from implementation plan sequentially
           smoke_test - Run smoke tests to verify automation system works end-to-end (quick verification, no file modifications)
-          benchmark_growth - Measure PRD expansion performance (growth rate, success rate, quality metrics)
-          benchmark_impl   - Test code generation pipeline (implementation planning, file parsing, path validation)
+          benchmark_growth - Benchmark the growth loop on synthetic PRDs (chunks/sec, lines/sec, I/O split, peak RSS)
+          benchmark_impl   - Benchmark plan_impl stages and impl_phase on synthetic task PRDs (per-stage timings, files/sec)
           deploy     - Deploy application to environment (requires --env). Use --dry-run to preview. See prd.md Section 16
           deploy_status - Show deployment status for environment (requires --env). See prd.md Section 16
           monitor    - Monitor application health and generate report. Optionally use --since TIME and --env ENV
@@ -5753,7 +11115,10 @@ def main():
           python3 auto_master.py impl_loop --max-tasks 5
           python3 auto_master.py smoke_test
           python3 auto_master.py benchmark_growth
+          python3 auto_master.py benchmark_growth --bench-sizes 1000,10k --bench-latency 0.05 --output bench.json
           python3 auto_master.py benchmark_impl
+          python3 auto_master.py grow --profile --trace
+          python3 auto_master.py grow --trace-out .auto_cache/traces/grow.json
           python3 auto_master.py deploy --env staging --dry-run
           python3 auto_master.py deploy_status --env staging
           python3 auto_master.py monitor
@@ -5832,7 +11197,7 @@ def main():
     parser.add_argument(
         '--since',
         type=str,
-        help='Time range for monitor command (e.g., "1h", "24h")'
+        help='Time range for monitor/perf_status/perf_suggest commands (e.g., "1h", "24h", "7d")'
     )
     parser.add_argument(
         '--apply',
@@ -5844,6 +11209,46 @@ def main():
         type=str,
         help='Feedback channel to summarize (feedback_summarize only)'
     )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Profile the command with cProfile; writes a .prof file and a text report (any command)'
+    )
+    parser.add_argument(
+        '--trace',
+        action='store_true',
+        help='Trace memory allocations with tracemalloc and add them to the profile report (any command)'
+    )
+    parser.add_argument(
+        '--trace-out',
+        type=str,
+        help='Record pipeline spans and write them as a Chrome trace to this path, plus a .jsonl copy (any command)'
+    )
+    parser.add_argument(
+        '--bench-sizes',
+        type=str,
+        help='Comma-separated synthetic PRD sizes: lines for benchmark_growth (e.g. "1000,10k,1m"), tasks for benchmark_impl'
+    )
+    parser.add_argument(
+        '--bench-latency',
+        type=float,
+        help='Simulated provider latency per call in seconds (benchmark_growth/benchmark_impl)'
+    )
+    parser.add_argument(
+        '--bench-chunks',
+        type=int,
+        help='Chunks per growth pass (benchmark_growth only)'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        help='Write the benchmark JSON report to this path (benchmark_growth/benchmark_impl)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Bypass the response cache and always call the model (enhance/start/grow/impl_phase)'
+    )
     
     args = parser.parse_args()
     
@@ -5851,6 +11256,7 @@ def main():
     try:
         config = load_config(pathlib.Path(args.config))
         _global_config = config  # Set global for logging
+        set_usage_run_context(args.command)
     except Exception as e:
         print(f"ERROR: Failed to load config: {e}", file=sys.stderr)
         return 1
@@ -5859,27 +11265,27 @@ def main():
     handlers = {
         'init': lambda: command_init(config),
         'status': lambda: command_status(config, verbose=args.verbose),
-        'start': lambda: command_start(config, limit=args.limit, dry_run=args.dry_run),
-        'enhance': lambda: command_enhance(config, limit=args.limit, dry_run=args.dry_run),
-        'grow': lambda: command_grow(config, dry_run=args.dry_run),
+        'start': lambda: command_start(config, limit=args.limit, dry_run=args.dry_run, use_cache=not args.no_cache),
+        'enhance': lambda: command_enhance(config, limit=args.limit, dry_run=args.dry_run, use_cache=not args.no_cache),
+        'grow': lambda: command_grow(config, dry_run=args.dry_run, use_cache=not args.no_cache),
         'reset': lambda: command_reset(config),
         'sync_roles': lambda: command_sync_roles(config),
         'git_status': lambda: command_git_status(config),
         'git_sync': lambda: command_git_sync(config, dry_run=args.dry_run),
         'doctor': lambda: command_doctor(config),
         'plan_impl': lambda: command_plan_impl(config, dry_run=args.dry_run),
-        'impl_phase': lambda: command_impl_phase(config, phase_id=args.phase or "", limit_files=args.limit_files, dry_run=args.dry_run) if args.phase else (print("ERROR: --phase required for impl_phase command"), 1)[1],
+        'impl_phase': lambda: command_impl_phase(config, phase_id=args.phase or "", limit_files=args.limit_files, dry_run=args.dry_run, use_cache=not args.no_cache) if args.phase else (print("ERROR: --phase required for impl_phase command"), 1)[1],
         'impl_loop': lambda: command_impl_loop(config, max_tasks=args.max_tasks, dry_run=args.dry_run),
         'smoke_test': lambda: command_smoke_test(config),
-        'benchmark_growth': lambda: command_benchmark_growth(config),
-        'benchmark_impl': lambda: command_benchmark_impl(config),
+        'benchmark_growth': lambda: command_benchmark_growth(config, sizes=args.bench_sizes, latency=args.bench_latency, chunks=args.bench_chunks, output=args.output),
+        'benchmark_impl': lambda: command_benchmark_impl(config, sizes=args.bench_sizes, latency=args.bench_latency, output=args.output),
         'deploy': lambda: command_deploy(config, env=args.env or (config._raw_data and config._raw_data.get("deployment", {}).get("default_environment", "local") or "local"), dry_run=args.dry_run, skip_tests=args.skip_tests) if args.env or (config._raw_data and "deployment" in config._raw_data) else (print("ERROR: --env required for deploy command"), 1)[1],
         'deploy_status': lambda: command_deploy_status(config, env=args.env or (config._raw_data and config._raw_data.get("deployment", {}).get("default_environment", "local") or "local")) if args.env or (config._raw_data and "deployment" in config._raw_data) else (print("ERROR: --env required for deploy_status command"), 1)[1],
         'monitor': lambda: command_monitor(config, since=args.since, env=args.env),
         'security_check': lambda: command_security_check(config, dry_run=args.dry_run, verbose=args.verbose),
         'quick_test': lambda: command_quick_test(config, scope=args.scope, verbose=args.verbose),
-        'perf_status': lambda: command_perf_status(config, verbose=args.verbose),
-        'perf_suggest': lambda: command_perf_suggest(config, apply=args.apply if hasattr(args, 'apply') else False),
+        'perf_status': lambda: command_perf_status(config, verbose=args.verbose, since=args.since),
+        'perf_suggest': lambda: command_perf_suggest(config, apply=args.apply if hasattr(args, 'apply') else False, since=args.since, config_path=pathlib.Path(args.config)),
         'analytics_status': lambda: command_analytics_status(config, verbose=args.verbose),
         'analytics_summarize': lambda: command_analytics_summarize(config, since_days=args.since if hasattr(args, 'since') else 7),
         'feedback_summarize': lambda: command_feedback_summarize(config, channel=args.channel if hasattr(args, 'channel') else None),
@@ -5894,16 +11300,30 @@ def main():
     }
     
     handler = handlers[args.command]
+    profile_session = None
+    if args.profile or args.trace:
+        profile_session = ProfileSession(config, args.command, cpu=args.profile, memory=args.trace)
+        profile_session.start()
+    tracer = start_tracing(config) if args.trace_out else None
     try:
         return handler()
     except KeyboardInterrupt:
         log("Interrupted by user", {"command": args.command}, config)
+        close_log_sinks()
         return 130
     except Exception as e:
         log(f"ERROR: {e}", {"command": args.command}, config)
+        close_log_sinks()
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        if profile_session is not None:
+            report_path = profile_session.finish()
+            print(f"Profile report written to {report_path}", file=sys.stderr)
+        if tracer is not None:
+            chrome_path, jsonl_path = tracer.write(pathlib.Path(args.trace_out), f"auto_master.py {args.command}")
+            print(f"Trace written to {chrome_path} and {jsonl_path} ({len(tracer.spans)} spans, {tracer.dropped} dropped)", file=sys.stderr)
 
 
 if __name__ == '__main__':
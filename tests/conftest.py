@@ -0,0 +1,38 @@
+import json
+import pathlib
+import sys
+
+import pytest
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import auto_master  # noqa: E402
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """
+    Scratch directory with a fake-mode auto_config.json and a copy of prd.md.
+
+    Yields the loaded Config; the cwd is the scratch directory.
+    """
+    raw = json.loads((REPO_ROOT / "auto_config.json").read_text(encoding="utf-8"))
+    raw.update({
+        "master_md_path": "prd.md",
+        "state_path": ".auto_state.json",
+        "log_path": str(tmp_path / "auto_master.log"),
+        "use_cursor_driver": False,
+        "max_parallel_chats": 1,
+    })
+    raw["git"]["enable_auto"] = False
+    raw["logging"]["async_writer"] = False
+    raw["performance"]["response_cache"]["enabled"] = False
+    raw["performance"]["chunking_tuning"]["adaptive_chunking"] = False
+    raw["performance"]["growth_tuning"]["scheduler"] = "file_order"
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "auto_config.json").write_text(json.dumps(raw, indent=2), encoding="utf-8")
+    (tmp_path / "prd.md").write_text((REPO_ROOT / "prd.md").read_text(encoding="utf-8"), encoding="utf-8")
+    yield auto_master.load_config(tmp_path / "auto_config.json")
+    auto_master.close_log_sinks()
@@ -0,0 +1,37 @@
+from auto_master import ChunkLineIndex, group_batch_neighbours
+
+BATCHING = {"enabled": True, "max_chunk_lines": 40, "max_chunks_per_batch": 3, "max_tokens_per_call": 8000}
+
+
+def _chunks(sizes):
+    chunks = []
+    line = 1
+    for chunk_id, size in enumerate(sizes, start=1):
+        chunks.append({"id": chunk_id, "start_line": line, "end_line": line + size - 1})
+        line += size
+    return chunks
+
+
+def _ids(chunks):
+    return [chunk["id"] for chunk in chunks]
+
+
+def test_scattered_schedule_keeps_small_neighbours_together():
+    # Chunk 4 is too large to batch and splits the file into two runs
+    chunks = _chunks([30, 30, 30, 200, 30, 30, 30, 30])
+    by_id = {chunk["id"]: chunk for chunk in chunks}
+    scheduled = [by_id[i] for i in (6, 2, 4, 8, 1, 3, 5, 7)]
+
+    ordered = group_batch_neighbours(chunks, scheduled, ChunkLineIndex(chunks), BATCHING)
+
+    # Runs are cut at max_chunks_per_batch: (1, 2, 3), (5, 6, 7), (8)
+    assert _ids(ordered) == [5, 6, 7, 1, 2, 3, 4, 8]
+
+
+def test_file_order_is_unchanged():
+    chunks = _chunks([30, 30, 200, 30, 30, 30, 30])
+    candidates = [chunk for chunk in chunks if chunk["id"] != 5]
+
+    ordered = group_batch_neighbours(chunks, candidates, ChunkLineIndex(chunks), BATCHING)
+
+    assert _ids(ordered) == _ids(candidates)
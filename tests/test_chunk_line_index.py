@@ -0,0 +1,31 @@
+import random
+
+from auto_master import ChunkLineIndex
+
+
+def test_chunk_line_index_matches_direct_renumbering():
+    rng = random.Random(3)
+    chunks = []
+    line = 1
+    for chunk_id in range(1, 41):
+        size = rng.randint(1, 30)
+        chunks.append({"id": chunk_id, "start_line": line, "end_line": line + size - 1})
+        line += size
+    expected = [(chunk["start_line"], chunk["end_line"]) for chunk in chunks]
+    index = ChunkLineIndex(chunks)
+
+    for _ in range(300):
+        position = rng.randrange(len(chunks))
+        line_diff = rng.randint(-3, 12)
+        start, end = expected[position]
+        line_diff = max(line_diff, start - end)  # keep at least one line
+        expected[position] = (start, end + line_diff)
+        for later in range(position + 1, len(expected)):
+            later_start, later_end = expected[later]
+            expected[later] = (later_start + line_diff, later_end + line_diff)
+        index.apply_delta(position, line_diff)
+        probe = rng.randrange(len(chunks))
+        assert index.resolve(probe) == expected[probe]
+
+    index.materialize()
+    assert [(chunk["start_line"], chunk["end_line"]) for chunk in chunks] == expected
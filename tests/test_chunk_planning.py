@@ -0,0 +1,26 @@
+import auto_master
+from conftest import REPO_ROOT
+
+
+def _fixed_config(chunk_size_lines=120, min_chunk_lines=50):
+    config = auto_master.load_config(REPO_ROOT / "auto_config.json")
+    config.chunk_strategy = "fixed_lines"
+    config.chunk_size_lines = chunk_size_lines
+    config._raw_data["performance"]["chunking_tuning"]["min_chunk_lines"] = min_chunk_lines
+    return config
+
+
+def test_full_document_plan_keeps_plain_fixed_ranges():
+    config = _fixed_config()
+    lines = ["x\n"] * 250
+
+    assert auto_master.plan_chunk_ranges(config, lines) == [(1, 120), (121, 240), (241, 250)]
+
+
+def test_partial_replan_merges_short_tail():
+    config = _fixed_config()
+    lines = ["x\n"] * 400
+
+    ranges = auto_master.plan_chunk_ranges(config, lines, first_line=11, last_line=260)
+
+    assert ranges == [(11, 130), (131, 260)]
@@ -0,0 +1,45 @@
+import random
+
+from auto_master import PrdDocument, lines_sha256
+
+
+def test_edits_match_plain_list():
+    rng = random.Random(7)
+    expected = [f"line {i}\n" for i in range(500)]
+    document = PrdDocument(list(expected))
+
+    for step in range(2000):
+        start = rng.randint(1, max(len(expected), 1))
+        end = min(len(expected), start + rng.randint(0, 8))
+        new_lines = [f"edit {step}.{k}\n" for k in range(rng.randint(0, 10))]
+        line_diff = document.replace_lines(start, end, new_lines)
+        replaced = max(0, end - start + 1)
+        expected[start - 1:start - 1 + replaced] = new_lines
+        assert line_diff == len(new_lines) - replaced
+
+        if step % 50 == 0:
+            assert len(document) == len(expected)
+            assert list(document.iter_lines()) == expected
+            lo = rng.randint(1, max(len(expected), 1))
+            hi = rng.randint(lo, len(expected) + 3)
+            assert document.get_lines(lo, hi) == expected[lo - 1:hi]
+
+    assert document.to_lines() == expected
+    assert document.get_text(1, len(expected)) == "".join(expected)
+    assert document.digest() == lines_sha256(expected)
+
+
+def test_digest_is_invalidated_by_edits():
+    document = PrdDocument(["a\n", "b\n", "c\n"])
+    before = document.digest()
+    document.replace_lines(2, 2, ["B\n", "B2\n"])
+    assert document.digest() != before
+    assert document.digest() == lines_sha256(["a\n", "B\n", "B2\n", "c\n"])
+
+
+def test_empty_document():
+    document = PrdDocument()
+    assert len(document) == 0
+    assert document.to_lines() == []
+    document.replace_lines(1, 0, ["first\n"])
+    assert document.to_lines() == ["first\n"]
@@ -0,0 +1,93 @@
+import subprocess
+import sys
+import textwrap
+
+import auto_master
+from conftest import REPO_ROOT
+
+# Runs one enhance pass and hard-exits (no cleanup, no state save) in the
+# middle of it, right after the given number of chunk replacements.
+CRASHING_PASS = textwrap.dedent("""
+    import os, sys
+    sys.path.insert(0, {root!r})
+    import auto_master
+
+    crash_after = {crash_after}
+    original = auto_master.PrdDocument.replace_lines
+
+    def replace_then_crash(self, *args, **kwargs):
+        result = original(self, *args, **kwargs)
+        replace_then_crash.calls += 1
+        if replace_then_crash.calls >= crash_after:
+            os._exit(3)
+        return result
+
+    replace_then_crash.calls = 0
+    auto_master.PrdDocument.replace_lines = replace_then_crash
+
+    config = auto_master.load_config()
+    state = auto_master.load_state(config)
+    document = auto_master.PrdDocument.from_file("prd.md")
+    auto_master.run_enhancement_pass(config, state, document, max_chunks=6)
+""")
+
+
+def _init_state(config):
+    state = auto_master.build_state_from_file(config)
+    auto_master.save_state(config, state)
+    return state
+
+
+def _crash_mid_pass(crash_after):
+    script = CRASHING_PASS.format(root=str(REPO_ROOT), crash_after=crash_after)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    assert result.returncode == 3, result.stderr
+
+
+def _read_lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.readlines()
+
+
+def test_recovery_replays_applied_chunks(workspace):
+    config = workspace
+    _init_state(config)
+    original_lines = _read_lines("prd.md")
+
+    _crash_mid_pass(crash_after=4)
+    apply_log_path = auto_master.get_apply_log_path(config)
+    assert apply_log_path.exists()
+    assert _read_lines("prd.md") == original_lines
+
+    assert auto_master.recover_interrupted_pass(config, "enhance") == "replayed"
+    assert not apply_log_path.exists()
+
+    lines = _read_lines("prd.md")
+    assert len(lines) > len(original_lines)
+    state = auto_master.load_state(config)
+    statuses = [chunk["status"] for chunk in state["chunks"]]
+    assert "running" not in statuses
+    assert statuses.count("done") == 4
+    assert state["meta"]["total_lines"] == len(lines)
+    assert auto_master._check_chunk_hashes(state["chunks"], lines) is None
+
+    # Nothing left to recover on the next start.
+    assert auto_master.recover_interrupted_pass(config, "enhance") is None
+
+
+def test_recovery_abandons_edits_when_prd_changed(workspace):
+    config = workspace
+    _init_state(config)
+
+    _crash_mid_pass(crash_after=2)
+    with open("prd.md", "a", encoding="utf-8") as f:
+        f.write("hand edit after the crash\n")
+    edited_lines = _read_lines("prd.md")
+
+    assert auto_master.recover_interrupted_pass(config, "enhance") == "abandoned"
+    assert not auto_master.get_apply_log_path(config).exists()
+    assert _read_lines("prd.md") == edited_lines
+
+    state = auto_master.load_state(config)
+    assert all(chunk["status"] == "pending" for chunk in state["chunks"])
+    assert state["chunks"][-1]["end_line"] == len(edited_lines) - 1